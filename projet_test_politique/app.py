@@ -1,18 +1,34 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, abort
 from flask_migrate import Migrate
 from werkzeug.security import generate_password_hash
 import requests
 import json
 import re
-from newsapi import NewsApiClient
-from datetime import datetime, timedelta
-from models import User, Question, Reponse, Article, db, AnalysePolitique
-from my_database import save_question, save_answer
+from datetime import datetime, timedelta, timezone
+from models import User, Question, Reponse, QuizAttempt, Article, db, AnalysePolitique, parse_analyse_sections, configure_text_compression
+from my_database import save_question, save_answer, save_answers, get_current_attempt, get_recent_attempts, start_new_attempt, content_hash, get_resumes_actualites, save_resumes_actualites
 from flask_caching import Cache
 from collections import defaultdict
 from sqlalchemy.sql import func
 import logging
+import os
 import urllib.parse
+from sqlalchemy.orm import joinedload, undefer
+from query_stats import init_query_stats, query_report
+from db_config import configure_sqlite_engine, apply_sqlite_pragmas
+from commands import register_commands
+from search import init_search, include_object, search_questions, search_articles, find_similar_question, desindexer
+from news_cache import StaleWhileRevalidateCache
+from server_session import ServerSessionInterface
+from sqlite_cache import SQLiteCache
+from http_cache import init_http_cache, conditional
+from ingest import lancer_ingestion, params_newsapi, bilan_ingestion
+from news_source import NewsApiSource
+from sources import EtatConditionnel, SourceFlux, valider_sources
+from classifieur import CATEGORIES_ACTUALITES, classifieur
+from scheduler import Scheduler
+from resume import Resumeur
+from evenements import reponses_enregistrees, analyse_modifiee, preferences_modifiees, actualites_rafraichies
 
 # ===============================
 # === Initialisation de l'App ===
@@ -21,23 +37,78 @@ logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///my_database.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///my_database.db')
 app.config['SECRET_KEY'] = 'ton_secret'
+# Profil SQLite : "production" (WAL, busy_timeout, pool) ou "default" (voir db_config.py)
+app.config['SQLITE_PROFILE'] = os.environ.get('SQLITE_PROFILE', 'production')
+configure_sqlite_engine(app)
 db.init_app(app)
-migrate = Migrate(app, db)
-
-# Configuration du cache avec un backend persistant
-app.config['CACHE_TYPE'] = 'FileSystemCache'
-app.config['CACHE_DIR'] = 'flask_cache'
+apply_sqlite_pragmas(app, db)
+# Compression des gros textes en base (optionnelle) : "none" (défaut), "zlib" ou "zstd" (si installé).
+# Les lignes déjà compressées restent lisibles quel que soit le réglage.
+app.config['TEXT_COMPRESSION'] = os.environ.get('TEXT_COMPRESSION', 'none')
+configure_text_compression(app.config['TEXT_COMPRESSION'])
+migrate = Migrate(app, db, include_object=include_object)  # les tables FTS5 ne sont pas gérées par Alembic
+
+# Comptage des requêtes SQL par requête Flask (en-têtes X-DB-* en mode debug, rapport sur /debug_queries)
+init_query_stats(app)
+
+# Configuration du cache avec un backend persistant, partagé entre les workers (voir sqlite_cache.py)
+app.config['CACHE_TYPE'] = os.environ.get('CACHE_TYPE', 'sqlite_cache.SQLiteCache')
+app.config['CACHE_DIR'] = os.environ.get('CACHE_DIR', 'flask_cache')
 app.config['CACHE_DEFAULT_TIMEOUT'] = 86400  # 24 heures en secondes
+app.config['CACHE_THRESHOLD'] = 500  # nombre max d'entrées avant éviction LRU
+app.config['CACHE_SQLITE_MAX_BYTES'] = 64 * 1024 * 1024
 cache = Cache(app)
 
-NEWS_API_KEY = '81ab1434b19c4ebb8517769bfbbf6cc9'
+# Compression gzip/brotli, ETag et fichiers statiques versionnés (voir http_cache.py)
+init_http_cache(app)
+
+# Données qui ne doivent pas disparaître sous l'éviction LRU du cache (sessions, état du planificateur) :
+# même backend SQLite, dans un fichier à part et sans limite (les entrées expirées sont purgées)
+stockage_persistant = SQLiteCache(os.path.join(app.config['CACHE_DIR'], 'persistant.sqlite3'),
+                                  default_timeout=0, threshold=0, max_bytes=0)
+
+# Sessions côté serveur : le cookie ne contient qu'un identifiant, les données sont dans stockage_persistant (voir server_session.py)
+app.config['SESSION_TTL'] = 7 * 86400
+app.session_interface = ServerSessionInterface(stockage_persistant, ttl=app.config['SESSION_TTL'])
+
+# Clé NewsAPI lue uniquement dans l'environnement : sans elle, NewsAPI est désactivé (les flux RSS restent utilisables)
+NEWS_API_KEY = os.environ.get('NEWS_API_KEY')
+if not NEWS_API_KEY:
+    print("NEWS_API_KEY n'est pas défini : NewsAPI est désactivé (actualités et import limités aux flux RSS).")
+app.config['NEWS_API_KEY'] = NEWS_API_KEY
 NEWS_API_URL = 'https://newsapi.org/v2/top-headlines'
-newsapi = NewsApiClient(api_key=NEWS_API_KEY)
+# NewsAPI incrémental : seuls les articles plus récents que le dernier vu sont demandés,
+# les réponses brutes sont gardées dans NEWSAPI_DIR (voir news_source.py)
+app.config['NEWSAPI_DIR'] = os.environ.get('NEWSAPI_DIR', os.path.join(app.instance_path, 'newsapi'))
+# Jours de réponses brutes gardés sur disque (au moins la fenêtre de "flask ingest", 30 jours), 0 = tout garder
+app.config['NEWSAPI_RETENTION_JOURS'] = int(os.environ.get('NEWSAPI_RETENTION_JOURS', 45))
+# Questions candidates demandées à Ollama en un seul appel par article importé (voir ingest.py)
+app.config['QUESTIONS_PAR_ARTICLE'] = int(os.environ.get('QUESTIONS_PAR_ARTICLE', 1))
+# Score minimal de pertinence politique (0 à 1) pour qu'un article importé parte chez Ollama, 0 = pas de filtre
+app.config['SEUIL_PERTINENCE'] = float(os.environ.get('SEUIL_PERTINENCE', 0.5))
+# Distance SimHash max (bits sur 64) pour qu'un article importé soit un quasi-doublon d'un article récent, -1 = pas de filtre
+app.config['DOUBLONS_DISTANCE'] = int(os.environ.get('DOUBLONS_DISTANCE', 5))
+# Résumés : tel quel jusqu'à RESUME_COURT caractères, extractif (TextRank) jusqu'à RESUME_LONG, Ollama au-delà
+app.config['RESUME_COURT'] = int(os.environ.get('RESUME_COURT', 600))
+app.config['RESUME_LONG'] = int(os.environ.get('RESUME_LONG', 4000))
+resumeur = Resumeur(court=app.config['RESUME_COURT'], long=app.config['RESUME_LONG'])
+# Flux RSS / Atom importés en plus de NewsAPI (URL séparées par des virgules), récupérés en parallèle et en GET conditionnel
+app.config['SOURCES_RSS'] = [url.strip() for url in os.environ.get('SOURCES_RSS', '').split(',') if url.strip()]
+# Le rafraîchissement des actualités et l'import envoient la même requête : chacun a ses propres watermarks
+news_source = NewsApiSource(NEWS_API_KEY, dossier=app.config['NEWSAPI_DIR'],
+                            retention_jours=app.config['NEWSAPI_RETENTION_JOURS'], consommateur='actualites')
+ingestion_source = news_source.pour('ingestion')
+etat_flux = EtatConditionnel(os.path.join(app.config['NEWSAPI_DIR'], 'flux.json'))
 
 with app.app_context():
     db.create_all()
+
+# Commandes de maintenance "flask ..." (voir commands.py)
+register_commands(app)
+# Index plein texte FTS5 sur les articles et les questions (voir search.py)
+init_search(app)
     
 # ==================================
 # ============= Routes =============
@@ -74,22 +145,30 @@ def nettoyer_contenu(content):
 #Récupère les réponses actives de l'utilisateur sous forme structurée pour faciliter l'analyse politique par Ollama.
 def get_reponses_utilisateur(user_id, include_history=False):
     
-    # Récupérer les réponses actives données par l'utilisateur
-    reponses_obj = Reponse.query.filter_by(user_id=user_id, est_active=True, etat="répondu").all()
+    # Tentative courante (et précédente pour l'historique) en une seule requête
+    tentatives = get_recent_attempts(user_id)
+    attempt_id = tentatives[0].id if tentatives else None
+    
+    # Récupérer les réponses de la tentative courante, avec leur question (une seule requête)
+    reponses_obj = db.session.query(Reponse, Question).outerjoin(
+        Question, Reponse.question_id == Question.id
+    ).filter(
+        Reponse.attempt_id == attempt_id,
+        Reponse.etat == "répondu"
+    ).all()
     
     # Log pour débogage - voir combien de réponses actives on a
     reponses_count = len(reponses_obj)
     logging.debug(f"Récupération de {reponses_count} réponses actives pour l'utilisateur {user_id}")
     
     # AJOUT: Log des détails des réponses
-    for rep in reponses_obj:
+    for rep, _ in reponses_obj:
         logging.debug(f"Réponse ID {rep.id}: Question {rep.question_id}, Texte: {rep.texte[:50]}...")
     
     # Structurer les réponses avec les questions pour plus de contexte
     formatted_responses = []
     
-    for reponse in reponses_obj:
-        question = Question.query.get(reponse.question_id)
+    for reponse, question in reponses_obj:
         if question:
             formatted_responses.append(f"{question.texte} : {reponse.texte}")
             logging.debug(f"Réponse formatée: {question.texte[:30]}... : {reponse.texte}")
@@ -99,11 +178,14 @@ def get_reponses_utilisateur(user_id, include_history=False):
     # CORRECTION: Vérifier aussi les réponses avec etat="passé" si pas assez de réponses "répondu"
     if len(formatted_responses) < 3:
         logging.warning(f"Seulement {len(formatted_responses)} réponses trouvées, ajout des réponses 'passé'")
-        reponses_passees = Reponse.query.filter_by(user_id=user_id, est_active=True, etat="passé").all()
-        for reponse in reponses_passees:
-            question = Question.query.get(reponse.question_id)
-            if question:
-                formatted_responses.append(f"{question.texte} : Question passée")
+        questions_passees = db.session.query(Question).join(
+            Reponse, Reponse.question_id == Question.id
+        ).filter(
+            Reponse.attempt_id == attempt_id,
+            Reponse.etat == "passé"
+        ).all()
+        for question in questions_passees:
+            formatted_responses.append(f"{question.texte} : Question passée")
     
     # Si aucune réponse n'a été trouvée, on inclut un message d'erreur
     if not formatted_responses:
@@ -112,15 +194,16 @@ def get_reponses_utilisateur(user_id, include_history=False):
         toutes_reponses = Reponse.query.filter_by(user_id=user_id).all()
         logging.error(f"Total de réponses dans la DB pour cet utilisateur: {len(toutes_reponses)}")
         for rep in toutes_reponses:
-            logging.error(f"Réponse: ID={rep.id}, est_active={rep.est_active}, etat={rep.etat}")
+            logging.error(f"Réponse: ID={rep.id}, tentative={rep.attempt_id}, etat={rep.etat}")
         return ["Pas de réponses disponibles"]
     
-    # Si demandé, inclure l'historique des réponses précédentes
-    if include_history:
-        previous_responses = Reponse.query.filter_by(
-            user_id=user_id, 
-            est_active=False,
-            etat="répondu"
+    # Si demandé, inclure les réponses de la tentative précédente pour comparer
+    if include_history and len(tentatives) > 1:
+        previous_responses = db.session.query(Reponse, Question).join(
+            Question, Reponse.question_id == Question.id
+        ).filter(
+            Reponse.attempt_id == tentatives[1].id,
+            Reponse.etat == "répondu"
         ).order_by(Reponse.date_creation.desc()).limit(30).all()
         
         previous_count = len(previous_responses)
@@ -128,10 +211,8 @@ def get_reponses_utilisateur(user_id, include_history=False):
         
         if previous_responses:
             formatted_responses.append("\n--- HISTORIQUE DES RÉPONSES PRÉCÉDENTES ---\n")
-            for reponse in previous_responses:
-                question = Question.query.get(reponse.question_id)
-                if question:
-                    formatted_responses.append(f"ANCIEN - {question.texte} : {reponse.texte}")
+            for reponse, question in previous_responses:
+                formatted_responses.append(f"ANCIEN - {question.texte} : {reponse.texte}")
     
     logging.info(f"TOTAL: {len(formatted_responses)} réponses formatées pour l'analyse")
     return formatted_responses
@@ -528,89 +609,137 @@ GAUCHE--+--DROITE
 Raison: {raison}
 Conseil: Répondez à plus de questions du quiz pour une analyse précise."""
     
-# Fonction optimisée pour être mise en cache une seule fois par jour
-@cache.memoize(timeout=86400)  # 24 heures en secondes (86400 = 24*60*60)
-def fetch_actualites_cached():
-    """Récupère et trie les actualités par catégorie avec mise en cache."""
-    print("=== EXÉCUTION DE FETCH_ACTUALITES_CACHED ===")
-    print(f"Cette fonction ne devrait s'exécuter qu'une fois toutes les 24h - {datetime.now()}")
+#Résumé Ollama d'une actualité (3 phrases maximum)
+def resumer_actualite(title, cleaned_content):
+    prompt = f"""
+        Résume le texte suivant en **3 phrases maximum**, de manière claire et factuelle. 
+        Ne commence PAS par 'Voici un résumé' ou 'Je ne peux pas' ou 'Je peux' ou 'Oui'. 
+        Donne DIRECTEMENT le contenu du résumé :
+        Si le texte n'est pas fourni ou que tu n'arrive pas à faire de résumé, dis UNIQUEMENT: Résumé non disponible. Veuillez lire l'article complet. SANS RIEN AJOUTER D'AUTRE
+        {title} - {cleaned_content}
+    """
+    payload = {
+        "model": "llama3.2",
+        "prompt": prompt,
+        "stream": False
+    }
+    ollama_response = requests.post("http://localhost:11434/api/generate", json=payload)
+    ollama_response.raise_for_status()
+    summary = ollama_response.json().get("response", "Résumé non disponible").strip()
+    return re.sub(r"(?i)^voici.*?:\\s*", "", summary).strip()
+
+# Compteurs du dernier rafraîchissement des actualités (affichés sur /debug_cache)
+RESUMES_STATS = {"articles": 0, "reutilises": 0, "generes": 0}
+
+# Reconstruction des actualités (NewsAPI + résumés Ollama), lancée en arrière-plan par news_cache.
+# Une seule requête NewsAPI, les articles sont rangés dans les catégories par le classifieur local (classifieur.py).
+# Les résumés sont stockés par URL et hash du contenu : seules les actualités nouvelles ou modifiées sont résumées,
+# et seulement les textes longs par Ollama (resume.py : les extraits NewsAPI de ~200 caractères sont gardés tels quels).
+def construire_actualites():
+    """Récupère et trie les actualités par catégorie."""
+    print("=== RECONSTRUCTION DES ACTUALITÉS ===")
+    print(f"Lancée en arrière-plan au plus une fois toutes les 24h - {datetime.now()}")
     
     resume_actualites = defaultdict(list)
-    categories = {
-        'Affaires internationales': ['international', 'monde', 'étranger', 'diplomatie', 'conflit'],
-        'Économie': ['économie', 'finance', 'marché', 'entreprise', 'emploi', 'croissance'],
-        'Environnement': ['environnement', 'écologie', 'climat', 'énergie', 'pollution', 'biodiversité'],
-        'Éducation': ['éducation', 'école', 'université', 'enseignement', 'formation', 'étudiant'],
-        'Santé': ['santé', 'médical', 'hôpital', 'maladie', 'vaccin', 'bien-être'],
-        'Justice': ['justice', 'droit', 'loi', 'tribunal', 'crime', 'sécurité'],
-        'Culture': ['culture', 'art', 'musique', 'cinéma', 'livre', 'exposition'],
-        'Technologie': ['technologie', 'numérique', 'internet', 'intelligence artificielle', 'innovation', 'science']
-    }
+    categories = CATEGORIES_ACTUALITES
     to_date = datetime.now().strftime('%Y-%m-%d')
     from_date = (datetime.now() - timedelta(days=10)).strftime('%Y-%m-%d')
-    article_titles = set()
+    a_resumer = defaultdict(list)  # catégorie -> articles pertinents retenus
     
-    for category, keywords in categories.items():
-        print(f"\n--- Catégorie : {category} ---")
-        try:
-            # 1. Récupérer les articles - augmenter page_size pour avoir plus d'articles
-            response = newsapi.get_everything(
-                sources='le-monde',
-                from_param=from_date,
-                to=to_date,
-                language='fr',
-                sort_by='publishedAt',
-                page_size=10,  # Augmenté de 5 à 10 pour avoir plus d'articles
-                page=1,
-                q=category
-            )
-            if response.get('status') == 'ok':
-                articles = response.get('articles', [])
-                print(f"Nombre d'articles récupérés pour {category}: {len(articles)}")
-                # 2. Filtrer et trier les articles
-                for article in articles:
-                    title = article.get('title', 'Pas de titre')
-                    content = article.get('content', '') or article.get('description', '') or ''
-                    url = article.get('url', '')
-                    cleaned_content = nettoyer_contenu(content)
-                    combined_text = f"{title.lower()} {cleaned_content.lower()}"
-                    if any(keyword in combined_text for keyword in keywords) and title not in article_titles:
-                        # 4. Utiliser Ollama pour générer le résumé
-                        prompt = f"""
-                            Résume le texte suivant en **3 phrases maximum**, de manière claire et factuelle. 
-                            Ne commence PAS par 'Voici un résumé' ou 'Je ne peux pas' ou 'Je peux' ou 'Oui'. 
-                            Donne DIRECTEMENT le contenu du résumé :
-                            Si le texte n'est pas fourni ou que tu n'arrive pas à faire de résumé, dis UNIQUEMENT: Résumé non disponible. Veuillez lire l'article complet. SANS RIEN AJOUTER D'AUTRE
-                            {title} - {cleaned_content}
-                        """
-                        payload = {
-                            "model": "llama3.2",
-                            "prompt": prompt,
-                            "stream": False
-                        }
-                        ollama_response = requests.post("http://localhost:11434/api/generate", json=payload)
-                        ollama_response.raise_for_status()
-                        summary = ollama_response.json().get("response", "Résumé non disponible").strip()
-                        summary = re.sub(r"(?i)^voici.*?:\\s*", "", summary).strip()
-                        resume_actualites[category].append({"title": title, "summary": summary, "url": url})
-                        article_titles.add(title)
-                
-                if not resume_actualites[category]:
-                    resume_actualites[category].append({"title": "Aucune actualité pertinente", "summary": "Aucune actualité pertinente trouvée pour le moment.", "url": ""})
-            else:
-                print(f"Erreur NewsAPI : {response.get('code')} - {response.get('message')}")
+    # 1. UNE requête NewsAPI pour toutes les catégories, puis classement local de chaque article
+    requete = {'sources': 'le-monde', 'language': 'fr', 'sort_by': 'publishedAt'}
+    try:
+        # NewsAPI ne renvoie que les articles publiés depuis le dernier rafraîchissement...
+        response = news_source.get_everything(from_param=from_date, to=to_date, page_size=100, page=1, **requete)
+        if response.get('status') == 'ok':
+            # ... la fenêtre de 10 jours est relue dans les réponses déjà stockées (du plus récent au plus ancien)
+            articles = news_source.articles_stockes(requete, depuis=from_date)
+            print(f"Articles : {len(response.get('articles', []))} nouveaux, {len(articles)} sur 10 jours")
+            for article in articles:
+                title = article.get('title') or 'Pas de titre'
+                content = article.get('content', '') or article.get('description', '') or ''
+                cleaned_content = nettoyer_contenu(content)
+                candidat = {
+                    "title": title, "url": article.get('url', ''), "cleaned": cleaned_content,
+                    "hash": content_hash(title, cleaned_content),
+                }
+                # Un article peut aller dans ses 2 meilleures catégories (il ne sera résumé qu'une fois)
+                for category in classifieur.classer(title, cleaned_content):
+                    if len(a_resumer[category]) < 10:
+                        a_resumer[category].append(candidat)
+        else:
+            print(f"Erreur NewsAPI : {response.get('code')} - {response.get('message')}")
+            for category in categories:
                 resume_actualites[category].append({"title": "Erreur", "summary": f"Erreur de NewsAPI : {response.get('message')}", "url": ""})
-        except requests.exceptions.RequestException as e:
-            print(f"Erreur lors de la requête : {e}")
+    except requests.exceptions.RequestException as e:
+        print(f"Erreur lors de la requête : {e}")
+        for category in categories:
             resume_actualites[category].append({"title": "Erreur", "summary": f"Erreur de requête : {e}", "url": ""})
-        except json.JSONDecodeError:
-            print("Erreur de décodage JSON")
-            resume_actualites[category].append({"title": "Erreur", "summary": "Erreur de format JSON", "url": ""})
-        except Exception as e:
-            print(f"Erreur inattendue : {e}")
+    except Exception as e:
+        print(f"Erreur inattendue : {e}")
+        for category in categories:
             resume_actualites[category].append({"title": "Erreur", "summary": f"Erreur inattendue : {e}", "url": ""})
-    
-    return dict(resume_actualites)  # Convertir en dict normal pour la mise en cache
+    for category in categories:
+        print(f"--- {category} : {len(a_resumer[category])} articles")
+
+    news_source.valider()
+
+    # 2. Réutiliser les résumés déjà connus (même URL, même contenu), Ollama seulement pour le reste
+    connus = get_resumes_actualites([a["url"] for articles in a_resumer.values() for a in articles if a["url"]])
+    a_enregistrer = []
+    reutilises = generes = 0
+    deja_resumes = {}  # url -> résumé de ce cycle : un article classé dans 2 catégories n'est résumé qu'une fois
+    for category, articles in a_resumer.items():
+        for article in articles:
+            existant = connus.get(article["url"])
+            if article["url"] in deja_resumes:
+                resume_actualites[category].append({"title": article["title"], "summary": deja_resumes[article["url"]], "url": article["url"]})
+                continue
+            if existant is not None and existant.content_hash == article["hash"]:
+                summary = existant.summary
+                reutilises += 1
+            else:
+                try:
+                    summary = resumeur.resumer(article["cleaned"], lambda texte: resumer_actualite(article["title"], texte))
+                except requests.exceptions.RequestException as e:
+                    print(f"Erreur Ollama pour {article['url']} : {e}")
+                    resume_actualites[category].append({"title": "Erreur", "summary": f"Erreur de requête : {e}", "url": ""})
+                    continue
+                generes += 1
+            resume_actualites[category].append({"title": article["title"], "summary": summary, "url": article["url"]})
+            if article["url"]:
+                deja_resumes[article["url"]] = summary
+                a_enregistrer.append({
+                    "url": article["url"], "content_hash": article["hash"], "title": article["title"],
+                    "category": category, "summary": summary,
+                })
+    # Même les résumés réutilisés sont réécrits, pour mettre à jour last_seen_at
+    save_resumes_actualites(a_enregistrer)
+    RESUMES_STATS.update(articles=reutilises + generes, reutilises=reutilises, generes=generes)
+    print(f"Résumés : {reutilises} réutilisés, {generes} générés (niveaux depuis le démarrage : {resumeur.stats()})")
+
+    for category in categories:
+        if not resume_actualites[category]:
+            resume_actualites[category].append({"title": "Aucune actualité pertinente", "summary": "Aucune actualité pertinente trouvée pour le moment.", "url": ""})
+    
+    return {category: resume_actualites[category] for category in categories}  # dict normal, dans l'ordre des catégories
+
+#Une reconstruction n'est gardée que si au moins une catégorie contient un vrai article (pas seulement des erreurs)
+def actualites_valides(resume_actualites):
+    return any(
+        article.get("url")
+        for articles in (resume_actualites or {}).values()
+        for article in articles
+    )
+
+news_cache = StaleWhileRevalidateCache(
+    cache, 'actualites', construire_actualites, max_age=86400, app=app, is_valid=actualites_valides,
+    on_refresh=lambda: actualites_rafraichies.send(None),
+)
+
+#Actualités servies immédiatement depuis le cache (même périmées), la reconstruction se fait en arrière-plan
+def fetch_actualites_cached():
+    return news_cache.get()
 
 # Ancienne fonction maintenue pour compatibilité
 def fetch_actualites():
@@ -627,6 +756,7 @@ def login():
         if user:
             print(f"Utilisateur trouvé : {user.username}")
             if user.check_password(password):
+                session.regenerate()  # nouvel identifiant de session à la connexion
                 session['user_id'] = user.id
                 return redirect(url_for('dashboard'))
             else:
@@ -664,6 +794,7 @@ def quiz():
         
     categories = ['Affaires internationales','Économie', 'Environnement', 'Éducation', 'Santé', 'Justice', 'Culture', 'Technologie']
     completed_categories = []  # Liste pour suivre les catégories complétées
+    attempt = get_current_attempt(user_id)
     
     # Vérification de chaque catégorie
     for categorie in categories:
@@ -672,9 +803,9 @@ def quiz():
         if not questions:
             continue  # Si la catégorie n'a pas de questions valides, on passe à la suivante
         question_ids = [q.id for q in questions]
-        # Vérifie si l'utilisateur a déjà répondu à ces questions
+        # Vérifie si l'utilisateur a déjà répondu à ces questions dans la tentative courante
         reponses_existantes = Reponse.query.filter(
-            Reponse.user_id == user_id,
+            Reponse.attempt_id == attempt.id,
             Reponse.question_id.in_(question_ids)
         ).count()
         # Si l'utilisateur a répondu à toutes les questions de cette catégorie, on la marque comme complétée
@@ -722,11 +853,22 @@ def register():
             return redirect(url_for('register'))
     return render_template('register.html')
 
+#Validateurs HTTP de la page d'accueil : elle ne change qu'avec les actualités (ou le template)
+def validateurs_accueil():
+    if '_flashes' in session:
+        return None  # des messages à afficher : la page doit être rendue
+    built_at = news_cache.built_at()
+    if built_at is None:
+        return None
+    version_template = int(os.path.getmtime(os.path.join(app.root_path, app.template_folder, 'index.html')))
+    return f"accueil-{int(built_at)}-{version_template}", datetime.fromtimestamp(built_at, timezone.utc)
+
 #Page d'accueil utilisant la mise en cache 
 @app.route('/')
+@conditional(validateurs_accueil)
 def home():
     print("=== Chargement de la page d'accueil ===")
-    # Utilisez simplement la fonction mise en cache qui ne s'exécutera réellement qu'une fois par jour
+    # Sert la dernière version en cache ; si elle a plus de 24h, elle est reconstruite en arrière-plan
     resume_actualites = fetch_actualites_cached()
     return render_template('index.html', resume_actualites=resume_actualites)
 
@@ -738,44 +880,18 @@ def reinitialiser_quiz():
         return redirect(url_for('login'))
     
     try:
-        # On va utiliser une approche qui préserve l'historique des réponses
+        # Nouvelle tentative : les réponses des tentatives précédentes restent en base (historique complet)
         with db.session.begin_nested():  # Créer un point de sauvegarde
-            # 1. D'abord, récupérer toutes les réponses actives actuelles
-            reponses_actives = Reponse.query.filter_by(user_id=user_id, est_active=True).all()
-            
-            # 2. Pour chaque réponse active, la désactiver tout en préservant l'historique
-            for reponse in reponses_actives:
-                # D'abord vérifier si cette question a déjà des réponses inactives
-                if Reponse.query.filter_by(
-                    user_id=user_id,
-                    question_id=reponse.question_id,
-                    est_active=False
-                ).count() > 0:
-                    # Si oui, on supprime l'ancienne version inactive
-                    Reponse.query.filter_by(
-                        user_id=user_id,
-                        question_id=reponse.question_id,
-                        est_active=False
-                    ).delete()
-                
-                # Maintenant désactiver la réponse active
-                reponse.est_active = False
-                reponse.date_modification = datetime.utcnow()
-            
-            # 3. Récupérer l'analyse politique actuelle
-            current_analysis = AnalysePolitique.query.filter_by(user_id=user_id, is_current=True).first()
+            start_new_attempt(user_id)
             
-            # 4. Désactiver l'analyse courante
-            if current_analysis:
-                current_analysis.is_current = False
-        
-            # Commit des changements dans la transaction imbriquée
-            # db.session.commit() - pas nécessaire avec begin_nested()
+            # Désactiver l'analyse courante
+            AnalysePolitique.query.filter_by(user_id=user_id, is_current=True).update({AnalysePolitique.is_current: False})
         
         # Valider définitivement les changements
         db.session.commit()
+        analyse_modifiee.send(user_id)
         
-        # 5. Supprimer l'analyse de la session
+        # Supprimer l'analyse de la session
         if 'analyse' in session:
             session.pop('analyse', None)
         
@@ -858,14 +974,15 @@ def generer_analyse_quiz_fin():
     is_quiz_suivi = session.get('quiz_suivi', False)
     
     # DIAGNOSTIC: Vérifier les réponses dans la base de données
-    toutes_reponses = Reponse.query.filter_by(user_id=user_id).all()
-    reponses_actives = Reponse.query.filter_by(user_id=user_id, est_active=True).all()
-    reponses_repondues = Reponse.query.filter_by(user_id=user_id, est_active=True, etat="répondu").all()
+    attempt = get_current_attempt(user_id)
+    total_reponses = Reponse.query.filter_by(user_id=user_id).count()
+    reponses_actives = Reponse.query.filter_by(attempt_id=attempt.id).count()
+    reponses_repondues = Reponse.query.filter_by(attempt_id=attempt.id, etat="répondu").count()
     
     logging.info("DIAGNOSTIC DB:")
-    logging.info(f"- Total réponses: {len(toutes_reponses)}")
-    logging.info(f"- Réponses actives: {len(reponses_actives)}")
-    logging.info(f"- Réponses répondues actives: {len(reponses_repondues)}")
+    logging.info(f"- Total réponses: {total_reponses}")
+    logging.info(f"- Réponses de la tentative {attempt.id}: {reponses_actives}")
+    logging.info(f"- Réponses répondues de la tentative: {reponses_repondues}")
     
     # Récupérer les réponses de l'utilisateur
     reponses = get_reponses_utilisateur(user_id, include_history=is_quiz_suivi)
@@ -902,12 +1019,16 @@ def generer_analyse_quiz_fin():
             # Créer nouvelle analyse
             nouvelle_analyse = AnalysePolitique(
                 user_id=user_id,
+                attempt_id=attempt.id,
                 analyse_text=analyse,
                 is_current=True,
                 date_creation=datetime.utcnow()
             )
+            # Découpage des sections une seule fois, à l'écriture
+            nouvelle_analyse.extract_structured_fields()
             db.session.add(nouvelle_analyse)
             db.session.commit()
+            analyse_modifiee.send(user_id)
             
             logging.info("Analyse sauvegardée en DB avec succès")
         except Exception as db_error:
@@ -952,7 +1073,7 @@ DÉTAIL DES RÉPONSES:
 {i+1}. ID: {rep.id}
    Question: {question_text}...
    Réponse: {rep.texte[:50]}...
-   Est Active: {rep.est_active}
+   Tentative: {rep.attempt_id}
    État: {rep.etat}
    Date: {rep.date_creation}
    
@@ -982,20 +1103,21 @@ def quiz_par_categorie(categorie):
     is_quiz_suivi = session.get('quiz_suivi', False)
     
     # --- Récupération des questions pour la catégorie ---
-    # Récupérer les réponses de cette session (actives)
-    reponses_actives = Reponse.query.filter_by(user_id=user_id, est_active=True).all()
+    # Récupérer les réponses de la tentative courante
+    attempt = get_current_attempt(user_id)
+    reponses_actives = Reponse.query.filter_by(attempt_id=attempt.id).all()
     questions_repondues_active_ids = [r.question_id for r in reponses_actives if r.etat == "répondu"]
     questions_passees_active_ids = [r.question_id for r in reponses_actives if r.etat == "passé"]
     
     # En cas de quiz de suivi, récupérer toutes les questions précédemment répondues
     if is_quiz_suivi:
-        precedentes_reponses = Reponse.query.filter_by(
-            user_id=user_id, 
-            est_active=False,
-            etat="répondu"
-        ).all()
+        precedentes_reponses = db.session.query(Reponse.question_id).filter(
+            Reponse.user_id == user_id,
+            Reponse.attempt_id != attempt.id,
+            Reponse.etat == "répondu"
+        ).distinct().all()
         
-        questions_precedentes_ids = [r.question_id for r in precedentes_reponses]
+        questions_precedentes_ids = [question_id for (question_id,) in precedentes_reponses]
     else:
         questions_precedentes_ids = []
     
@@ -1011,7 +1133,7 @@ def quiz_par_categorie(categorie):
 
     # D'abord, priorité aux questions totalement nouvelles
     # Si c'est un quiz de suivi, on évite les questions déjà répondues dans les sessions précédentes
-    base_query = Question.query.filter(
+    base_query = Question.query.options(joinedload(Question.article).undefer(Article.content)).filter(
         Question.categorie.ilike(categorie_normalisee),
         Question.valide == True,
         ~Question.id.in_(questions_evitees_ids)
@@ -1027,7 +1149,7 @@ def quiz_par_categorie(categorie):
     # mais différentes pour montrer l'évolution des opinions
     if len(questions) < 3 and is_quiz_suivi:
         questions_deja_recup_ids = [q.id for q in questions]
-        questions_supp = Question.query.filter(
+        questions_supp = Question.query.options(joinedload(Question.article).undefer(Article.content)).filter(
             Question.categorie.ilike(categorie_normalisee),
             Question.valide == True,
             ~Question.id.in_(questions_evitees_ids + questions_deja_recup_ids),
@@ -1039,7 +1161,7 @@ def quiz_par_categorie(categorie):
     # Si toujours pas assez de questions, prendre des questions complètement aléatoires
     if len(questions) < 3:  # Minimum 3 questions
         questions_deja_recup_ids = [q.id for q in questions]
-        questions_aleatoires = Question.query.filter(
+        questions_aleatoires = Question.query.options(joinedload(Question.article).undefer(Article.content)).filter(
             Question.categorie.ilike(categorie_normalisee),
             Question.valide == True,
             ~Question.id.in_(questions_deja_recup_ids + questions_evitees_ids)
@@ -1103,19 +1225,22 @@ def quiz_par_categorie(categorie):
         # on ne doit pas exiger une réponse
         sauvegarder_seulement = 'sauvegarder' in request.form and not 'suivant' in request.form and not 'terminer_quiz' in request.form
         
+        # Toutes les réponses de la page sont enregistrées en un seul upsert / un seul commit
+        reponses_page = []
         for question in questions:
             passer = request.form.get(f"passer_{question.id}")
             user_answer = request.form.get(f"question_{question.id}")
 
             if passer:
-                save_answer(user_id, question.id, "", etat="passé")
+                reponses_page.append((question.id, "", "passé"))
                 has_response = True
             elif user_answer:
-                save_answer(user_id, question.id, user_answer, etat="répondu")
+                reponses_page.append((question.id, user_answer, "répondu"))
                 has_response = True
             else:
                 # Ne rien faire si aucune réponse donnée pour cette question
                 pass
+        save_answers(user_id, reponses_page, attempt_id=attempt.id)
 
         # Ne vérifier les réponses que si l'utilisateur ne fait pas juste sauvegarder
         if not has_response and not sauvegarder_seulement:
@@ -1220,7 +1345,7 @@ def quiz_par_categorie(categorie):
         try:
             if article and hasattr(article, "content"):
                 cleaned = nettoyer_texte(article.content)
-                summaries.append(generate_summary_with_ollama(cleaned))
+                summaries.append(resumeur.resumer(cleaned, generate_summary_with_ollama))
             else:
                 summaries.append("⚠️ Article sans contenu")
         except Exception as e:
@@ -1301,19 +1426,36 @@ def reprendre_quiz():
         return redirect(url_for('quiz'))
     
 #Page de compte de l'utilisateur
-@app.route('/dashboard')
-def dashboard():
-    if 'user_id' not in session:
-        return redirect(url_for('login'))
-    user_id = session['user_id']
+# ===========================================
+# === Vue du tableau de bord mise en cache ===
+# ===========================================
+# Le "view model" du dashboard est mis en cache par utilisateur et invalidé par les événements de evenements.py.
+# La génération globale change à chaque rafraîchissement des actualités : une seule lecture (get_many) suffit
+# pour récupérer la vue et vérifier qu'elle est encore à jour.
+DASHBOARD_GENERATION_KEY = 'dashboard:generation'
+DASHBOARD_TIMEOUT = 3600  # filet de sécurité si un événement est manqué (et vérification horaire des actualités)
+
+def dashboard_cache_key(user_id):
+    return f'dashboard:user:{user_id}'
+
+def invalider_dashboard(user_id, **kwargs):
+    """Abonné aux événements : user_id=None invalide les tableaux de bord de tous les utilisateurs."""
+    if user_id is None:
+        cache.set(DASHBOARD_GENERATION_KEY, datetime.utcnow().timestamp(), timeout=0)
+    else:
+        cache.delete(dashboard_cache_key(user_id))
+
+for _evenement in (reponses_enregistrees, analyse_modifiee, preferences_modifiees, actualites_rafraichies):
+    _evenement.connect(invalider_dashboard)
+
+#Construit tout ce que le template du dashboard affiche (dict sérialisable, sans objets SQLAlchemy)
+def construire_vue_dashboard(user_id, generation=None):
     user = User.query.get(user_id)
     if not user:
-        flash("Utilisateur non trouvé.", "error")
-        return redirect(url_for('logout'))
-        
+        return None
     interets = user.interets.split(',') if user.interets else []
     
-    # Récupération des actualités du cache
+    # Récupération des actualités du cache (relance leur reconstruction si elles sont périmées)
     resume_actualites = fetch_actualites_cached()
     
     # Si jamais le cache contient une string JSON, on la parse
@@ -1336,95 +1478,30 @@ def dashboard():
         filtered_actualites = resume_actualites
     
     # Récupérer l'analyse politique actuelle
-    analyse_politique = AnalysePolitique.query.filter_by(user_id=user_id, is_current=True).first()
+    analyse_politique = AnalysePolitique.query.options(undefer(AnalysePolitique.analyse_text)).filter_by(user_id=user_id, is_current=True).first()
     
     # Si aucune analyse n'est marquée comme current mais qu'il y a des analyses, prendre la plus récente
     if not analyse_politique:
-        analyse_politique = AnalysePolitique.query.filter_by(user_id=user_id).order_by(AnalysePolitique.date_creation.desc()).first()
+        analyse_politique = AnalysePolitique.query.options(undefer(AnalysePolitique.analyse_text)).filter_by(user_id=user_id).order_by(AnalysePolitique.date_creation.desc()).first()
         if analyse_politique:
             # Marquer cette analyse comme current
             analyse_politique.is_current = True
             db.session.commit()
     
-    # Récupérer l'analyse de la session OU de la base de données
-    analyse_brute = analyse_politique.analyse_text if analyse_politique else session.get('analyse', '')
-    # Vérifier que l'analyse est bien dans la session également (pour l'affichage immédiat)
-    if analyse_politique and not session.get('analyse'):
-        session['analyse'] = analyse_politique.analyse_text
-        
-    # Variables pour stocker les parties extraites de l'analyse
-    analyse_parti = ""           # Juste le nom du parti
-    analyse_parti_complet = ""   # La description complète du parti
-    analyse_orientation = ""     # Juste la position (ex: gauche-libertaire)
-    analyse_orientation_complete = ""  # La description complète de l'orientation
-    analyse_valeurs = []         # Liste des valeurs clés
-    analyse_valeurs_complete = ""  # Description complète des valeurs
-    analyse_graphique = ""       # Le graphique ASCII
-    analyse_evolution = ""       # Section évolution d'opinion (si présente)
-    
-    # Extraire les différentes parties de l'analyse
-    if analyse_brute:
-        lines = analyse_brute.split("\n")
-        bloc, current = None, []
-        
-        for line in lines:
-            if "1. Parti politique" in line:
-                bloc, current = "parti", []
-            elif "2. Orientation politique" in line:
-                if bloc == "parti": 
-                    analyse_parti_complet = "\n".join(current).strip()
-                    # Extraire juste le nom du parti (première partie avant le tiret ou la première phrase)
-                    if analyse_parti_complet:
-                        if "-" in analyse_parti_complet:
-                            analyse_parti = analyse_parti_complet.split("-")[0].strip()
-                        else:
-                            analyse_parti = analyse_parti_complet.split(".")[0].strip()
-                bloc, current = "orientation", []
-            elif "3. Valeurs principales" in line:
-                if bloc == "orientation": 
-                    analyse_orientation_complete = "\n".join(current).strip()
-                    # Extraire juste la position (ex: gauche-libertaire)
-                    if analyse_orientation_complete:
-                        match = re.search(r'(centre|gauche|droite)[\s-]*(libertaire|autoritaire|libéral|conservateur)?', 
-                                         analyse_orientation_complete.lower())
-                        if match:
-                            position = match.group(1).capitalize()
-                            if match.group(2):
-                                position += "-" + match.group(2).capitalize()
-                            analyse_orientation = position
-                        else:
-                            analyse_orientation = analyse_orientation_complete.split(".")[0].strip()
-                bloc, current = "valeurs", []
-            elif "4. Graphique ASCII" in line:
-                if bloc == "valeurs": 
-                    analyse_valeurs_complete = "\n".join(current).strip()
-                    # Extraire la liste des valeurs (séparées par virgules ou sur des lignes différentes)
-                    if analyse_valeurs_complete:
-                        if "," in analyse_valeurs_complete:
-                            analyse_valeurs = [v.strip() for v in analyse_valeurs_complete.split(",")]
-                        else:
-                            analyse_valeurs = [v.strip() for v in analyse_valeurs_complete.split("\n") if v.strip()]
-                bloc, current = "graphique", []
-            elif "5. Évolution d'opinion" in line or "5. Evolution d'opinion" in line:
-                if bloc == "graphique": 
-                    analyse_graphique = "\n".join(current).strip()
-                bloc, current = "evolution", []
-            else:
-                current.append(line)
-                
-        # Traiter le dernier bloc
-        if bloc == "graphique": 
-            analyse_graphique = "\n".join(current).strip()
-        elif bloc == "evolution":
-            analyse_evolution = "\n".join(current).strip()
-    
-    # Formater les valeurs pour l'affichage
-    analyse_valeurs_formatted = ", ".join(analyse_valeurs) if analyse_valeurs else ""
-    
-    # Préparer l'analyse complète pour l'affichage dans la section Analyse Détaillée
-    analyse_complete = ""
-    if analyse_brute:
-        analyse_complete = analyse_brute
+    # Les sections sont découpées une seule fois à l'enregistrement (AnalysePolitique.extract_structured_fields)
+    sections = None
+    if analyse_politique:
+        if not analyse_politique.champs_extraits:
+            # Analyse ancienne pas encore migrée (voir "flask analyses backfill")
+            analyse_politique.extract_structured_fields()
+            db.session.commit()
+        sections = {
+            'parti': analyse_politique.parti_politique or "",
+            'orientation': analyse_politique.orientation or "",
+            'valeurs': analyse_politique.valeurs or "",
+            'graphique': analyse_politique.graphique or "",
+            'evolution': analyse_politique.evolution or "",
+        }
         
     if not resume_actualites:
         resume_actualites = {
@@ -1438,22 +1515,57 @@ def dashboard():
             "Technologie": []
         }
         
-    # Déterminer si l'utilisateur a déjà fait un quiz complet
-    has_previous_quiz = AnalysePolitique.query.filter_by(user_id=user_id).count() > 0
+    return {
+        'generation': generation,
+        'user': {'username': user.username, 'interets': user.interets},
+        'resume_actualites': filtered_actualites,
+        'categories': list(resume_actualites.keys()),
+        # Sans analyse en base, l'analyse de la session sert de secours (lue à l'affichage, pas mise en cache)
+        'sections': sections,
+        'analyse_complete': analyse_politique.analyse_text if analyse_politique else "",
+        # Si on a trouvé une analyse, l'utilisateur a déjà fait un quiz complet
+        'has_previous_quiz': analyse_politique is not None,
+    }
+
+#Vue du dashboard : depuis le cache si elle est à jour, sinon reconstruite et remise en cache
+def get_vue_dashboard(user_id):
+    generation, vue = cache.get_many(DASHBOARD_GENERATION_KEY, dashboard_cache_key(user_id))
+    if vue is not None and vue['generation'] == generation:
+        return vue
+    vue = construire_vue_dashboard(user_id, generation)
+    if vue is not None:
+        cache.set(dashboard_cache_key(user_id), vue, timeout=DASHBOARD_TIMEOUT)
+    return vue
+
+@app.route('/dashboard')
+def dashboard():
+    if 'user_id' not in session:
+        return redirect(url_for('login'))
+    vue = get_vue_dashboard(session['user_id'])
+    if vue is None:
+        flash("Utilisateur non trouvé.", "error")
+        return redirect(url_for('logout'))
+
+    analyse_complete = vue['analyse_complete']
+    sections = vue['sections']
+    if sections is None:
+        # L'analyse vient de la base ; celle de la session (chargée à la demande) ne sert que si rien n'est enregistré
+        analyse_complete = session.get('analyse', '')
+        sections = parse_analyse_sections(analyse_complete)
     
     # CORRECTIF: Passer la variable analyse_evolution au template
     return render_template(
         'dashboard.html',
-        user=user,
-        resume_actualites=filtered_actualites,
-        analyse_parti=analyse_parti,
-        analyse_orientation=analyse_orientation,
-        analyse_valeurs=analyse_valeurs_formatted,
+        user=vue['user'],
+        resume_actualites=vue['resume_actualites'],
+        analyse_parti=sections['parti'],
+        analyse_orientation=sections['orientation'],
+        analyse_valeurs=sections['valeurs'],
         analyse_complete=analyse_complete,
-        analyse_graphique=analyse_graphique,
-        analyse_evolution=analyse_evolution,  # Ajout de la variable au template
-        categories=list(resume_actualites.keys()),
-        has_previous_quiz=has_previous_quiz,
+        analyse_graphique=sections['graphique'],
+        analyse_evolution=sections['evolution'],  # Ajout de la variable au template
+        categories=vue['categories'],
+        has_previous_quiz=vue['has_previous_quiz'],
         quiz_en_cours=session.get('quiz_en_cours', False)  # Indiquer si un quiz est en cours
     )
 
@@ -1481,15 +1593,18 @@ def save_preferences():
     selected_categories = request.form.getlist('categories')
     user.interets = ','.join(selected_categories)
     db.session.commit()
+    preferences_modifiees.send(user.id)
     flash("Préférences mises à jour ✅", "success")
     return redirect(url_for('dashboard'))
 
 # Route pour forcer le rafraîchissement manuel des actualités (option administrative)
 @app.route('/refresh_actualites')
 def refresh_actualites():
-    """Force le rafraîchissement des actualités en vidant le cache."""
-    cache.delete_memoized(fetch_actualites_cached)
-    flash("Les actualités ont été rafraîchies avec succès", "success")
+    """Lance la reconstruction des actualités en arrière-plan ; l'ancienne version reste affichée en attendant."""
+    if news_cache.refresh():
+        flash("Le rafraîchissement des actualités est lancé, elles seront à jour dans quelques minutes", "success")
+    else:
+        flash("Un rafraîchissement des actualités est déjà en cours", "info")
     return redirect(url_for('home'))
 
 
@@ -1498,9 +1613,18 @@ def refresh_actualites():
 #C'est surtout pour enlever les réponses d'ollama qui ont pas de questions ou pas de catégorie
 @app.route('/admin/questions')
 def admin_questions():
-    # Récupère toutes les questions NON validées
-    questions = Question.query.filter_by(valide=False, is_refused=False).all()
-    return render_template('admin_questions.html', questions=questions)
+    # Questions NON validées, paginées par clé (id croissant) : ?after=<dernier id vu>&limit=50
+    after = request.args.get('after', 0, type=int)
+    limit = max(1, min(request.args.get('limit', 50, type=int), 200))
+    questions = Question.query.options(joinedload(Question.article)).filter(
+        Question.valide == False,
+        Question.is_refused == False,
+        Question.id > after
+    ).order_by(Question.id).limit(limit + 1).all()
+    # On en demande une de plus pour savoir s'il existe une page suivante
+    next_after = questions[limit - 1].id if len(questions) > limit else None
+    questions = questions[:limit]
+    return render_template('admin_questions.html', questions=questions, next_after=next_after, limit=limit)
 @app.route('/admin/question/delete/<int:question_id>', methods=['POST'])
 def delete_question(question_id):
     question = Question.query.get_or_404(question_id)
@@ -1514,13 +1638,65 @@ def validate_question(question_id):
     question.validated_at = datetime.utcnow()
     db.session.commit()
     return redirect(url_for('admin_questions'))
+#Modération en masse : valide, refuse ou supprime plusieurs questions en une seule requête SQL
+#Accepte un formulaire (cases "ids" + bouton "action") ou du JSON {"action": "validate", "ids": [1, 2, 3]}
+@app.route('/admin/questions/bulk', methods=['POST'])
+def bulk_moderate_questions():
+    if request.is_json:
+        data = request.get_json() or {}
+        action = data.get('action')
+        ids = data.get('ids', [])
+    else:
+        action = request.form.get('action')
+        ids = request.form.getlist('ids')
+    try:
+        ids = [int(i) for i in ids]
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Identifiants invalides', 'success': False}), 400
+
+    if action not in ('validate', 'refuse', 'delete'):
+        return jsonify({'error': f'Action inconnue : {action}', 'success': False}), 400
+
+    modifiees = 0
+    if ids:
+        query = Question.query.filter(Question.id.in_(ids))
+        if action == 'validate':
+            modifiees = query.update({Question.valide: True, Question.validated_at: datetime.utcnow()}, synchronize_session=False)
+        elif action == 'refuse':
+            modifiees = query.update({Question.is_refused: True}, synchronize_session=False)
+        else:
+            # query.delete() ne passe pas par les événements ORM qui tiennent l'index FTS à jour
+            desindexer('question', ids)
+            modifiees = query.delete(synchronize_session=False)
+        db.session.commit()
 
+    if request.is_json:
+        return jsonify({'success': True, 'action': action, 'count': modifiees})
+    flash(f"{modifiees} question(s) traitée(s).", "success")
+    return redirect(url_for('admin_questions', after=request.form.get('after', 0, type=int)))
+
+#Recherche plein texte pour les admins : /admin/search?q=retraites&type=questions (ou articles)
+@app.route('/admin/search')
+def admin_search():
+    q = request.args.get('q', '').strip()
+    type_recherche = request.args.get('type', 'questions')
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    if not q:
+        return jsonify({'error': 'Paramètre q manquant', 'success': False}), 400
+    if type_recherche == 'articles':
+        resultats = search_articles(q, limit=limit)
+    else:
+        resultats = search_questions(q, limit=limit)
+    return jsonify({'success': True, 'type': type_recherche, 'query': q, 'results': resultats})
 
-#Importation des actualités via http://localhost:5000/import_articles (ça active la fonction fetch en bas)
+#Importation des actualités via http://localhost:5000/import_articles : la tâche "ingestion" est mise en file,
+#le planificateur (voir scheduler.py et "Tâches de fond" en bas) l'exécute en arrière-plan
 @app.route('/import_articles') 
 def import_articles():
-    fetch_and_process_articles()
-    flash("Importation des articles et génération des questions terminée !", "success")
+    if scheduler.enqueue('ingestion'):
+        flash("Importation des articles lancée en arrière-plan, les questions arriveront dans quelques minutes", "success")
+    else:
+        flash("Une importation des articles est déjà en cours", "info")
     return redirect(url_for('dashboard'))
 
 #Pour voir quelles routes sont actives ou pas
@@ -1536,6 +1712,36 @@ def debug_routes():
     # Option 1: Retourner en JSON
     return jsonify(sorted(routes, key=lambda x: x["rule"]))
 
+#Rapport du nombre de requêtes SQL et du temps passé en base, par route (texte SQL compris : mode debug seulement)
+@app.route('/debug_queries')
+def debug_queries():
+    if not app.debug:
+        abort(404)
+    return jsonify(query_report())
+
+#Dernier run et état des tâches de fond (import des articles, actualités)
+@app.route('/debug_scheduler')
+def debug_scheduler():
+    return jsonify(scheduler.stats())
+
+#Derniers runs d'ingestion (compteurs, temps par étape) et file des articles en échec ("flask ingest-retry")
+@app.route('/debug_ingestion')
+def debug_ingestion():
+    return jsonify(bilan_ingestion())
+
+#Âge et état du cache des actualités (stale-while-revalidate) et statistiques du backend de cache
+@app.route('/debug_cache')
+def debug_cache():
+    backend = cache.cache
+    return jsonify(dict(
+        news_cache.stats(),
+        resumes=RESUMES_STATS,
+        niveaux_resume=resumeur.stats(),
+        newsapi=news_source.stats(),
+        newsapi_ingestion=ingestion_source.stats(),
+        backend=backend.stats() if hasattr(backend, 'stats') else type(backend).__name__,
+    ))
+
 
 # ======================================================
 # ===  Récupération Actualité + Analyse avec Ollama  ===
@@ -1557,184 +1763,20 @@ def extract_json_from_text(text):
         print(f"Erreur lors du décodage du JSON : {e}")
         return None
 
-# Fonction pour parser le JSON généré par Ollama
-def clean_and_parse_json(raw_text):
-    import re
-    # Nettoyer le texte pour retirer les backticks et autres caractères non JSON
-    cleaned_text = raw_text.strip()
-    if cleaned_text.startswith('```json'):
-        cleaned_text = cleaned_text[len('```json'):].strip()  # Enlève les backticks du début
-    if cleaned_text.endswith('```'):
-        cleaned_text = cleaned_text[:-3].strip()  # Enlève les backticks de fin
-
-    # Cherche le vrai bloc JSON
-    json_match = re.search(r'\{.*', cleaned_text, re.DOTALL)
-    if not json_match:
-        print("Aucun bloc JSON détecté")
-        return None
-
-    json_str = json_match.group(0).strip()
-
-    # Si ça finit pas par }, on le ferme manuellement
-    if not json_str.endswith('}'):
-        json_str += '}'
-
-    # Essayer de parser le JSON
-    try:
-        return json.loads(json_str)
-    except json.JSONDecodeError as e:
-        print(f"Erreur lors du parsing JSON : {e}")
-        print("Contenu en erreur :", json_str)
-        return None
-
 #fonction qui récupère les actus et les donne à Ollama pour quelle renvoie la Question, La catégorie, l'url....
 #ATTENTION INES, j'ai pris un compte avec l'option gratuite on peut pas faire plus de 100 rechercher par jour
 #Il faut aller sur http://localhost:5000/import_articles pour l'activer
 def fetch_and_process_articles():
-    # Initialisation de NewsAPI
-    newsapi = NewsApiClient(api_key='81ab1434b19c4ebb8517769bfbbf6cc9')
-
-    # Dates personnalisées - étendre un peu la plage
-    to_date = datetime.now().strftime('%Y-%m-%d')
-    from_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')  # 15 jours au lieu de 10
-
-    response = newsapi.get_everything(
-        sources='le-monde',
-        from_param=from_date,
-        to=to_date,
-        language='fr',
-        sort_by='publishedAt',
-        page_size=50,
-        page=1
-    )
-
-    articles = response.get('articles', [])
-    results = []
-    articles_traites = 0
-    articles_ignores = 0
-    questions_existantes = 0
-    erreurs = 0
-
-    for article in articles:
-        title = article.get('title', '')
-        content = article.get('content', '') or article.get('description', '') or ''
-        url = article.get('url', '')
-        category = article.get('category', 'Non précisé')
-        published_at = article.get('publishedAt', '')
-
-        if not content or len(content) < 100:  # Éviter les articles trop courts
-            continue
-
-        # 1. Vérifier si l'article existe déjà dans la base de données par URL
-        existing_article = Article.query.filter_by(url=url).first()
-        
-        if existing_article:
-            # 2. Vérifier si des questions ont déjà été générées pour cet article
-            existing_questions = Question.query.filter_by(article_id=existing_article.id).first()
-            if existing_questions:
-                questions_existantes += 1
-                continue  # Article déjà traité avec questions
-            else:
-                # L'article existe mais pas de questions encore - on réutilise l'article
-                article_obj = existing_article
-        else:
-            # 3. Créer un nouvel article s'il n'existe pas
-            article_obj = Article(title=title, content=content, url=url, category=category, published_at=published_at)
-            db.session.add(article_obj)
-            try:
-                db.session.commit()
-            except Exception as e:
-                db.session.rollback()
-                print(f"Erreur lors de la sauvegarde de l'article : {e}")
-                continue
-
-        # 4. Générer des questions avec Ollama - avec un prompt plus précis
-        prompt = f"""
-Tu es un assistant politique. Lis cet article et génère UNE question unique pour connaître l'opinion politique d'une personne sur le sujet.
-
-Règles importantes:
-1. La question doit être clairement liée à un enjeu politique mentionné dans l'article
-2. La question doit être ouverte (pas de réponse par oui/non)
-3. La question doit permettre d'identifier l'orientation politique de la personne
-
-Réponds uniquement en JSON avec les deux clés suivantes : 
-1. "categorie" : catégorie politique (choisis EXACTEMENT une seule parmi: économie, environnement, éducation, santé, affaires internationales, justice, culture, technologie).
-2. "question" : question basée sur l'article, visant à connaître l'opinion d'une personne.
-
-Exemple :
-{{
-    "categorie": "économie",
-    "question": "Quelle est votre opinion sur les réformes fiscales proposées ?"
-}}
-
-Voici l'article : {title} - {content}
-"""
-
-        payload = {
-            "model": "llama3.2",
-            "prompt": prompt,
-            "stream": False
-        }
-
-        try:
-            response = requests.post("http://localhost:11434/api/generate", json=payload)
-            
-            if response.status_code == 200:
-                result_text = response.json().get("response", "").strip()
-                parsed_result = clean_and_parse_json(result_text)
-
-                if not parsed_result:
-                    print(f"Erreur de parsing pour l'article '{title}'")
-                    erreurs += 1
-                    continue
-
-                category = parsed_result.get("categorie", "Non précisé").lower()
-                question = parsed_result.get("question", "Pas de question disponible")
-                
-                # Vérifier que la catégorie est valide
-                categories_valides = ["économie", "environnement", "éducation", "santé", 
-                                    "affaires internationales", "justice", "culture", "technologie"]
-                if category not in categories_valides:
-                    print(f"Catégorie invalide : {category}")
-                    category = "Non précisé"
-                
-                # 5. Vérifier si une question similaire existe déjà
-                question_text_normalized = question.lower().strip()
-                similar_question = Question.query.filter(
-                    func.lower(Question.texte).like(f"%{question_text_normalized[5:35]}%")  # Recherche approximative
-                ).first()
-                
-                if similar_question:
-                    articles_ignores += 1
-                    print(f"Question similaire déjà existante: {question[:30]}...")
-                    continue
-                
-                # 6. Sauvegarder la nouvelle question
-                try:
-                    save_question(question, category, article_obj, title, url, content)
-                    articles_traites += 1
-                    
-                    results.append({
-                        "titre": title,
-                        "url": url,
-                        "article": content,
-                        "ollama_result": {
-                            "categorie": category,
-                            "question": question
-                        }
-                    })
-                except Exception as e:
-                    print(f"Erreur lors de la sauvegarde de la question : {e}")
-                    db.session.rollback()
-            else:
-                print(f"Erreur Ollama pour l'article '{title}': {response.status_code}")
-                erreurs += 1
-        
-        except Exception as e:
-            print(f"Erreur lors du traitement de l'article '{title}': {e}")
-            erreurs += 1
-
-    print(f"✅ Total : {articles_traites} questions générées, {articles_ignores} articles similaires ignorés, {questions_existantes} questions existantes, {erreurs} erreurs")
+    # Même pipeline que "flask ingest" (voir ingest.py), limité à une page et sans checkpoint
+    sources = [SourceFlux(url, etat=etat_flux, session=ingestion_source.session) for url in app.config['SOURCES_RSS']]
+    results, stats = lancer_ingestion(ingestion_source, params_newsapi(jours=30), page_max=1, page_size=50,
+                                      nb_questions=app.config['QUESTIONS_PAR_ARTICLE'],
+                                      seuil_pertinence=app.config['SEUIL_PERTINENCE'],
+                                      distance_doublons=app.config['DOUBLONS_DISTANCE'] if app.config['DOUBLONS_DISTANCE'] >= 0 else None,
+                                      sources=sources)
+    valider_sources(sources)
+    ingestion_source.valider()
+    print(f"✅ Total : {stats} {stats.sources or ''}")
     return results
 
 #Route de test pour le chat pour débat sur le dashboard 
@@ -1903,6 +1945,27 @@ def test_ollama_direct():
 
 
 
+# ==================================
+# ===      Tâches de fond        ===
+# ==================================
+
+#Rafraîchissement planifié des actualités (même reconstruction en arrière-plan que /refresh_actualites)
+def rafraichir_actualites():
+    news_cache.refresh()
+    news_cache.wait()
+
+# Intervalles en secondes (0 = seulement sur demande). Le planificateur tourne dans le process web
+# avec SCHEDULER_ENABLED=1, ou dans un worker séparé avec "flask scheduler".
+app.config['SCHEDULER_ENABLED'] = os.environ.get('SCHEDULER_ENABLED', '0') == '1'
+app.config['INGESTION_INTERVAL'] = int(os.environ.get('INGESTION_INTERVAL', 86400))  # 100 requêtes NewsAPI par jour
+app.config['NEWS_REFRESH_INTERVAL'] = int(os.environ.get('NEWS_REFRESH_INTERVAL', 86400))
+scheduler = Scheduler(stockage_persistant, app)
+scheduler.add_job('ingestion', fetch_and_process_articles, intervalle=app.config['INGESTION_INTERVAL'] or None, lease=3600)
+scheduler.add_job('actualites', rafraichir_actualites, intervalle=app.config['NEWS_REFRESH_INTERVAL'] or None, lease=900)
+if app.config['SCHEDULER_ENABLED']:
+    scheduler.start()
+
+
 # ==================================
 # === Lancement de l'application ===
 # ==================================
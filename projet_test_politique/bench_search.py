@@ -0,0 +1,64 @@
+# Benchmark de la recherche plein texte (FTS5) contre l'ancien LIKE '%…%' sur Question.texte
+# Lancer avec : python bench_search.py [nb_lignes]
+import os
+import random
+import sys
+import tempfile
+import time
+
+from flask import Flask
+
+import search
+from models import db, Question
+
+MOTS = ("gouvernement réforme assemblée nationale budget sénat ministre élection président loi "
+        "retraites économie climat énergie école hôpital justice sécurité europe ukraine "
+        "débat vote opposition majorité syndicats grève inflation salaires impôts dette "
+        "agriculteurs police immigration logement transports numérique santé culture").split()
+# Vocabulaire plus large (noms propres, lieux...) tiré selon une loi de Zipf, comme dans de vrais titres
+RARES = [f"mot{i}" for i in range(20000)]
+
+
+def texte_aleatoire(rng):
+    mots = [rng.choice(MOTS) for _ in range(5)]
+    mots += [RARES[min(int(rng.paretovariate(1.0)) - 1, len(RARES) - 1)] if rng.random() < 0.3
+             else rng.choice(RARES) for _ in range(10)]
+    rng.shuffle(mots)
+    return " ".join(mots)
+
+
+def chronometrer(fonction, repetitions=20):
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        durees.append(time.perf_counter() - debut)
+    durees.sort()
+    return durees[len(durees) // 2] * 1000
+
+
+if __name__ == '__main__':
+    nb_lignes = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = random.Random(1)
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        db.session.execute(Question.__table__.insert(), [
+            {"texte": "Que pensez-vous de " + texte_aleatoire(rng) + " ?",
+             "categorie": "économie"}
+            for _ in range(nb_lignes)
+        ])
+        db.session.commit()
+        debut = time.perf_counter()
+        search.init_search(app)  # tables absentes : création + indexation complète
+        print(f"Indexation de {nb_lignes} questions : {time.perf_counter() - debut:.1f}s")
+
+        requete = "réforme des retraites et syndicats"
+        candidat = "Que pensez-vous de la réforme des retraites voulue par le gouvernement ?"
+        print(f"search_questions (FTS5, bm25)  : {chronometrer(lambda: search.search_questions(requete)):.2f} ms")
+        print(f"find_similar_question (FTS5)   : {chronometrer(lambda: search.find_similar_question(candidat)):.2f} ms")
+        like = candidat.lower()[5:35]
+        print(f"ancien LIKE '%…%'              : "
+              f"{chronometrer(lambda: Question.query.filter(db.func.lower(Question.texte).like(f'%{like}%')).first()):.2f} ms")
@@ -0,0 +1,56 @@
+# Benchmark de la détection des quasi-doublons : index SimHash par bandes contre un parcours de toutes les signatures
+# Lancer avec : python bench_simhash.py [nb_articles]
+import random
+import sys
+import time
+
+from bench_search import texte_aleatoire
+from simhash import IndexSimHash, signature, distance
+
+
+def chronometrer(fonction, requetes):
+    durees = []
+    for requete in requetes:
+        debut = time.perf_counter()
+        fonction(requete)
+        durees.append(time.perf_counter() - debut)
+    durees.sort()
+    return durees[len(durees) // 2] * 1000
+
+
+def parcours_complet(signatures, distance_max):
+    def chercher(sig):
+        meilleur = None
+        for identifiant, autre in signatures.items():
+            d = distance(sig, autre)
+            if d <= distance_max and (meilleur is None or d < meilleur[1]):
+                meilleur = (identifiant, d)
+        return meilleur
+    return chercher
+
+
+if __name__ == '__main__':
+    nb_articles = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = random.Random(1)
+    textes = [texte_aleatoire(rng) for _ in range(nb_articles)]
+
+    debut = time.perf_counter()
+    signatures = {i: signature(texte) for i, texte in enumerate(textes)}
+    print(f"Signature de {nb_articles} articles : {time.perf_counter() - debut:.1f}s")
+
+    for distance_max in (3, 5):
+        index = IndexSimHash(distance_max)
+        debut = time.perf_counter()
+        for identifiant, sig in signatures.items():
+            index.ajouter(identifiant, sig)
+        print(f"\ndistance <= {distance_max} : index construit en {time.perf_counter() - debut:.2f}s")
+
+        # Moitié de nouveaux articles, moitié de mises à jour d'articles existants (un mot ajouté)
+        requetes = [signature(texte_aleatoire(rng)) for _ in range(100)]
+        requetes += [signature(textes[rng.randrange(nb_articles)] + " direct") for _ in range(100)]
+        trouves = sum(index.plus_proche(r) is not None for r in requetes)
+        candidats = sum(len(index.candidats(r)) for r in requetes) / len(requetes)
+        print(f"  quasi-doublons trouvés     : {trouves}/{len(requetes)} ({candidats:.0f} candidats comparés en moyenne)")
+        print(f"  recherche indexée (médiane): {chronometrer(index.plus_proche, requetes):.3f} ms")
+        print(f"  parcours complet (médiane) : "
+              f"{chronometrer(parcours_complet(signatures, distance_max), requetes[:20]):.1f} ms")
@@ -0,0 +1,71 @@
+# Benchmark de concurrence sur save_answer : compare les profils SQLite de db_config.py
+# Lancer avec : python bench_sqlite_profiles.py [nb_threads] [reponses_par_thread]
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from flask import Flask
+
+from db_config import SQLITE_PROFILES, configure_sqlite_engine, apply_sqlite_pragmas, sqlite_pragma_status
+from models import db, User, Question
+from my_database import save_answer
+
+
+def creer_app(profil, chemin_db):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + chemin_db
+    app.config['SQLITE_PROFILE'] = profil
+    configure_sqlite_engine(app)
+    db.init_app(app)
+    apply_sqlite_pragmas(app, db)
+    return app
+
+
+def preparer_donnees(app, nb_users, nb_questions):
+    with app.app_context():
+        db.create_all()
+        for i in range(nb_users):
+            user = User(username=f'bench{i}', email=f'bench{i}@example.com')
+            db.session.add(user)
+        for i in range(nb_questions):
+            db.session.add(Question(texte=f'Question {i}', categorie='économie', valide=True))
+        db.session.commit()
+        return [u.id for u in User.query.all()], [q.id for q in Question.query.all()]
+
+
+def lancer_profil(profil, nb_threads, reponses_par_thread):
+    dossier = tempfile.mkdtemp(prefix=f'bench_{profil}_')
+    app = creer_app(profil, os.path.join(dossier, 'bench.db'))
+    user_ids, question_ids = preparer_donnees(app, nb_threads, reponses_par_thread)
+    echecs = []
+
+    def worker(user_id):
+        with app.app_context():
+            for question_id in question_ids:
+                if not save_answer(user_id, question_id, f'Réponse de {user_id}'):
+                    echecs.append(question_id)
+            db.session.remove()
+
+    threads = [threading.Thread(target=worker, args=(uid,)) for uid in user_ids]
+    debut = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    duree = time.perf_counter() - debut
+
+    total = nb_threads * reponses_par_thread
+    pragmas = sqlite_pragma_status(app, db)
+    print(f"\n--- Profil : {profil} ---")
+    print(f"journal_mode={pragmas['journal_mode']} synchronous={pragmas['synchronous']} busy_timeout={pragmas['busy_timeout']}")
+    print(f"{total} save_answer en {duree:.2f}s -> {total / duree:.0f} écritures/s")
+    print(f"Échecs (database is locked, etc.) : {len(echecs)}")
+
+
+if __name__ == '__main__':
+    nb_threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    reponses_par_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    for profil in SQLITE_PROFILES:
+        lancer_profil(profil, nb_threads, reponses_par_thread)
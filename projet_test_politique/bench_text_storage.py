@@ -0,0 +1,74 @@
+# Benchmark du stockage des gros textes : taille de la base et temps de chargement des listes,
+# avec / sans compression (CompressedText) et avec / sans chargement différé des colonnes.
+# Lancer avec : python bench_text_storage.py [nb_articles]
+import os
+import random
+import sys
+import tempfile
+import time
+
+from flask import Flask
+from sqlalchemy.orm import joinedload, undefer
+
+from models import db, Article, Question, AnalysePolitique, User, configure_text_compression
+
+MOTS = ("gouvernement réforme assemblée nationale budget sénat ministre élection président loi "
+        "retraites économie climat énergie école hôpital justice sécurité europe ukraine "
+        "débat vote opposition majorité syndicats grève inflation salaires impôts dette").split()
+
+
+def texte_aleatoire(rng, nb_mots):
+    return " ".join(rng.choice(MOTS) for _ in range(nb_mots))
+
+
+def creer_base(algorithm, nb_articles):
+    configure_text_compression(algorithm)
+    dossier = tempfile.mkdtemp(prefix=f'bench_text_{algorithm}_')
+    chemin = os.path.join(dossier, 'bench.db')
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + chemin
+    db.init_app(app)
+    rng = random.Random(42)
+    with app.app_context():
+        db.create_all()
+        user = User(username='bench', email='bench@example.com')
+        db.session.add(user)
+        db.session.flush()
+        for i in range(nb_articles):
+            article = Article(title=texte_aleatoire(rng, 12), content=texte_aleatoire(rng, 600),
+                              url=f'https://example.com/{i}', category='économie', published_at='2025-05-01')
+            db.session.add(article)
+            db.session.flush()
+            db.session.add(Question(texte=texte_aleatoire(rng, 20), categorie='économie', article_id=article.id))
+            db.session.add(AnalysePolitique(user_id=user.id, analyse_text=texte_aleatoire(rng, 300)))
+        db.session.commit()
+        db.session.execute(db.text('VACUUM'))
+    return app, chemin
+
+
+def chronometrer(app, fonction, repetitions=5):
+    meilleur = None
+    with app.app_context():
+        for _ in range(repetitions):
+            db.session.expunge_all()
+            debut = time.perf_counter()
+            fonction()
+            duree = time.perf_counter() - debut
+            meilleur = duree if meilleur is None else min(meilleur, duree)
+    return meilleur * 1000
+
+
+if __name__ == '__main__':
+    nb_articles = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    for algorithm in ('none', 'zlib'):
+        app, chemin = creer_base(algorithm, nb_articles)
+        print(f"\n--- Stockage : {algorithm} ({nb_articles} articles + analyses) ---")
+        print(f"Taille de la base : {os.path.getsize(chemin) / 1024:.0f} Kio")
+
+        liste_differee = chronometrer(app, lambda: [q.article.title for q in Question.query.options(joinedload(Question.article)).all()])
+        liste_complete = chronometrer(app, lambda: [q.article.title for q in Question.query.options(joinedload(Question.article).undefer(Article.content)).all()])
+        print(f"Liste admin (questions + titres) : {liste_differee:.1f} ms différé / {liste_complete:.1f} ms avec content")
+
+        historique_differe = chronometrer(app, lambda: [a.date_creation for a in AnalysePolitique.query.all()])
+        historique_complet = chronometrer(app, lambda: [a.date_creation for a in AnalysePolitique.query.options(undefer(AnalysePolitique.analyse_text)).all()])
+        print(f"Historique des analyses : {historique_differe:.1f} ms différé / {historique_complet:.1f} ms avec analyse_text")
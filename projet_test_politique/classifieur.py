@@ -0,0 +1,166 @@
+"""
+Classement local des actualités dans les 8 catégories du site, sans appel réseau ni LLM.
+
+Chaque catégorie a un lexique pondéré. Tous les termes sont compilés dans UNE expression régulière
+(un automate) : le texte est parcouru une seule fois, chaque terme trouvé ajoute son poids aux
+catégories qui le contiennent (double poids dans le titre).
+
+- Les textes sont comparés sans accents ni majuscules, en mots entiers (plus de "loi" trouvé dans "emploi").
+- Un terme qui finit par "*" est un préfixe : "econom*" couvre économie, économique, économiste...
+- classer() renvoie les meilleures catégories d'un article (multi-étiquettes), avec un seuil et une limite
+  par article.
+
+Le même mécanisme sert au filtre de pertinence de l'ingestion (ScoreurPertinence) : avant tout appel
+à Ollama, un modèle linéaire (lexique politique positif, sport / divertissement / direct négatifs,
+plus les scores des catégories) donne une probabilité qu'un article fasse une bonne question politique.
+"""
+import math
+import re
+import unicodedata
+from collections import defaultdict
+
+# Lexiques pondérés (sans accents). Ordre des catégories = ordre d'affichage sur la page d'accueil.
+CATEGORIES_ACTUALITES = {
+    'Affaires internationales': {
+        'international*': 2, 'diplomat*': 3, 'etranger*': 1, 'conflit*': 2, 'guerre': 3, 'otan': 3, 'onu': 3,
+        'ukraine': 3, 'russie': 3, 'gaza': 3, 'israel': 3, 'chine': 2, 'etats-unis': 2, 'sommet': 1,
+        'ambassad*': 2, 'sanction*': 2, 'cessez-le-feu': 3, 'union europeenne': 2, 'monde': 1,
+    },
+    'Économie': {
+        'econom*': 3, 'financ*': 2, 'marche': 1, 'marches': 1, 'entreprise*': 2, 'emploi*': 2, 'chomage': 3,
+        'croissance': 2, 'inflation': 3, 'budget*': 2, 'impot*': 3, 'fiscal*': 3, 'bourse': 2, 'salaire*': 2,
+        'dette': 2, 'pib': 3, 'industri*': 2, 'commerce': 1, 'droits de douane': 3,
+    },
+    'Environnement': {
+        'environnement*': 3, 'ecolog*': 3, 'climat*': 3, 'energ*': 2, 'pollution': 3, 'biodiversite': 3,
+        'rechauffement': 3, 'carbone': 2, 'secheresse': 2, 'inondation*': 2, 'nucleaire': 2, 'renouvelable*': 2,
+        'agricult*': 1, 'pesticide*': 3,
+    },
+    'Éducation': {
+        'education': 3, 'ecole*': 3, 'universit*': 3, 'enseignan*': 3, 'enseignement': 3, 'formation': 1,
+        'etudiant*': 3, 'eleve*': 3, 'lycee*': 3, 'college*': 2, 'baccalaureat': 3, 'bac': 2, 'professeur*': 2,
+        'parcoursup': 3,
+    },
+    'Santé': {
+        'sante': 3, 'medic*': 2, 'hopita*': 3, 'maladie*': 2, 'vaccin*': 3, 'bien-etre': 1, 'soins': 2,
+        'patient*': 2, 'epidemi*': 3, 'medecin*': 3, 'urgences': 2, 'cancer': 2, 'securite sociale': 2,
+    },
+    'Justice': {
+        'justice': 3, 'droit': 1, 'loi': 1, 'tribunal': 3, 'crime*': 2, 'securite': 1, 'proces': 3, 'juge*': 2,
+        'condamn*': 3, 'prison*': 3, 'avocat*': 2, 'enquete': 1, 'police*': 2, 'garde a vue': 3, 'mis en examen': 3,
+        'conseil constitutionnel': 3,
+    },
+    'Culture': {
+        'culture*': 3, 'culturel*': 3, 'art': 2, 'artiste*': 3, 'musique': 3, 'cinema': 3, 'film': 2, 'livre*': 2,
+        'exposition*': 3, 'musee*': 3, 'festival': 2, 'theatre': 3, 'litterat*': 3, 'patrimoine': 2, 'concert*': 2,
+    },
+    'Technologie': {
+        'technolog*': 3, 'numerique': 3, 'internet': 2, 'intelligence artificielle': 3, 'ia': 2, 'innovation': 2,
+        'science*': 1, 'scientifique*': 1, 'cyber*': 3, 'donnees personnelles': 3, 'reseaux sociaux': 2,
+        'algorithme*': 2, 'start-up': 2, 'spatial*': 2, 'robot*': 2,
+    },
+}
+
+POIDS_TITRE = 2
+
+
+def normaliser(texte):
+    """Minuscules, sans accents (même normalisation pour les lexiques et les textes)."""
+    texte = unicodedata.normalize('NFKD', texte or '').encode('ascii', 'ignore').decode('ascii')
+    return texte.lower()
+
+
+class Classifieur:
+    """Lexiques compilés une fois : un seul passage de regex par texte, quel que soit le nombre de catégories."""
+
+    def __init__(self, lexiques=CATEGORIES_ACTUALITES):
+        self.categories = list(lexiques)
+        self._exacts = defaultdict(list)    # terme -> [(catégorie, poids)]
+        self._prefixes = defaultdict(list)  # préfixe -> [(catégorie, poids)]
+        for categorie, lexique in lexiques.items():
+            for terme, poids in lexique.items():
+                terme = normaliser(terme)
+                if terme.endswith('*'):
+                    self._prefixes[terme[:-1]].append((categorie, poids))
+                else:
+                    self._exacts[terme].append((categorie, poids))
+        # Les plus longs d'abord : "union europeenne" avant "union", "etudiant*" avant "etu*"...
+        alternatives = sorted(
+            [re.escape(t) for t in self._exacts] + [re.escape(p) + r'[\w-]*' for p in self._prefixes],
+            key=len, reverse=True,
+        )
+        self._motif = re.compile(r'(?<![\w-])(?:' + '|'.join(alternatives) + r')(?![\w-])')
+        self._longueurs_prefixes = sorted({len(p) for p in self._prefixes}, reverse=True)
+
+    def _poids(self, trouve):
+        if trouve in self._exacts:
+            return self._exacts[trouve]
+        for longueur in self._longueurs_prefixes:
+            if trouve[:longueur] in self._prefixes:
+                return self._prefixes[trouve[:longueur]]
+        return ()
+
+    def scores(self, titre, contenu=''):
+        """Score de chaque catégorie présente dans le texte : dict catégorie -> somme des poids."""
+        scores = defaultdict(float)
+        for texte, facteur in ((titre, POIDS_TITRE), (contenu, 1)):
+            for trouve in self._motif.findall(normaliser(texte)):
+                for categorie, poids in self._poids(trouve):
+                    scores[categorie] += poids * facteur
+        return dict(scores)
+
+    def classer(self, titre, contenu='', max_categories=2, seuil=3, ratio=0.5):
+        """
+        Meilleures catégories de l'article, de la plus probable à la moins probable.
+        Une catégorie est retenue si son score atteint `seuil` et au moins `ratio` fois le meilleur score.
+        """
+        scores = self.scores(titre, contenu)
+        if not scores:
+            return []
+        meilleur = max(scores.values())
+        retenues = [c for c, s in sorted(scores.items(), key=lambda cs: (-cs[1], self.categories.index(cs[0])))
+                    if s >= seuil and s >= ratio * meilleur]
+        return retenues[:max_categories]
+
+
+classifieur = Classifieur()
+
+
+# Lexique du filtre de pertinence : poids positifs = enjeu politique, négatifs = hors sujet pour le quiz
+LEXIQUE_PERTINENCE = {
+    'gouvernement*': 3, 'ministre*': 3, 'ministere*': 2, 'premier ministre': 2, 'assemblee nationale': 3,
+    'senat*': 3, 'depute*': 3, 'parlement*': 3, 'election*': 3, 'electora*': 3, 'scrutin': 3, 'vote*': 2,
+    'referendum': 3, 'reforme*': 3, 'projet de loi': 3, 'loi': 2, 'proposition de loi': 3, 'politique*': 3,
+    'parti': 2, 'partis': 2, 'opposition': 2, 'majorite': 2, 'president*': 1, 'elysee': 2, 'matignon': 3,
+    'syndicat*': 2, 'greve*': 2, 'manifestation*': 2, 'immigration': 3, 'retraite*': 2, 'maire*': 1,
+    'municipal*': 2, 'debat*': 2, 'laicite': 3, 'service public': 2, 'subvention*': 2, 'taxe*': 2,
+    # Hors sujet
+    'football': -4, 'footballeur*': -4, 'match': -2, 'matchs': -2, 'ligue des champions': -4, 'ligue 1': -4,
+    'mbappe': -4, 'psg': -3, 'real madrid': -4, 'tennis': -4, 'rugby': -3, 'cyclisme': -3, 'tour de france': -3,
+    'sport*': -3, 'buteur': -3, 'entraineur': -3, 'people': -3, 'serie': -2, 'series': -2, 'netflix': -3,
+    'recette*': -4, 'cuisine': -2, 'gastronomie': -2, 'horoscope': -5, 'meteo': -3, 'mots croises': -5,
+    'jeu-concours': -4, 'bon plan': -4, 'bons plans': -4, 'soldes': -3, 'en direct': -6, 'live': -3,
+    'podcast': -2, 'critique': -1, 'tele': -2, 'telerealite': -4,
+}
+
+
+class ScoreurPertinence:
+    """
+    Probabilité (0 à 1) qu'un article fasse une bonne question politique :
+    sigmoïde(biais + lexique de pertinence + poids_categories x meilleur score de catégorie).
+    """
+
+    def __init__(self, lexique=LEXIQUE_PERTINENCE, biais=-2.0, poids_categories=0.5, echelle=3.0, categories=None):
+        self._lexique = Classifieur({'pertinence': lexique})
+        self._categories = categories or classifieur
+        self.biais = biais
+        self.poids_categories = poids_categories
+        self.echelle = echelle
+
+    def score(self, titre, contenu=''):
+        brut = self.biais + self._lexique.scores(titre, contenu).get('pertinence', 0)
+        brut += self.poids_categories * max(self._categories.scores(titre, contenu).values(), default=0)
+        return 1 / (1 + math.exp(-brut / self.echelle))
+
+
+scoreur_pertinence = ScoreurPertinence()
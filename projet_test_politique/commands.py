@@ -0,0 +1,162 @@
+"""
+Commandes de maintenance lancées avec "flask <groupe> <commande>".
+Exemples : flask analyses backfill, flask articles dedupe --dry-run, flask data purge --yes
+(l'import des articles, "flask ingest", est dans ingest.py ; le worker des tâches de fond, "flask scheduler", dans scheduler.py)
+
+Les suppressions se font par lots (un commit par lot) pour ne pas bloquer la base
+pendant des minutes quand les tables sont grosses.
+"""
+import click
+from flask.cli import AppGroup
+from sqlalchemy import text
+from sqlalchemy.orm import undefer
+
+from models import db, AnalysePolitique, Article
+from search import desindexer
+from simhash import signature, vers_sqlite
+from ingest import ingest_command, ingest_retry_command, ingest_relevance_command
+from scheduler import scheduler_command
+
+analyses_cli = AppGroup('analyses', help="Maintenance des analyses politiques.")
+articles_cli = AppGroup('articles', help="Maintenance des articles importés.")
+data_cli = AppGroup('data', help="Maintenance des données du quiz.")
+
+# Articles en double (même URL) : on garde le plus ancien (id le plus petit) de chaque groupe
+DOUBLONS_ARTICLES_SQL = """
+    SELECT id, url, keeper_id FROM (
+        SELECT id, url,
+               FIRST_VALUE(id) OVER (PARTITION BY url ORDER BY id) AS keeper_id,
+               ROW_NUMBER() OVER (PARTITION BY url ORDER BY id) AS rang
+        FROM article
+        WHERE url IS NOT NULL AND url != ''
+    ) WHERE rang > 1
+    ORDER BY id
+"""
+
+
+@analyses_cli.command('backfill')
+@click.option('--batch-size', default=200, show_default=True, help="Nombre d'analyses traitées par commit.")
+def backfill_analyses(batch_size):
+    """Remplit les champs structurés (parti, orientation, valeurs, pourcentages...) des analyses existantes."""
+    total = 0
+    while True:
+        analyses = AnalysePolitique.query.options(undefer(AnalysePolitique.analyse_text)).filter(
+            (AnalysePolitique.champs_extraits == False) | (AnalysePolitique.champs_extraits.is_(None))
+        ).order_by(AnalysePolitique.id).limit(batch_size).all()
+        if not analyses:
+            break
+        for analyse in analyses:
+            analyse.extract_structured_fields()
+        db.session.commit()
+        total += len(analyses)
+        click.echo(f"{total} analyses traitées...")
+    click.echo(f"✅ Backfill terminé : {total} analyses mises à jour.")
+
+
+def _delete_in_batches(table, batch_size, label, indexee=False):
+    """
+    Supprime toutes les lignes de `table` par lots de `batch_size`, un commit par lot
+    (`indexee` : la table a un index plein texte à tenir à jour, voir search.py).
+    """
+    total = db.session.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+    supprimees = 0
+    lot = f"SELECT id FROM {table} ORDER BY id LIMIT :n"
+    while True:
+        if indexee:
+            desindexer(table, sous_requete=lot, params={"n": batch_size})
+        resultat = db.session.execute(text(f"DELETE FROM {table} WHERE id IN ({lot})"), {"n": batch_size})
+        db.session.commit()
+        if not resultat.rowcount:
+            break
+        supprimees += resultat.rowcount
+        click.echo(f"  {label} : {supprimees}/{total}")
+    return supprimees
+
+
+@articles_cli.command('dedupe')
+@click.option('--batch-size', default=500, show_default=True, help="Nombre d'articles supprimés par commit.")
+@click.option('--dry-run', is_flag=True, help="Affiche les doublons sans rien modifier.")
+def dedupe_articles(batch_size, dry_run):
+    """Supprime les articles en double (même URL). Les questions sont rattachées à l'article conservé."""
+    click.echo("Recherche des articles en double…")
+    doublons = db.session.execute(text(DOUBLONS_ARTICLES_SQL)).all()
+    click.echo(f"{len(doublons)} articles en double trouvés.")
+    if dry_run:
+        for article_id, url, keeper_id in doublons[:20]:
+            click.echo(f"  article {article_id} -> conservé {keeper_id} ({url})")
+        if len(doublons) > 20:
+            click.echo(f"  … et {len(doublons) - 20} autres")
+        click.echo("Dry run : aucune modification.")
+        return
+
+    for debut in range(0, len(doublons), batch_size):
+        lot = doublons[debut:debut + batch_size]
+        ids = ', '.join(str(int(article_id)) for article_id, _, _ in lot)
+        # Rattache les questions du lot à l'article conservé (le plus petit id de la même URL)
+        db.session.execute(text(f"""
+            UPDATE question SET article_id = (
+                SELECT MIN(a2.id) FROM article a2
+                WHERE a2.url = (SELECT a1.url FROM article a1 WHERE a1.id = question.article_id)
+            ) WHERE article_id IN ({ids})
+        """))
+        desindexer('article', [article_id for article_id, _, _ in lot])
+        db.session.execute(text(f"DELETE FROM article WHERE id IN ({ids})"))
+        db.session.commit()
+        click.echo(f"  {debut + len(lot)}/{len(doublons)} articles supprimés")
+    click.echo("✅ Articles en double supprimés avec succès.")
+
+
+@data_cli.command('purge')
+@click.option('--batch-size', default=1000, show_default=True, help="Nombre de lignes supprimées par commit.")
+@click.option('--dry-run', is_flag=True, help="Affiche ce qui serait supprimé sans rien modifier.")
+@click.option('--yes', is_flag=True, help="Ne pas demander de confirmation.")
+def purge_data(batch_size, dry_run, yes):
+    """Supprime toutes les réponses puis toutes les questions (remplace l'ancien delete_data.py)."""
+    nb_reponses = db.session.execute(text("SELECT COUNT(*) FROM reponse")).scalar()
+    nb_questions = db.session.execute(text("SELECT COUNT(*) FROM question")).scalar()
+    click.echo(f"{nb_reponses} réponses et {nb_questions} questions à supprimer.")
+    if dry_run:
+        click.echo("Dry run : aucune modification.")
+        return
+    if not yes:
+        click.confirm("Confirmer la suppression ?", abort=True)
+
+    # Suppression des réponses d'abord (elles dépendent des questions)
+    _delete_in_batches('reponse', batch_size, "Réponses")
+    _delete_in_batches('question', batch_size, "Questions", indexee=True)
+
+    # Vérification
+    click.echo("✅ Suppression terminée.")
+    click.echo(f"Questions restantes : {db.session.execute(text('SELECT COUNT(*) FROM question')).scalar()}")
+    click.echo(f"Réponses restantes : {db.session.execute(text('SELECT COUNT(*) FROM reponse')).scalar()}")
+
+
+@articles_cli.command('simhash')
+@click.option('--batch-size', default=500, show_default=True, help="Nombre d'articles traités par commit.")
+def simhash_articles(batch_size):
+    """Calcule la signature SimHash (détection des quasi-doublons) des articles qui n'en ont pas."""
+    total = 0
+    dernier_id = 0
+    while True:
+        articles = Article.query.options(undefer(Article.content)).filter(
+            Article.simhash.is_(None), Article.id > dernier_id
+        ).order_by(Article.id).limit(batch_size).all()
+        if not articles:
+            break
+        for article in articles:
+            article.simhash = vers_sqlite(signature(article.title, article.content))
+        dernier_id = articles[-1].id
+        db.session.commit()
+        total += len(articles)
+        click.echo(f"  {total} articles signés")
+    click.echo(f"✅ {total} signatures calculées.")
+
+
+def register_commands(app):
+    app.cli.add_command(analyses_cli)
+    app.cli.add_command(articles_cli)
+    app.cli.add_command(data_cli)
+    app.cli.add_command(ingest_command)
+    app.cli.add_command(ingest_retry_command)
+    app.cli.add_command(ingest_relevance_command)
+    app.cli.add_command(scheduler_command)
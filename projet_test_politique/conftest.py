@@ -0,0 +1,30 @@
+import os
+import tempfile
+
+import pytest
+
+# Base et cache de test isolés : doivent être définis avant le premier "import app"
+_db_dir = tempfile.mkdtemp(prefix='politicool_test_')
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(_db_dir, 'test.db'))
+os.environ.setdefault('CACHE_DIR', os.path.join(_db_dir, 'flask_cache'))
+os.environ.setdefault('NEWSAPI_DIR', os.path.join(_db_dir, 'newsapi'))
+
+from app import app as flask_app, cache, stockage_persistant  # noqa: E402
+from models import db  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    flask_app.config['TESTING'] = True
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+        cache.clear()  # vues du dashboard, actualités... d'un test précédent
+        stockage_persistant.clear()  # sessions et état du planificateur
+        yield flask_app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,79 @@
+"""
+Profils de configuration du moteur SQLite.
+
+- "default"    : comportement historique (journal rollback, pas de busy_timeout).
+- "production" : WAL + synchronous=NORMAL + busy_timeout + mmap/cache, et un pool
+                 de connexions adapté aux workers multi-threads. C'est ce profil qui
+                 évite les "database is locked" quand plusieurs quiz sont soumis en même temps.
+
+Le profil se choisit avec app.config['SQLITE_PROFILE'] (ou la variable d'environnement SQLITE_PROFILE).
+"""
+from sqlalchemy import event
+
+SQLITE_PROFILES = {
+    'default': {
+        'pragmas': {},
+        'engine_options': {},
+    },
+    'production': {
+        'pragmas': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'busy_timeout': 5000,        # ms : attendre le verrou au lieu d'échouer tout de suite
+            'mmap_size': 268435456,      # 256 Mo lus via mmap
+            'cache_size': -64000,        # valeur négative = en Kio, donc ~64 Mo de cache de pages
+            'temp_store': 'MEMORY',
+        },
+        'engine_options': {
+            'pool_size': 10,
+            'max_overflow': 20,
+            'pool_timeout': 30,
+            'pool_pre_ping': True,
+            'connect_args': {
+                'timeout': 5,               # busy timeout côté module sqlite3 (secondes)
+                'check_same_thread': False,  # les connexions du pool passent d'un thread à l'autre
+            },
+        },
+    },
+}
+
+
+def configure_sqlite_engine(app):
+    """A appeler AVANT db.init_app(app) : pose les options de pool du profil choisi."""
+    profil = app.config.setdefault('SQLITE_PROFILE', 'default')
+    if profil not in SQLITE_PROFILES:
+        raise ValueError(f"Profil SQLite inconnu : {profil}")
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    if not uri.startswith('sqlite') or uri in ('sqlite://', 'sqlite:///:memory:'):
+        return  # base en mémoire : Flask-SQLAlchemy impose déjà un StaticPool
+    options = dict(SQLITE_PROFILES[profil]['engine_options'])
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+
+def apply_sqlite_pragmas(app, db):
+    """A appeler APRÈS db.init_app(app) : exécute les PRAGMA du profil à chaque nouvelle connexion."""
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        return
+    pragmas = SQLITE_PROFILES[app.config['SQLITE_PROFILE']]['pragmas']
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for nom, valeur in pragmas.items():
+            cursor.execute(f"PRAGMA {nom}={valeur}")
+        cursor.close()
+
+
+def sqlite_pragma_status(app, db):
+    """Valeurs effectives des PRAGMA sur une connexion du pool (pour vérifier le profil actif)."""
+    with app.app_context():
+        with db.engine.connect() as conn:
+            return {
+                nom: conn.exec_driver_sql(f"PRAGMA {nom}").scalar()
+                for nom in SQLITE_PROFILES['production']['pragmas']
+            }
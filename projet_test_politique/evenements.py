@@ -0,0 +1,17 @@
+"""
+Événements applicatifs (signaux blinker, comme ceux de Flask) qui invalident les caches de vues.
+
+    from evenements import reponses_enregistrees
+    reponses_enregistrees.send(user_id)
+
+Les abonnés (par ex. le cache du tableau de bord dans app.py) reçoivent l'id de l'utilisateur concerné
+comme "sender" ; actualites_rafraichies est envoyé avec sender=None car il touche tout le monde.
+"""
+from blinker import Namespace
+
+_signaux = Namespace()
+
+reponses_enregistrees = _signaux.signal('reponses-enregistrees')
+analyse_modifiee = _signaux.signal('analyse-modifiee')
+preferences_modifiees = _signaux.signal('preferences-modifiees')
+actualites_rafraichies = _signaux.signal('actualites-rafraichies')
@@ -0,0 +1,157 @@
+"""
+Cache HTTP et compression des réponses.
+
+- Compression brotli (si le module est installé) ou gzip des réponses texte (HTML, CSS, JS, JSON, SVG)
+  selon l'en-tête Accept-Encoding ; les fichiers statiques compressés sont gardés en mémoire.
+- ETag faible (empreinte du contenu avant compression) sur les pages et les API JSON en GET :
+  un navigateur qui a déjà la bonne version reçoit un 304 sans corps.
+- @conditional(validateurs) permet à une route de répondre 304 AVANT de calculer la page
+  quand ses validateurs (ETag / Last-Modified) sont connus à l'avance (page d'accueil).
+- Fichiers statiques "fingerprintés" : url_for('static', ...) ajoute ?v=<hash du fichier>,
+  et ces URL sont servies avec Cache-Control: public, max-age=1 an, immutable.
+"""
+import gzip
+import hashlib
+import os
+from functools import wraps
+
+from flask import current_app, make_response, request
+
+try:
+    import brotli  # Optionnel : pip install brotli
+except ImportError:
+    brotli = None
+
+TYPES_COMPRESSIBLES = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+TAILLE_MIN = 500  # en dessous, la compression ne fait rien gagner
+UN_AN = 31536000
+
+_empreintes = {}        # chemin statique -> (mtime, hash court)
+_statiques_compresses = {}  # (chemin, hash, encodage) -> octets compressés
+
+
+def empreinte_statique(app, filename):
+    """Hash court du contenu d'un fichier statique (recalculé seulement si le fichier change)."""
+    chemin = os.path.join(app.static_folder, filename)
+    try:
+        mtime = os.path.getmtime(chemin)
+    except OSError:
+        return None
+    connu = _empreintes.get(chemin)
+    if connu is None or connu[0] != mtime:
+        with open(chemin, 'rb') as f:
+            connu = (mtime, hashlib.sha256(f.read()).hexdigest()[:12])
+        _empreintes[chemin] = connu
+    return connu[1]
+
+
+def choisir_encodage(accept_encoding):
+    if brotli is not None and 'br' in accept_encoding:
+        return 'br'
+    if 'gzip' in accept_encoding:
+        return 'gzip'
+    return None
+
+
+def compresser(data, encodage):
+    if encodage == 'br':
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6)
+
+
+def conditional(validateurs):
+    """
+    Décorateur : validateurs() renvoie (etag, last_modified) ou None si la page ne peut pas être validée
+    à l'avance (par ex. messages flash en attente). Si le navigateur a déjà cette version : 304 sans rendu.
+    """
+    def decorateur(vue):
+        @wraps(vue)
+        def wrapper(*args, **kwargs):
+            valeurs = validateurs()
+            if valeurs is None:
+                return vue(*args, **kwargs)
+            etag, last_modified = valeurs
+            if request.if_none_match.contains_weak(etag) or (
+                not request.if_none_match and last_modified is not None
+                and request.if_modified_since is not None
+                and request.if_modified_since >= last_modified.replace(microsecond=0)
+            ):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(vue(*args, **kwargs))
+            response.set_etag(etag, weak=True)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorateur
+
+
+def init_http_cache(app):
+    """Branche la compression, les ETag et le fingerprinting des fichiers statiques."""
+
+    @app.url_defaults
+    def _fingerprint_static(endpoint, values):
+        if endpoint == 'static' and 'filename' in values and 'v' not in values:
+            empreinte = empreinte_statique(app, values['filename'])
+            if empreinte:
+                values['v'] = empreinte
+
+    @app.after_request
+    def _cache_http(response):
+        if request.endpoint == 'static':
+            if request.args.get('v'):
+                response.cache_control.public = True
+                response.cache_control.max_age = UN_AN
+                response.cache_control.immutable = True
+        elif (request.method == 'GET' and response.status_code == 200 and not response.get_etag()[0]
+              and not response.direct_passthrough and not response.is_streamed
+              and response.mimetype in ('text/html', 'application/json')):
+            # Pages et API : revalidation à chaque visite, mais 304 sans corps si rien n'a changé
+            response.add_etag(weak=True)
+            response.cache_control.no_cache = True
+            if request.cookies.get(app.config['SESSION_COOKIE_NAME']):
+                response.cache_control.private = True  # page personnelle : pas de cache partagé
+            response.make_conditional(request)
+        return _compresser_reponse(app, response)
+
+
+def _compresser_reponse(app, response):
+    if (response.status_code != 200 or 'Content-Encoding' in response.headers
+            or not (response.mimetype or '').startswith(TYPES_COMPRESSIBLES)):
+        return response
+    encodage = choisir_encodage(request.headers.get('Accept-Encoding', ''))
+    response.vary.add('Accept-Encoding')
+    if encodage is None:
+        return response
+
+    if response.direct_passthrough and request.endpoint == 'static':
+        # Fichier statique : compressé une fois par version du fichier
+        filename = request.view_args.get('filename', '')
+        cle = (filename, empreinte_statique(app, filename), encodage)
+        data = _statiques_compresses.get(cle)
+        fichier = response.response
+        response.direct_passthrough = False
+        if data is None:
+            brut = response.get_data()
+            if len(brut) < TAILLE_MIN:
+                return response
+            data = _statiques_compresses[cle] = compresser(brut, encodage)
+        if hasattr(fichier, 'close'):
+            fichier.close()
+    elif response.direct_passthrough or response.is_streamed:
+        return response
+    else:
+        brut = response.get_data()
+        if len(brut) < TAILLE_MIN:
+            return response
+        data = compresser(brut, encodage)
+
+    response.set_data(data)
+    response.headers['Content-Encoding'] = encodage
+    etag, faible = response.get_etag()
+    if etag and not faible:
+        # Un ETag fort désigne des octets précis : il change avec l'encodage
+        response.set_etag(f'{etag}-{encodage}')
+    return response
@@ -0,0 +1,795 @@
+"""
+Pipeline d'ingestion des articles : NewsAPI -> filtrage -> questions Ollama -> base de données.
+
+    flask ingest --pages 2 --workers 4
+    flask ingest --questions-per-article 3     # plusieurs questions candidates par appel Ollama
+
+Chaque étape est un générateur, les articles passent un par un sans jamais tout charger en mémoire :
+
+    pages_newsapi      pages successives de NewsAPI (arrêt à la dernière page ou à la limite du plan)
+    filtrer_articles   articles trop courts / URL déjà traitées (ensemble chargé en UNE requête)
+    filtrer_pertinence articles hors sujet (sport, divertissement, directs...) écartés AVANT Ollama,
+                       d'après le score local de classifieur.ScoreurPertinence
+    filtrer_quasi_doublons  articles presque identiques à un article récent (SimHash + index LSH, simhash.py),
+                       comme les mises à jour successives d'un même direct ; placé après le filtre de
+                       pertinence pour que l'index ne contienne que des articles enregistrés
+    generer_questions  appels Ollama en parallèle (ThreadPoolExecutor), résultats rendus dans l'ordre
+    enregistrer        insertions avec un commit par lot et un checkpoint par page terminée
+
+Le checkpoint (instance/ingest_checkpoint.json) garde la fenêtre de dates et la dernière page
+entièrement enregistrée : après une interruption, "flask ingest" reprend à la page suivante.
+Une page à moitié traitée est refaite ; les URL déjà insérées sont alors écartées par le filtre.
+
+Chaque exécution est enregistrée dans la table IngestionRun (compteurs, temps passé dans chaque étape) ;
+les articles dont la génération échoue vont dans la file FailedArticle avec la réponse brute d'Ollama
+et le type d'erreur, et "flask ingest-retry" ne relance que ceux-là.
+
+NewsAPI est interrogé via news_source.NewsApiSource : seuls les articles plus récents que ceux du run
+précédent sont demandés, et chaque réponse est gardée sur disque. "flask ingest --replay" refait
+tout le traitement à partir de ces réponses, sans appel à NewsAPI.
+
+D'autres sources (flux RSS / Atom, voir sources.py) s'ajoutent à NewsAPI avec "flask ingest --feed URL"
+ou SOURCES_RSS : toutes sont alors récupérées en parallèle (pages_sources) et produisent le même
+article normalisé. Dans ce mode, il n'y a pas de checkpoint de pagination : un run interrompu ne valide
+ni les watermarks ni les ETag, le suivant redemande donc les mêmes articles et le filtre d'URL écarte
+ceux déjà enregistrés.
+"""
+import json
+import os
+import re
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import partial
+
+import click
+import requests
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import func
+
+from models import db, Article, Question, IngestionRun, FailedArticle
+from search import find_similar_question, similarite
+from classifieur import scoreur_pertinence
+from simhash import IndexSimHash, signature, vers_sqlite, depuis_sqlite
+from sources import SourceNewsApi, recuperer_sources
+
+CATEGORIES_VALIDES = ["économie", "environnement", "éducation", "santé",
+                      "affaires internationales", "justice", "culture", "technologie"]
+OLLAMA_URL = "http://localhost:11434/api/generate"
+FIN_DE_PAGE = object()  # marqueur qui traverse le pipeline quand une page NewsAPI est terminée
+
+PROMPT_QUESTION = """
+Tu es un assistant politique. Lis cet article et génère UNE question unique pour connaître l'opinion politique d'une personne sur le sujet.
+
+Règles importantes:
+1. La question doit être clairement liée à un enjeu politique mentionné dans l'article
+2. La question doit être ouverte (pas de réponse par oui/non)
+3. La question doit permettre d'identifier l'orientation politique de la personne
+
+Réponds uniquement en JSON avec les deux clés suivantes :
+1. "categorie" : catégorie politique (choisis EXACTEMENT une seule parmi: économie, environnement, éducation, santé, affaires internationales, justice, culture, technologie).
+2. "question" : question basée sur l'article, visant à connaître l'opinion d'une personne.
+
+Exemple :
+{{
+    "categorie": "économie",
+    "question": "Quelle est votre opinion sur les réformes fiscales proposées ?"
+}}
+
+Voici l'article : {title} - {content}
+"""
+
+# Mode "plusieurs questions par appel" : le coût d'Ollama est surtout la lecture de l'article (le prompt),
+# on en tire donc N questions candidates d'un coup au lieu d'un appel par question
+PROMPT_QUESTIONS = """
+Tu es un assistant politique. Lis cet article et génère {nb} questions DIFFÉRENTES pour connaître l'opinion politique d'une personne sur les enjeux de l'article.
+
+Règles importantes:
+1. Chaque question doit être clairement liée à un enjeu politique mentionné dans l'article
+2. Les questions doivent être ouvertes (pas de réponse par oui/non)
+3. Les questions doivent permettre d'identifier l'orientation politique de la personne
+4. Chaque question aborde un aspect différent de l'article
+
+Réponds uniquement avec un tableau JSON de {nb} objets ayant les deux clés suivantes :
+1. "categorie" : catégorie politique (choisis EXACTEMENT une seule parmi: économie, environnement, éducation, santé, affaires internationales, justice, culture, technologie).
+2. "question" : question basée sur l'article, visant à connaître l'opinion d'une personne.
+
+Exemple :
+[
+    {{"categorie": "économie", "question": "Quelle est votre opinion sur les réformes fiscales proposées ?"}},
+    {{"categorie": "santé", "question": "Comment financer l'hôpital public selon vous ?"}}
+]
+
+Voici l'article : {title} - {content}
+"""
+
+
+class IngestStats:
+    """Compteurs d'une exécution du pipeline."""
+
+    def __init__(self):
+        self.run_id = None
+        self.pages = 0
+        self.recus = 0
+        self.ignores = 0            # trop courts, URL déjà traitée ou en attente dans la file des échecs
+        self.quasi_doublons = 0     # presque identiques à un article récent ou déjà vu dans ce run
+        self.hors_sujet = 0         # écartés par le filtre de pertinence, sans appel à Ollama
+        self.sources = {}           # nom de la source -> stats() de l'adaptateur (appels, réponses 304...)
+        self.questions = 0
+        self.candidats = 0          # questions proposées par Ollama (plusieurs par article en mode multiple)
+        self.similaires = 0
+        self.erreurs = 0
+        self.duree = 0.0
+        # Temps cumulé pour produire les éléments de chaque étape, étapes précédentes comprises (voir chronometrer)
+        self.chronos = {'fetch': 0.0, 'filtre': 0.0, 'llm': 0.0}
+
+    def temps(self):
+        """Temps propre à chaque étape, en secondes (l'enregistrement est le reste de la durée totale)."""
+        return {
+            'fetch': round(self.chronos['fetch'], 3),
+            'filtre': round(max(self.chronos['filtre'] - self.chronos['fetch'], 0), 3),
+            'llm': round(max(self.chronos['llm'] - self.chronos['filtre'], 0), 3),
+            'enregistrement': round(max(self.duree - self.chronos['llm'], 0), 3),
+        }
+
+    def taux_hors_sujet(self):
+        """Part des articles arrivés jusqu'au filtre de pertinence qu'il a écartés."""
+        examines = self.recus - self.ignores - self.quasi_doublons
+        return self.hors_sujet / examines if examines else 0.0
+
+    def __str__(self):
+        temps = ', '.join(f"{etape} {secondes:.1f}s" for etape, secondes in self.temps().items())
+        return (f"{self.pages} pages, {self.recus} articles reçus, {self.ignores} ignorés, "
+                f"{self.quasi_doublons} quasi-doublons, "
+                f"{self.hors_sujet} hors sujet ({self.taux_hors_sujet():.0%}), "
+                f"{self.questions} questions générées sur {self.candidats} proposées, {self.similaires} similaires, {self.erreurs} erreurs ({temps})")
+
+
+class EchecGeneration(Exception):
+    """La génération d'une question a échoué : type d'erreur et réponse brute d'Ollama pour la file des échecs."""
+
+    def __init__(self, type_erreur, message='', reponse_brute=None):
+        super().__init__(message or type_erreur)
+        self.type_erreur = type_erreur
+        self.reponse_brute = reponse_brute
+
+
+# ==========================
+# === Checkpoint (reprise) ===
+# ==========================
+
+def lire_checkpoint(chemin):
+    try:
+        with open(chemin, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def ecrire_checkpoint(chemin, etat):
+    """Écriture atomique : fichier temporaire puis os.replace (un arrêt brutal ne laisse pas un JSON tronqué)."""
+    os.makedirs(os.path.dirname(chemin) or '.', exist_ok=True)
+    temporaire = chemin + '.tmp'
+    with open(temporaire, 'w', encoding='utf-8') as f:
+        json.dump(etat, f)
+    os.replace(temporaire, chemin)
+
+
+# ===============================
+# === Étapes du pipeline ===
+# ===============================
+
+def pages_newsapi(client, params, page_depart=1, page_max=2, page_size=50, stats=None):
+    """
+    Articles normalisés de NewsAPI page par page (chaque page est demandée quand la précédente a été consommée) :
+    yield (page, article), puis (page, FIN_DE_PAGE) à la fin de chaque page.
+    """
+    source = SourceNewsApi(client, params, page_depart, page_max, page_size)
+    for page, articles in source.pages():
+        if stats is not None:
+            stats.pages += 1
+        for article in articles:
+            yield page, article
+        yield page, FIN_DE_PAGE
+
+
+def pages_sources(sources, stats=None):
+    """
+    Articles normalisés de plusieurs sources (sources.py) récupérées en parallèle :
+    yield (nom de la source, article), puis (nom, FIN_DE_PAGE) après chaque page d'une source.
+    """
+    for source, pages in recuperer_sources(sources):
+        for _, articles in pages:
+            if stats is not None:
+                stats.pages += 1
+            for article in articles:
+                yield source.nom, article
+            yield source.nom, FIN_DE_PAGE
+        if stats is not None:
+            stats.sources[source.nom] = source.stats()
+
+
+def charger_urls_connues():
+    """
+    Une seule requête : URL des articles qui ont déjà une question (à ignorer)
+    et articles sans question (à réutiliser), url -> id.
+    Les URL de la file des échecs sont aussi ignorées : c'est "flask ingest-retry" qui les reprend.
+    """
+    lignes = db.session.query(Article.url, Article.id, func.count(Question.id)).outerjoin(
+        Question, Question.article_id == Article.id
+    ).filter(Article.url.isnot(None)).group_by(Article.id).all()
+    traitees = {url for url, _, nb in lignes if nb}
+    sans_question = {url: article_id for url, article_id, nb in lignes if not nb}
+    traitees.update(url for (url,) in db.session.query(FailedArticle.url))
+    return traitees, sans_question
+
+
+def chronometrer(flux, chronos, etape):
+    """Cumule dans chronos[etape] le temps passé à attendre chaque élément du flux."""
+    flux = iter(flux)
+    while True:
+        debut = time.perf_counter()
+        try:
+            element = next(flux)
+        except StopIteration:
+            return
+        finally:
+            chronos[etape] += time.perf_counter() - debut
+        yield element
+
+
+def filtrer_articles(flux, urls_traitees, taille_min=100, stats=None):
+    """Écarte les articles trop courts et ceux dont l'URL a déjà une question (ou a déjà été vue dans ce run)."""
+    for page, article in flux:
+        if article is FIN_DE_PAGE:
+            yield page, article
+            continue
+        if stats is not None:
+            stats.recus += 1
+        url = article['url']
+        if len(article['content']) < taille_min or not url or url in urls_traitees:
+            if stats is not None:
+                stats.ignores += 1
+            continue
+        urls_traitees.add(url)
+        yield page, dict(article)
+
+
+def charger_index_simhash(jours=30, distance_max=5):
+    """Index LSH des signatures des articles enregistrés ces `jours` derniers jours (une requête)."""
+    index = IndexSimHash(distance_max=distance_max)
+    depuis = datetime.utcnow() - timedelta(days=jours)
+    for article_id, valeur in db.session.query(Article.id, Article.simhash).filter(
+            Article.simhash.isnot(None), Article.created_at >= depuis):
+        index.ajouter(article_id, depuis_sqlite(valeur))
+    return index
+
+
+def filtrer_quasi_doublons(flux, index, stats=None):
+    """
+    Écarte les articles presque identiques à un article de l'index (None = filtre désactivé).
+    La signature est gardée dans l'article (enregistrée dans Article.simhash) et ajoutée à l'index,
+    pour écarter aussi les doublons suivants du même run.
+    """
+    for page, article in flux:
+        if article is not FIN_DE_PAGE:
+            article['simhash'] = signature(article['title'], article['content'])
+            if index is not None:
+                proche = index.plus_proche(article['simhash'])
+                if proche is not None:
+                    if stats is not None:
+                        stats.quasi_doublons += 1
+                    print(f"Quasi-doublon (distance {proche[1]}) : {article['title'][:80]}")
+                    continue
+                index.ajouter(article['url'], article['simhash'])
+        yield page, article
+
+
+def filtrer_pertinence(flux, seuil=0.5, scoreur=None, stats=None):
+    """Écarte les articles dont le score de pertinence politique est sous `seuil` (0 = filtre désactivé)."""
+    scoreur = scoreur or scoreur_pertinence
+    for page, article in flux:
+        if article is not FIN_DE_PAGE and seuil:
+            score = scoreur.score(article['title'], article['content'])
+            if score < seuil:
+                if stats is not None:
+                    stats.hors_sujet += 1
+                print(f"Hors sujet (score {score:.2f}) : {article['title'][:80]}")
+                continue
+        yield page, article
+
+
+def clean_and_parse_json(raw_text):
+    """Extrait et parse le bloc JSON d'une réponse d'Ollama (backticks, accolade finale manquante...)."""
+    cleaned_text = raw_text.strip()
+    if cleaned_text.startswith('```json'):
+        cleaned_text = cleaned_text[len('```json'):].strip()  # Enlève les backticks du début
+    if cleaned_text.endswith('```'):
+        cleaned_text = cleaned_text[:-3].strip()  # Enlève les backticks de fin
+
+    # Cherche le vrai bloc JSON
+    json_match = re.search(r'\{.*', cleaned_text, re.DOTALL)
+    if not json_match:
+        print("Aucun bloc JSON détecté")
+        return None
+
+    json_str = json_match.group(0).strip()
+
+    # Si ça finit pas par }, on le ferme manuellement
+    if not json_str.endswith('}'):
+        json_str += '}'
+
+    try:
+        return json.loads(json_str)
+    except json.JSONDecodeError as e:
+        print(f"Erreur lors du parsing JSON : {e}")
+        print("Contenu en erreur :", json_str)
+        return None
+
+
+def generer_question(article, session_http=None):
+    """Demande à Ollama une question (et sa catégorie) sur l'article. Renvoie {categorie, question} ou lève EchecGeneration."""
+    payload = {
+        "model": "llama3.2",
+        "prompt": PROMPT_QUESTION.format(title=article['title'], content=article['content']),
+        "stream": False,
+    }
+    post = session_http.post if session_http is not None else requests.post
+    response = post(OLLAMA_URL, json=payload, timeout=300)
+    if response.status_code != 200:
+        print(f"Erreur Ollama pour l'article '{article['title']}': {response.status_code}")
+        raise EchecGeneration('http', f"statut HTTP {response.status_code}", response.text[:2000])
+    brut = response.json().get("response", "").strip()
+    parsed = clean_and_parse_json(brut)
+    if not parsed:
+        print(f"Erreur de parsing pour l'article '{article['title']}'")
+        raise EchecGeneration('parse', "pas de JSON valide dans la réponse", brut)
+    if not parsed.get("question"):
+        raise EchecGeneration('sans_question', "le JSON ne contient pas de question", brut)
+    categorie = parsed.get("categorie", "Non précisé").lower()
+    if categorie not in CATEGORIES_VALIDES:
+        print(f"Catégorie invalide : {categorie}")
+        categorie = "Non précisé"
+    return {"categorie": categorie, "question": parsed["question"]}
+
+
+def clean_and_parse_json_list(raw_text):
+    """Extrait le tableau JSON d'une réponse d'Ollama ; accepte aussi {"questions": [...]} et un tableau tronqué."""
+    cleaned_text = raw_text.strip().removeprefix('```json').removesuffix('```').strip()
+    debut = min((i for i in (cleaned_text.find('['), cleaned_text.find('{')) if i >= 0), default=-1)
+    if debut < 0:
+        print("Aucun bloc JSON détecté")
+        return None
+    json_str = cleaned_text[debut:]
+    try:
+        parsed, _ = json.JSONDecoder().raw_decode(json_str)
+    except json.JSONDecodeError:
+        # Réponse coupée au milieu : on garde les objets complets
+        complets = json_str[:json_str.rfind('}') + 1]
+        try:
+            parsed = json.loads(complets + ']') if complets.startswith('[') else None
+        except json.JSONDecodeError as e:
+            print(f"Erreur lors du parsing JSON : {e}")
+            return None
+    if isinstance(parsed, dict):
+        parsed = parsed.get('questions', [parsed])
+    return parsed if isinstance(parsed, list) else None
+
+
+def generer_questions_multiples(article, nb=3, session_http=None):
+    """
+    Demande à Ollama `nb` questions candidates sur l'article en un seul appel.
+    Renvoie une liste de {categorie, question} sans quasi-doublons, ou lève EchecGeneration.
+    """
+    payload = {
+        "model": "llama3.2",
+        "prompt": PROMPT_QUESTIONS.format(nb=nb, title=article['title'], content=article['content']),
+        "stream": False,
+    }
+    post = session_http.post if session_http is not None else requests.post
+    response = post(OLLAMA_URL, json=payload, timeout=300)
+    if response.status_code != 200:
+        print(f"Erreur Ollama pour l'article '{article['title']}': {response.status_code}")
+        raise EchecGeneration('http', f"statut HTTP {response.status_code}", response.text[:2000])
+    brut = response.json().get("response", "").strip()
+    parsed = clean_and_parse_json_list(brut)
+    if parsed is None:
+        print(f"Erreur de parsing pour l'article '{article['title']}'")
+        raise EchecGeneration('parse', "pas de tableau JSON valide dans la réponse", brut)
+
+    candidats = []
+    for element in parsed[:nb]:
+        if not isinstance(element, dict) or not str(element.get("question") or "").strip():
+            continue
+        question = str(element["question"]).strip()
+        # Ollama reformule parfois deux fois la même question
+        if any(similarite(question, autre["question"]) >= 0.75 for autre in candidats):
+            continue
+        categorie = str(element.get("categorie") or "Non précisé").lower()
+        if categorie not in CATEGORIES_VALIDES:
+            print(f"Catégorie invalide : {categorie}")
+            categorie = "Non précisé"
+        candidats.append({"categorie": categorie, "question": question})
+    if not candidats:
+        raise EchecGeneration('sans_question', "le tableau JSON ne contient aucune question", brut)
+    return candidats
+
+
+def generer_questions(flux, generateur, workers=4):
+    """
+    Appels Ollama en parallèle sur `workers` threads, avec au plus 2 x workers articles en attente.
+    Les résultats sortent dans l'ordre d'arrivée des articles : yield (page, article, resultat ou EchecGeneration).
+    """
+    if workers <= 1:
+        for page, article in flux:
+            yield page, article, None if article is FIN_DE_PAGE else _appel_sur(generateur, article)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        en_cours = deque()
+        for page, article in flux:
+            # La fin de page reste à sa place dans la file : elle sort après les articles de la page
+            future = None if article is FIN_DE_PAGE else executor.submit(_appel_sur, generateur, article)
+            en_cours.append((page, article, future))
+            if len(en_cours) >= 2 * workers:
+                page_prete, article_pret, future = en_cours.popleft()
+                yield page_prete, article_pret, future.result() if future else None
+        while en_cours:
+            page_prete, article_pret, future = en_cours.popleft()
+            yield page_prete, article_pret, future.result() if future else None
+
+
+def _appel_sur(generateur, article):
+    """Un échec est renvoyé au lieu d'être levé : il part dans la file des échecs sans arrêter le pipeline."""
+    try:
+        resultat = generateur(article)
+    except EchecGeneration as e:
+        return e
+    except requests.exceptions.Timeout as e:
+        return EchecGeneration('timeout', str(e))
+    except requests.exceptions.ConnectionError as e:
+        return EchecGeneration('connexion', str(e))
+    except Exception as e:
+        print(f"Erreur lors du traitement de l'article '{article['title']}': {e}")
+        return EchecGeneration('exception', f"{type(e).__name__}: {e}")
+    if resultat is None:
+        return EchecGeneration('vide', "aucun résultat")
+    return resultat
+
+
+def noter_echec(article, echec, run_id=None):
+    """Met l'article dans la file des échecs, ou met à jour sa ligne (dernière erreur, une tentative de plus)."""
+    ligne = FailedArticle.query.filter_by(url=article['url']).first()
+    if ligne is None:
+        ligne = FailedArticle(url=article['url'], title=(article['title'] or '')[:255], content=article['content'],
+                              category=article['category'], published_at=article['published_at'], attempts=0)
+        db.session.add(ligne)
+    ligne.run_id = run_id
+    ligne.error_type = echec.type_erreur
+    ligne.error_message = str(echec)
+    ligne.raw_response = echec.reponse_brute
+    ligne.attempts += 1
+    ligne.last_attempt_at = datetime.utcnow()
+
+
+def enregistrer(flux, articles_sans_question, taille_lot=20, on_page_terminee=None, stats=None,
+                run_id=None, urls_en_echec=()):
+    """
+    Insère articles et questions, un commit tous les `taille_lot` articles et à chaque fin de page.
+    on_page_terminee(page) est appelé une fois la page entièrement enregistrée (écriture du checkpoint).
+    Les échecs vont dans la file FailedArticle ; un article de `urls_en_echec` traité avec succès en sort.
+    Le résultat d'un article est une question {categorie, question} ou une liste de questions candidates :
+    chacune est enregistrée (non validée, donc dans la file de modération /admin/questions) sauf si elle
+    ressemble à une question existante.
+    Yield chaque question enregistrée (dict) pour que l'appelant puisse suivre la progression.
+    """
+    dans_le_lot = 0
+    for page, article, resultat in flux:
+        if article is FIN_DE_PAGE:
+            db.session.commit()
+            dans_le_lot = 0
+            if on_page_terminee:
+                on_page_terminee(page)
+            continue
+
+        if isinstance(resultat, EchecGeneration):
+            noter_echec(article, resultat, run_id)
+            if stats is not None:
+                stats.erreurs += 1
+            continue
+        if article['url'] in urls_en_echec:
+            FailedArticle.query.filter_by(url=article['url']).delete()
+        article_obj = None
+        for candidat in resultat if isinstance(resultat, list) else [resultat]:
+            if stats is not None:
+                stats.candidats += 1
+            # Question similaire déjà en base (l'index FTS voit aussi les questions flushées de ce lot,
+            # y compris les candidates précédentes du même article)
+            if find_similar_question(candidat['question']):
+                if stats is not None:
+                    stats.similaires += 1
+                print(f"Question similaire déjà existante: {candidat['question'][:30]}...")
+                continue
+
+            if article_obj is None:
+                article_id = articles_sans_question.pop(article['url'], None)
+                if article_id is not None:
+                    article_obj = db.session.get(Article, article_id)
+                else:
+                    article_obj = Article(title=article['title'], content=article['content'], url=article['url'],
+                                          category=article['category'], published_at=article['published_at'])
+                    db.session.add(article_obj)
+                if article_obj.simhash is None and article.get('simhash') is not None:
+                    article_obj.simhash = vers_sqlite(article['simhash'])
+            db.session.add(Question(texte=candidat['question'], categorie=candidat['categorie'], article=article_obj))
+            db.session.flush()
+            if stats is not None:
+                stats.questions += 1
+            yield {"titre": article['title'], "url": article['url'], "article": article['content'],
+                   "ollama_result": candidat}
+
+        if article_obj is None:
+            continue
+        dans_le_lot += 1
+        if dans_le_lot >= taille_lot:
+            db.session.commit()
+            dans_le_lot = 0
+
+    db.session.commit()
+
+
+def choisir_generateur(nb_questions=1):
+    """Une question par appel Ollama (prompt historique) ou `nb_questions` candidates par appel."""
+    if nb_questions > 1:
+        return partial(generer_questions_multiples, nb=nb_questions)
+    return generer_question
+
+
+def lancer_ingestion(client, params, page_depart=1, page_max=2, page_size=50, workers=4, taille_lot=20,
+                     on_page_terminee=None, generateur=None, source='web', nb_questions=1, seuil_pertinence=0,
+                     distance_doublons=None, jours_doublons=30, sources=None):
+    """
+    Assemble le pipeline complet et le consomme. Renvoie (questions enregistrées, IngestStats).
+    :param sources: adaptateurs de sources.py interrogés en plus de NewsAPI (client None = sans NewsAPI),
+        tous en parallèle ; les fins de page sont alors nommées d'après la source.
+    """
+    generateur = generateur or choisir_generateur(nb_questions)
+    stats = IngestStats()
+    if sources:
+        run = _demarrer_run(source, dict(params or {}, flux=[s.nom for s in sources]), stats)
+        adaptateurs = [SourceNewsApi(client, params, page_depart, page_max, page_size)] if client is not None else []
+        flux = pages_sources(adaptateurs + list(sources), stats=stats)
+    else:
+        run = _demarrer_run(source, params, stats)
+        flux = pages_newsapi(client, params, page_depart, page_max, page_size, stats=stats)
+    urls_traitees, articles_sans_question = charger_urls_connues()
+    flux = chronometrer(flux, stats.chronos, 'fetch')
+    flux = filtrer_articles(flux, urls_traitees, stats=stats)
+    flux = chronometrer(filtrer_pertinence(flux, seuil_pertinence, stats=stats), stats.chronos, 'filtre')
+    # Après le filtre de pertinence : l'index du run ne reçoit que des articles qui seront enregistrés
+    index = None if distance_doublons is None else charger_index_simhash(jours_doublons, distance_doublons)
+    flux = filtrer_quasi_doublons(flux, index, stats=stats)
+    flux = chronometrer(generer_questions(flux, generateur=generateur, workers=workers), stats.chronos, 'llm')
+    resultats = _consommer(run, stats, enregistrer(flux, articles_sans_question, taille_lot, on_page_terminee,
+                                                   stats=stats, run_id=run.id))
+    return resultats, stats
+
+
+def retenter_echecs(limite=None, tentatives_max=None, workers=4, taille_lot=20, generateur=None, nb_questions=1):
+    """Relance la génération pour les seuls articles de la file des échecs. Renvoie (questions enregistrées, IngestStats)."""
+    generateur = generateur or choisir_generateur(nb_questions)
+    requete = FailedArticle.query.order_by(FailedArticle.id)
+    if tentatives_max:
+        requete = requete.filter(FailedArticle.attempts < tentatives_max)
+    if limite:
+        requete = requete.limit(limite)
+    articles = [{'title': e.title, 'content': e.content or '', 'url': e.url, 'category': e.category,
+                 'published_at': e.published_at} for e in requete.all()]
+    stats = IngestStats()
+    stats.recus = len(articles)
+    run = _demarrer_run('retry', {'limite': limite, 'tentatives_max': tentatives_max}, stats)
+    _, articles_sans_question = charger_urls_connues()
+    flux = [(0, article) for article in articles] + [(0, FIN_DE_PAGE)]
+    flux = chronometrer(generer_questions(flux, generateur=generateur, workers=workers), stats.chronos, 'llm')
+    resultats = _consommer(run, stats, enregistrer(flux, articles_sans_question, taille_lot, stats=stats,
+                                                   run_id=run.id, urls_en_echec={a['url'] for a in articles}))
+    return resultats, stats
+
+
+def _demarrer_run(source, params, stats):
+    run = IngestionRun(source=source, status='en_cours', params=json.dumps(params, ensure_ascii=False))
+    db.session.add(run)
+    db.session.commit()
+    stats.run_id = run.id
+    return run
+
+
+def _consommer(run, stats, flux):
+    """Consomme le pipeline et enregistre le bilan du run, y compris s'il est interrompu."""
+    debut = time.perf_counter()
+    try:
+        resultats = list(flux)
+    except BaseException as e:
+        db.session.rollback()
+        stats.duree = time.perf_counter() - debut
+        _terminer_run(run, stats, 'interrompu' if isinstance(e, KeyboardInterrupt) else 'erreur',
+                      str(e) or type(e).__name__)
+        raise
+    stats.duree = time.perf_counter() - debut
+    _terminer_run(run, stats, 'ok')
+    return resultats
+
+
+def _terminer_run(run, stats, status, message=None):
+    temps = stats.temps()
+    run.status = status
+    run.message = message
+    run.finished_at = datetime.utcnow()
+    run.pages, run.recus, run.ignores, run.hors_sujet = stats.pages, stats.recus, stats.ignores, stats.hors_sujet
+    run.quasi_doublons = stats.quasi_doublons
+    run.questions, run.similaires, run.erreurs = stats.questions, stats.similaires, stats.erreurs
+    run.temps_fetch, run.temps_filtre = temps['fetch'], temps['filtre']
+    run.temps_llm, run.temps_enregistrement = temps['llm'], temps['enregistrement']
+    db.session.commit()
+
+
+def bilan_ingestion(nb_runs=10):
+    """Derniers runs et contenu de la file des échecs par type d'erreur (route /debug_ingestion)."""
+    runs = IngestionRun.query.order_by(IngestionRun.id.desc()).limit(nb_runs).all()
+    echecs = db.session.query(FailedArticle.error_type, func.count(FailedArticle.id)).group_by(
+        FailedArticle.error_type).all()
+    return {
+        'runs': [{
+            'id': run.id, 'source': run.source, 'status': run.status, 'message': run.message,
+            'started_at': run.started_at.isoformat(timespec='seconds') if run.started_at else None,
+            'finished_at': run.finished_at.isoformat(timespec='seconds') if run.finished_at else None,
+            'pages': run.pages, 'recus': run.recus, 'ignores': run.ignores, 'hors_sujet': run.hors_sujet,
+            'quasi_doublons': run.quasi_doublons, 'questions': run.questions,
+            'similaires': run.similaires, 'erreurs': run.erreurs,
+            'temps': {'fetch': run.temps_fetch, 'filtre': run.temps_filtre, 'llm': run.temps_llm,
+                      'enregistrement': run.temps_enregistrement},
+        } for run in runs],
+        'echecs': dict(echecs),
+    }
+
+
+def params_newsapi(jours=30):
+    to_date = datetime.now().strftime('%Y-%m-%d')
+    from_date = (datetime.now() - timedelta(days=jours)).strftime('%Y-%m-%d')
+    return {'sources': 'le-monde', 'from_param': from_date, 'to': to_date, 'language': 'fr', 'sort_by': 'publishedAt'}
+
+
+def _distance_doublons(option):
+    distance = current_app.config['DOUBLONS_DISTANCE'] if option is None else option
+    return None if distance < 0 else distance
+
+
+@click.command('ingest')
+@click.option('--pages', default=2, show_default=True, help="Nombre max de pages NewsAPI (le plan gratuit s'arrête à 100 résultats).")
+@click.option('--page-size', default=50, show_default=True)
+@click.option('--days', default=30, show_default=True, help="Fenêtre de dates d'un nouveau run.")
+@click.option('--workers', default=4, show_default=True, help="Appels Ollama en parallèle.")
+@click.option('--batch-size', default=20, show_default=True, help="Articles insérés par commit.")
+@click.option('--questions-per-article', 'nb_questions', default=1, show_default=True,
+              help="Questions candidates demandées à Ollama en un seul appel par article.")
+@click.option('--relevance-threshold', 'seuil', type=float, default=None,
+              help="Score de pertinence minimal avant Ollama (0 = pas de filtre). Par défaut : SEUIL_PERTINENCE.")
+@click.option('--near-duplicate-distance', 'distance', type=int, default=None,
+              help="Distance SimHash max d'un quasi-doublon (-1 = pas de filtre). Par défaut : DOUBLONS_DISTANCE.")
+@click.option('--restart', is_flag=True, help="Ignore le checkpoint et repart de la première page.")
+@click.option('--replay', is_flag=True, help="Rejoue les réponses NewsAPI stockées au lieu d'appeler l'API.")
+@click.option('--feed', 'feeds', multiple=True,
+              help="Flux RSS / Atom importé en plus de NewsAPI (option répétable). Par défaut : SOURCES_RSS.")
+@click.option('--no-newsapi', is_flag=True, help="N'importe que les flux, sans appel à NewsAPI.")
+@with_appcontext
+def ingest_command(pages, page_size, days, workers, batch_size, nb_questions, seuil, distance, restart, replay,
+                   feeds, no_newsapi):
+    """Importe les articles de NewsAPI (et des flux RSS) et génère les questions (reprend après une interruption)."""
+    from news_source import NewsApiSource, ReponsesStockees
+    from sources import EtatConditionnel, SourceFlux, valider_sources
+
+    dossier = current_app.config['NEWSAPI_DIR']
+    feeds = list(feeds) or current_app.config['SOURCES_RSS']
+    if feeds or no_newsapi:
+        # Plusieurs sources en parallèle : pas de checkpoint de pagination (voir la docstring du module)
+        etat = EtatConditionnel(os.path.join(dossier, 'flux.json'))
+        sources = [SourceFlux(url, etat=etat) for url in feeds]
+        client = None if no_newsapi else (ReponsesStockees(dossier) if replay
+                                          else NewsApiSource(current_app.config['NEWS_API_KEY'], dossier=dossier,
+                                                             retention_jours=current_app.config['NEWSAPI_RETENTION_JOURS'],
+                                                             consommateur='ingestion'))
+        _, stats = lancer_ingestion(client, params_newsapi(days), 1, pages, page_size, workers, batch_size,
+                                    lambda nom: click.echo(f"  {nom} enregistré"),
+                                    source='replay' if replay else 'cli', nb_questions=nb_questions,
+                                    seuil_pertinence=current_app.config['SEUIL_PERTINENCE'] if seuil is None else seuil,
+                                    distance_doublons=_distance_doublons(distance), sources=sources)
+        valider_sources(sources)
+        if client is not None and not replay:
+            client.valider()
+        for nom, stats_source in stats.sources.items():
+            click.echo(f"  {nom} : {stats_source}")
+        click.echo(f"✅ Ingestion terminée : {stats}")
+        return
+
+    chemin = os.path.join(current_app.instance_path, 'ingest_checkpoint.json')
+    checkpoint = None if restart else lire_checkpoint(chemin)
+    if checkpoint:
+        params, page_depart = checkpoint['params'], checkpoint['page'] + 1
+        click.echo(f"Reprise du run du {checkpoint['started_at']} à la page {page_depart}")
+    else:
+        params, page_depart = params_newsapi(days), 1
+        checkpoint = {'params': params, 'page': 0, 'started_at': datetime.now().isoformat(timespec='seconds')}
+
+    def page_terminee(page):
+        checkpoint['page'] = page
+        ecrire_checkpoint(chemin, checkpoint)
+        click.echo(f"  page {page} enregistrée")
+
+    if replay:
+        client = ReponsesStockees(dossier)
+    else:
+        client = NewsApiSource(current_app.config['NEWS_API_KEY'], dossier=dossier,
+                               retention_jours=current_app.config['NEWSAPI_RETENTION_JOURS'], consommateur='ingestion')
+    _, stats = lancer_ingestion(client, params, page_depart, pages, page_size, workers, batch_size, page_terminee,
+                                source='replay' if replay else 'cli', nb_questions=nb_questions,
+                                seuil_pertinence=current_app.config['SEUIL_PERTINENCE'] if seuil is None else seuil,
+                                distance_doublons=_distance_doublons(distance))
+    if not replay:
+        client.valider()  # le prochain run ne demandera que les articles plus récents
+        click.echo(f"NewsAPI : {client.stats()}")
+    if os.path.exists(chemin):
+        os.remove(chemin)  # run terminé : le prochain repart d'une nouvelle fenêtre de dates
+    click.echo(f"✅ Ingestion terminée : {stats}")
+
+
+@click.command('ingest-retry')
+@click.option('--limit', type=int, help="Nombre max d'articles repris.")
+@click.option('--max-attempts', default=5, show_default=True, help="Laisse de côté les articles déjà essayés autant de fois.")
+@click.option('--workers', default=4, show_default=True, help="Appels Ollama en parallèle.")
+@click.option('--questions-per-article', 'nb_questions', default=1, show_default=True,
+              help="Questions candidates demandées à Ollama en un seul appel par article.")
+@click.option('--list', 'lister', is_flag=True, help="Affiche la file des échecs sans rien relancer.")
+@with_appcontext
+def ingest_retry_command(limit, max_attempts, workers, nb_questions, lister):
+    """Relance la génération des questions pour les seuls articles en échec."""
+    if lister:
+        echecs = FailedArticle.query.order_by(FailedArticle.id).all()
+        for echec in echecs:
+            click.echo(f"[{echec.error_type}] {echec.attempts} essai(s) - {echec.title[:70]} ({echec.url})")
+        click.echo(f"{len(echecs)} article(s) en échec : {dict(Counter(e.error_type for e in echecs))}")
+        return
+    _, stats = retenter_echecs(limite=limit, tentatives_max=max_attempts, workers=workers, nb_questions=nb_questions)
+    click.echo(f"✅ Reprise terminée (run {stats.run_id}) : {stats}")
+
+
+@click.command('ingest-relevance')
+@click.option('--days', default=30, show_default=True, help="Articles des réponses NewsAPI stockées sur cette période.")
+@click.option('--show', default=10, show_default=True, help="Articles affichés de part et d'autre du seuil.")
+@with_appcontext
+def ingest_relevance_command(days, show):
+    """Aide au réglage du filtre de pertinence : taux d'articles écartés selon le seuil, sur les articles stockés."""
+    from news_source import articles_stockes
+
+    depuis = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+    scores = sorted(
+        ((scoreur_pertinence.score(a.get('title') or '', a.get('content') or a.get('description') or ''),
+          a.get('title') or '') for a in articles_stockes(current_app.config['NEWSAPI_DIR'], depuis=depuis)),
+        reverse=True,
+    )
+    if not scores:
+        click.echo("Aucun article stocké sur la période.")
+        return
+    seuil_actuel = current_app.config['SEUIL_PERTINENCE']
+    click.echo(f"{len(scores)} articles, seuil actuel {seuil_actuel}")
+    for seuil in (0.2, 0.3, 0.4, 0.5, 0.6, 0.7):
+        ecartes = sum(1 for score, _ in scores if score < seuil)
+        click.echo(f"  seuil {seuil:.1f} : {ecartes} écartés ({ecartes / len(scores):.0%})")
+    gardes = [s for s in scores if s[0] >= seuil_actuel]
+    ecartes = [s for s in scores if s[0] < seuil_actuel]
+    click.echo("Gardés de justesse :")
+    for score, titre in gardes[-show:]:
+        click.echo(f"  {score:.2f}  {titre[:90]}")
+    click.echo("Écartés de justesse :")
+    for score, titre in ecartes[:show]:
+        click.echo(f"  {score:.2f}  {titre[:90]}")
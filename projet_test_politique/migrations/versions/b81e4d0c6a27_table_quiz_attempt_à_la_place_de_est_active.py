@@ -0,0 +1,105 @@
+"""Table QuizAttempt à la place de Reponse.est_active
+
+Revision ID: b81e4d0c6a27
+Revises: 3f9c2a7d5b1e
+Create Date: 2026-10-19 11:03:52.871140
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b81e4d0c6a27'
+down_revision = '3f9c2a7d5b1e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # db.create_all() dans app.py a pu créer la table avant la migration
+    if not sa.inspect(op.get_bind()).has_table('quiz_attempt'):
+        op.create_table('quiz_attempt',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('date_debut', sa.DateTime(), nullable=True),
+            sa.Column('date_fin', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('quiz_attempt', schema=None) as batch_op:
+            batch_op.create_index('ix_quiz_attempt_user_id_id', ['user_id', 'id'], unique=False)
+
+    with op.batch_alter_table('reponse', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('attempt_id', sa.Integer(), nullable=True))
+
+    with op.batch_alter_table('analyse_politique', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('attempt_id', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_analyse_politique_attempt_id'), ['attempt_id'], unique=False)
+        batch_op.create_foreign_key('fk_analyse_politique_attempt_id', 'quiz_attempt', ['attempt_id'], ['id'])
+
+    # Reprise des données : les réponses inactives deviennent une tentative clôturée,
+    # chaque utilisateur ayant répondu reçoit une tentative ouverte (la courante) pour ses réponses actives.
+    op.execute("""
+        INSERT INTO quiz_attempt (user_id, date_debut, date_fin)
+        SELECT user_id, MIN(date_creation), COALESCE(MAX(date_modification), CURRENT_TIMESTAMP)
+        FROM reponse WHERE est_active = 0 GROUP BY user_id
+    """)
+    op.execute("""
+        INSERT INTO quiz_attempt (user_id, date_debut, date_fin)
+        SELECT user_id, COALESCE(MIN(CASE WHEN est_active = 0 THEN NULL ELSE date_creation END), CURRENT_TIMESTAMP), NULL
+        FROM reponse GROUP BY user_id
+    """)
+    op.execute("""
+        UPDATE reponse SET attempt_id = (
+            SELECT MAX(a.id) FROM quiz_attempt a WHERE a.user_id = reponse.user_id AND a.date_fin IS NOT NULL
+        ) WHERE est_active = 0
+    """)
+    op.execute("""
+        UPDATE reponse SET attempt_id = (
+            SELECT MAX(a.id) FROM quiz_attempt a WHERE a.user_id = reponse.user_id AND a.date_fin IS NULL
+        ) WHERE est_active = 1 OR est_active IS NULL
+    """)
+    op.execute("""
+        UPDATE analyse_politique SET attempt_id = (
+            SELECT MAX(a.id) FROM quiz_attempt a WHERE a.user_id = analyse_politique.user_id
+            AND (analyse_politique.is_current = 1 OR a.date_fin IS NOT NULL)
+        )
+    """)
+
+    with op.batch_alter_table('reponse', schema=None) as batch_op:
+        batch_op.drop_constraint('unique_active_response', type_='unique')
+        batch_op.drop_column('est_active')
+        batch_op.alter_column('attempt_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_unique_constraint('unique_attempt_response', ['attempt_id', 'question_id'])
+        batch_op.create_foreign_key('fk_reponse_attempt_id', 'quiz_attempt', ['attempt_id'], ['id'])
+
+
+def downgrade():
+    with op.batch_alter_table('reponse', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('est_active', sa.Boolean(), nullable=True))
+
+    # Seules les réponses des deux dernières tentatives peuvent revenir au modèle actif / inactif
+    op.execute("""
+        UPDATE reponse SET est_active = CASE WHEN attempt_id = (
+            SELECT MAX(a.id) FROM quiz_attempt a WHERE a.user_id = reponse.user_id
+        ) THEN 1 ELSE 0 END
+    """)
+    op.execute("""
+        DELETE FROM reponse WHERE est_active = 0 AND attempt_id < (
+            SELECT MAX(a.id) FROM quiz_attempt a WHERE a.user_id = reponse.user_id AND a.date_fin IS NOT NULL
+        )
+    """)
+
+    with op.batch_alter_table('reponse', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_reponse_attempt_id', type_='foreignkey')
+        batch_op.drop_constraint('unique_attempt_response', type_='unique')
+        batch_op.create_unique_constraint('unique_active_response', ['user_id', 'question_id', 'est_active'])
+        batch_op.drop_column('attempt_id')
+
+    with op.batch_alter_table('analyse_politique', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_analyse_politique_attempt_id', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_analyse_politique_attempt_id'))
+        batch_op.drop_column('attempt_id')
+
+    op.drop_table('quiz_attempt')
@@ -1,9 +1,67 @@
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy.orm import deferred
+from sqlalchemy.types import TypeDecorator
 from datetime import datetime
+import logging
+import re
+import zlib
+
+try:
+    import zstandard  # Optionnel : pip install zstandard
+except ImportError:
+    zstandard = None
 
 db = SQLAlchemy()
 
+# Compression des gros textes (Article.content, AnalysePolitique.analyse_text), désactivée par défaut :
+# à activer avec configure_text_compression (TEXT_COMPRESSION=zlib ou zstd dans app.py)
+TEXT_COMPRESSION = {'algorithm': 'none', 'min_size': 512}
+# Préfixes des valeurs compressées : un texte normal ne commence jamais par un octet nul
+_ZLIB_PREFIX = b'\x00z'
+_ZSTD_PREFIX = b'\x00s'
+
+
+def configure_text_compression(algorithm='none', min_size=512):
+    """algorithm : 'zlib', 'zstd' ou 'none'. Les textes plus courts que min_size octets restent en clair."""
+    if algorithm == 'zstd' and zstandard is None:
+        logging.warning("zstandard n'est pas installé, compression zlib utilisée à la place")
+        algorithm = 'zlib'
+    if algorithm not in ('zlib', 'zstd', 'none'):
+        raise ValueError(f"Algorithme de compression inconnu : {algorithm}")
+    TEXT_COMPRESSION['algorithm'] = algorithm
+    TEXT_COMPRESSION['min_size'] = min_size
+
+
+class CompressedText(TypeDecorator):
+    """
+    Texte stocké compressé (BLOB zlib/zstd) quand il est assez long, transparent pour le code.
+    Les anciennes lignes en clair (TEXT) sont relues telles quelles, pas besoin de migration.
+    """
+    impl = db.Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or TEXT_COMPRESSION['algorithm'] == 'none':
+            return value
+        data = value.encode('utf-8')
+        if len(data) < TEXT_COMPRESSION['min_size']:
+            return value
+        if TEXT_COMPRESSION['algorithm'] == 'zstd':
+            return _ZSTD_PREFIX + zstandard.ZstdCompressor(level=3).compress(data)
+        return _ZLIB_PREFIX + zlib.compress(data, 6)
+
+    def process_result_value(self, value, dialect):
+        if not isinstance(value, bytes):
+            return value
+        if value.startswith(_ZLIB_PREFIX):
+            return zlib.decompress(value[len(_ZLIB_PREFIX):]).decode('utf-8')
+        if value.startswith(_ZSTD_PREFIX):
+            if zstandard is None:
+                raise RuntimeError("Texte compressé en zstd mais le module zstandard n'est pas installé")
+            return zstandard.ZstdDecompressor().decompress(value[len(_ZSTD_PREFIX):]).decode('utf-8')
+        return value.decode('utf-8')
+
 #Ici attention si tu veux modifier une class il faut après que dans ton terminal tu valide en faisant "flask db migrate -m [ce que tu fais (par exemple:""Ajout du champ 'valide' à Question")]"
 # Et ensuite tu mets à jour avec "flask db upgrade"
 class User(db.Model):
@@ -17,6 +75,7 @@ class User(db.Model):
     # Relations
     reponses = db.relationship('Reponse', backref='user', lazy=True)
     analyses = db.relationship('AnalysePolitique', backref='user', lazy=True)
+    attempts = db.relationship('QuizAttempt', backref='user', lazy=True)
 
 
     def set_password(self, password):
@@ -39,24 +98,50 @@ class Question(db.Model):
     article = db.relationship('Article', backref='questions')
     reponses = db.relationship('Reponse', backref='question', lazy=True)
 
+    # Index pour la file de modération (non validées, non refusées, paginées par id)
+    __table_args__ = (
+        db.Index('ix_question_moderation', 'valide', 'is_refused', 'id'),
+    )
+
     def __repr__(self):
         return f'<Question {self.id}>'
 
 
 
+class QuizAttempt(db.Model):
+    """Une passation du quiz. La tentative courante d'un utilisateur est la plus récente (id le plus grand)."""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    date_debut = db.Column(db.DateTime, default=datetime.utcnow)
+    date_fin = db.Column(db.DateTime)  # Renseignée quand l'utilisateur recommence le quiz
+
+    # Relations
+    reponses = db.relationship('Reponse', backref='attempt', lazy=True)
+    analyses = db.relationship('AnalysePolitique', backref='attempt', lazy=True)
+
+    __table_args__ = (
+        db.Index('ix_quiz_attempt_user_id_id', 'user_id', 'id'),
+    )
+
+    def __repr__(self):
+        return f'<QuizAttempt {self.id} user={self.user_id}>'
+
+
 class Reponse(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     question_id = db.Column(db.Integer, db.ForeignKey('question.id'), nullable=False)
+    attempt_id = db.Column(db.Integer, db.ForeignKey('quiz_attempt.id'), nullable=False)
     texte = db.Column(db.Text, nullable=True)  # Peut être null si "passé"
     etat = db.Column(db.String(20), default="répondu")  # répondu, passé, incomplet
-    est_active = db.Column(db.Boolean, default=True)  # Pour suivre les sessions de quiz
     date_creation = db.Column(db.DateTime, default=datetime.utcnow)
     date_modification = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    # Ajout d'une contrainte unique pour éviter les doublons actifs
+    # Une seule réponse par question et par tentative (l'index sert aussi à chercher les réponses d'une tentative) ;
+    # ix_reponse_user_id_attempt_id sert aux recherches par utilisateur (quiz, analyse de fin)
     __table_args__ = (
-        db.UniqueConstraint('user_id', 'question_id', 'est_active', name='unique_active_response'),
+        db.UniqueConstraint('attempt_id', 'question_id', name='unique_attempt_response'),
+        db.Index('ix_reponse_user_id_attempt_id', 'user_id', 'attempt_id'),
     )
 
     # Removed the redundant relationship definition
@@ -65,11 +150,13 @@ class Reponse(db.Model):
 class Article(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
-    content = db.Column(db.Text, nullable=True)
+    # Différé : chargé seulement quand on l'affiche ou qu'on le résume (undefer / premier accès)
+    content = deferred(db.Column(CompressedText, nullable=True))
     url = db.Column(db.String(255), unique=True)
     category = db.Column(db.String(50))
     published_at = db.Column(db.String(50))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    simhash = db.Column(db.BigInteger)  # signature SimHash du titre + contenu (quasi-doublons, voir simhash.py)
 
     def __init__(self, title, content, url, category, published_at):
         self.title = title
@@ -81,10 +168,73 @@ class Article(db.Model):
     def __repr__(self):
         return f'<Article {self.id}>'
 
+class ResumeActualite(db.Model):
+    """Résumé Ollama d'une actualité de la page d'accueil, réutilisé tant que le contenu (hash) ne change pas."""
+    id = db.Column(db.Integer, primary_key=True)
+    url = db.Column(db.String(500), unique=True, nullable=False)
+    content_hash = db.Column(db.String(64), nullable=False)  # sha256 du titre + contenu nettoyé
+    title = db.Column(db.String(255), nullable=False)
+    category = db.Column(db.String(50))
+    summary = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_seen_at = db.Column(db.DateTime, default=datetime.utcnow)  # Dernier cycle où NewsAPI l'a renvoyée
+
+    def __repr__(self):
+        return f'<ResumeActualite {self.url}>'
+
+class IngestionRun(db.Model):
+    """Une exécution du pipeline d'ingestion (flask ingest, /import_articles, reprise des échecs)."""
+    id = db.Column(db.Integer, primary_key=True)
+    source = db.Column(db.String(20), nullable=False)  # cli, web, retry, replay
+    status = db.Column(db.String(20), nullable=False, default='en_cours')  # en_cours, ok, interrompu, erreur
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+    params = db.Column(db.Text)  # paramètres NewsAPI en JSON
+    # Compteurs (voir ingest.IngestStats)
+    pages = db.Column(db.Integer, default=0)
+    recus = db.Column(db.Integer, default=0)
+    ignores = db.Column(db.Integer, default=0)
+    hors_sujet = db.Column(db.Integer, default=0)  # écartés par le filtre de pertinence avant Ollama
+    quasi_doublons = db.Column(db.Integer, default=0)  # presque identiques à un article récent (SimHash)
+    questions = db.Column(db.Integer, default=0)
+    similaires = db.Column(db.Integer, default=0)
+    erreurs = db.Column(db.Integer, default=0)
+    # Temps passé dans chaque étape, en secondes
+    temps_fetch = db.Column(db.Float)
+    temps_filtre = db.Column(db.Float)
+    temps_llm = db.Column(db.Float)
+    temps_enregistrement = db.Column(db.Float)
+    message = db.Column(db.Text)  # erreur qui a arrêté le run
+
+    echecs = db.relationship('FailedArticle', backref='run', lazy=True)
+
+    def __repr__(self):
+        return f'<IngestionRun {self.id} {self.status}>'
+
+class FailedArticle(db.Model):
+    """Article dont la génération de question a échoué, en attente de "flask ingest-retry"."""
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.Integer, db.ForeignKey('ingestion_run.id'), index=True)  # dernier run qui a échoué
+    url = db.Column(db.String(255), unique=True, nullable=False)
+    title = db.Column(db.String(255), nullable=False)
+    content = db.Column(db.Text)
+    category = db.Column(db.String(50))
+    published_at = db.Column(db.String(50))
+    error_type = db.Column(db.String(30), nullable=False)  # http, timeout, connexion, parse, sans_question, exception
+    error_message = db.Column(db.Text)
+    raw_response = db.Column(db.Text)  # réponse brute d'Ollama, quand il y en a une
+    attempts = db.Column(db.Integer, default=1)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<FailedArticle {self.url} {self.error_type}>'
+
 class AnalysePolitique(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    analyse_text = db.Column(db.Text, nullable=False)
+    attempt_id = db.Column(db.Integer, db.ForeignKey('quiz_attempt.id'), index=True)  # Tentative analysée
+    analyse_text = deferred(db.Column(CompressedText, nullable=False))  # Différé, comme Article.content
     is_current = db.Column(db.Boolean, default=True)  # Indique si c'est l'analyse actuelle
     date_creation = db.Column(db.DateTime, default=datetime.utcnow)
     
@@ -103,7 +253,31 @@ class AnalysePolitique(db.Model):
     ecologisme = db.Column(db.Integer)
     populisme = db.Column(db.Integer)
     centrisme = db.Column(db.Integer)
-    
+    # Sections déjà découpées (remplies une fois à l'enregistrement, lues directement par le dashboard)
+    valeurs = db.Column(db.Text)
+    graphique = db.Column(db.Text)
+    evolution = db.Column(db.Text)
+    champs_extraits = db.Column(db.Boolean, default=False)
+
+    IDEOLOGIES = ['conservatisme', 'socialisme', 'liberalisme', 'liberalisme_economique', 'communisme', 'fascisme',
+                  'progressisme', 'nationalisme', 'anarchisme', 'ecologisme', 'populisme', 'centrisme']
+
+    @property
+    def ideologies(self):
+        """Pourcentages par idéologie (uniquement ceux qui ont pu être extraits)"""
+        return {nom: getattr(self, nom) for nom in self.IDEOLOGIES if getattr(self, nom) is not None}
+
+    def extract_structured_fields(self):
+        """Découpe analyse_text une bonne fois pour toutes : parti, orientation, valeurs, graphique, évolution et pourcentages"""
+        sections = parse_analyse_sections(self.analyse_text)
+        self.parti_politique = sections['parti']
+        self.orientation = sections['orientation']
+        self.valeurs = sections['valeurs']
+        self.graphique = sections['graphique']
+        self.evolution = sections['evolution']
+        self.extract_values_from_analysis()
+        self.champs_extraits = True
+
     def extract_values_from_analysis(self):
         """Extrait les valeurs numériques du graphique ASCII dans l'analyse"""
         if not self.analyse_text:
@@ -159,4 +333,79 @@ class AnalysePolitique(db.Model):
             # Si on atteint une nouvelle section, on sort du graphique
             elif in_graph and "**" in line:
                 in_graph = False
-                break
\ No newline at end of file
+                break
+
+
+def parse_analyse_sections(analyse_brute):
+    """Découpe le texte d'analyse d'Ollama en sections (parti, orientation, valeurs, graphique, évolution)"""
+    analyse_parti = ""           # Juste le nom du parti
+    analyse_parti_complet = ""   # La description complète du parti
+    analyse_orientation = ""     # Juste la position (ex: gauche-libertaire)
+    analyse_orientation_complete = ""  # La description complète de l'orientation
+    analyse_valeurs = []         # Liste des valeurs clés
+    analyse_valeurs_complete = ""  # Description complète des valeurs
+    analyse_graphique = ""       # Le graphique ASCII
+    analyse_evolution = ""       # Section évolution d'opinion (si présente)
+
+    if analyse_brute:
+        lines = analyse_brute.split("\n")
+        bloc, current = None, []
+
+        for line in lines:
+            if "1. Parti politique" in line:
+                bloc, current = "parti", []
+            elif "2. Orientation politique" in line:
+                if bloc == "parti":
+                    analyse_parti_complet = "\n".join(current).strip()
+                    # Extraire juste le nom du parti (première partie avant le tiret ou la première phrase)
+                    if analyse_parti_complet:
+                        if "-" in analyse_parti_complet:
+                            analyse_parti = analyse_parti_complet.split("-")[0].strip()
+                        else:
+                            analyse_parti = analyse_parti_complet.split(".")[0].strip()
+                bloc, current = "orientation", []
+            elif "3. Valeurs principales" in line:
+                if bloc == "orientation":
+                    analyse_orientation_complete = "\n".join(current).strip()
+                    # Extraire juste la position (ex: gauche-libertaire)
+                    if analyse_orientation_complete:
+                        match = re.search(r'(centre|gauche|droite)[\s-]*(libertaire|autoritaire|libéral|conservateur)?',
+                                          analyse_orientation_complete.lower())
+                        if match:
+                            position = match.group(1).capitalize()
+                            if match.group(2):
+                                position += "-" + match.group(2).capitalize()
+                            analyse_orientation = position
+                        else:
+                            analyse_orientation = analyse_orientation_complete.split(".")[0].strip()
+                bloc, current = "valeurs", []
+            elif "4. Graphique ASCII" in line:
+                if bloc == "valeurs":
+                    analyse_valeurs_complete = "\n".join(current).strip()
+                    # Extraire la liste des valeurs (séparées par virgules ou sur des lignes différentes)
+                    if analyse_valeurs_complete:
+                        if "," in analyse_valeurs_complete:
+                            analyse_valeurs = [v.strip() for v in analyse_valeurs_complete.split(",")]
+                        else:
+                            analyse_valeurs = [v.strip() for v in analyse_valeurs_complete.split("\n") if v.strip()]
+                bloc, current = "graphique", []
+            elif "5. Évolution d'opinion" in line or "5. Evolution d'opinion" in line:
+                if bloc == "graphique":
+                    analyse_graphique = "\n".join(current).strip()
+                bloc, current = "evolution", []
+            else:
+                current.append(line)
+
+        # Traiter le dernier bloc
+        if bloc == "graphique":
+            analyse_graphique = "\n".join(current).strip()
+        elif bloc == "evolution":
+            analyse_evolution = "\n".join(current).strip()
+
+    return {
+        'parti': analyse_parti,
+        'orientation': analyse_orientation,
+        'valeurs': ", ".join(analyse_valeurs) if analyse_valeurs else "",
+        'graphique': analyse_graphique,
+        'evolution': analyse_evolution,
+    }
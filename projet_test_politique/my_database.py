@@ -1,5 +1,8 @@
-from models import Question, Reponse, db
+import hashlib
+from models import Question, Reponse, QuizAttempt, ResumeActualite, db
 from datetime import datetime, timedelta 
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from evenements import reponses_enregistrees
 
 def save_question(texte, categorie, article, title, url, content):
     # Vérifie si une question existe déjà pour cet article
@@ -20,18 +23,46 @@ def save_question(texte, categorie, article, title, url, content):
     db.session.add(question)
     db.session.commit()
 
+def get_current_attempt(user_id, create=True):
+    """
+    Renvoie la tentative de quiz courante de l'utilisateur (la plus récente).
+    Si l'utilisateur n'en a pas encore et que create=True, elle est créée.
+    """
+    attempt = QuizAttempt.query.filter_by(user_id=user_id).order_by(QuizAttempt.id.desc()).first()
+    if attempt is None and create:
+        attempt = QuizAttempt(user_id=user_id, date_debut=datetime.utcnow())
+        db.session.add(attempt)
+        db.session.commit()
+    return attempt
+
+def get_recent_attempts(user_id, limit=2):
+    """Les dernières tentatives de l'utilisateur, la plus récente en premier (courante puis précédente)."""
+    return QuizAttempt.query.filter_by(user_id=user_id).order_by(QuizAttempt.id.desc()).limit(limit).all()
+
+def start_new_attempt(user_id):
+    """
+    Clôture la tentative courante et en ouvre une nouvelle.
+    Les réponses des tentatives précédentes sont conservées telles quelles (historique).
+    """
+    now = datetime.utcnow()
+    QuizAttempt.query.filter_by(user_id=user_id, date_fin=None).update({QuizAttempt.date_fin: now})
+    attempt = QuizAttempt(user_id=user_id, date_debut=now)
+    db.session.add(attempt)
+    db.session.flush()
+    return attempt
+
 def save_answer(user_id, question_id, answer_text, etat="répondu"):
     """
     Enregistre ou met à jour la réponse d'un utilisateur à une question.
-    Si l'utilisateur a déjà répondu dans la session active, on met à jour.
+    Si l'utilisateur a déjà répondu dans la tentative courante, on met à jour.
     Si c'est un nouveau quiz, on garde l'historique des anciennes réponses.
     """
     try:
-        # Vérifier si une réponse active existe déjà pour cette question dans cette session
+        attempt = get_current_attempt(user_id)
+        # Vérifier si une réponse existe déjà pour cette question dans cette tentative
         existing_response = Reponse.query.filter_by(
-            user_id=user_id,
-            question_id=question_id,
-            est_active=True
+            attempt_id=attempt.id,
+            question_id=question_id
         ).first()
         
         if existing_response:
@@ -44,19 +75,102 @@ def save_answer(user_id, question_id, answer_text, etat="répondu"):
             new_response = Reponse(
                 user_id=user_id,
                 question_id=question_id,
+                attempt_id=attempt.id,
                 texte=answer_text,
                 etat=etat,
-                est_active=True,
                 date_creation=datetime.utcnow(),
                 date_modification=datetime.utcnow()
             )
             db.session.add(new_response)
             
         db.session.commit()
+        reponses_enregistrees.send(user_id)
         return True
     except Exception as e:
         db.session.rollback()
         print(f"Erreur lors de l'enregistrement de la réponse: {e}")
         return False
 
-    
+def save_answers(user_id, answers, attempt_id=None):
+    """
+    Enregistre en une seule fois les réponses d'une page du quiz.
+    `answers` est une liste de tuples (question_id, texte, etat).
+    Un seul INSERT ... ON CONFLICT sur la contrainte unique_attempt_response et un seul commit :
+    la réponse existante de la tentative courante est mise à jour, sinon une nouvelle réponse est créée
+    (mêmes règles que save_answer, les tentatives précédentes ne sont pas touchées).
+    """
+    if not answers:
+        return True
+    now = datetime.utcnow()
+    try:
+        if attempt_id is None:
+            attempt_id = get_current_attempt(user_id).id
+        # Une question présente deux fois dans la page : on garde la dernière valeur
+        lignes = {
+            question_id: {
+                "user_id": user_id,
+                "question_id": question_id,
+                "attempt_id": attempt_id,
+                "texte": texte,
+                "etat": etat,
+                "date_creation": now,
+                "date_modification": now,
+            }
+            for question_id, texte, etat in answers
+        }
+        stmt = sqlite_insert(Reponse).values(list(lignes.values()))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Reponse.attempt_id, Reponse.question_id],
+            set_={
+                "texte": stmt.excluded.texte,
+                "etat": stmt.excluded.etat,
+                "date_modification": stmt.excluded.date_modification,
+            },
+        )
+        db.session.execute(stmt)
+        db.session.commit()
+        reponses_enregistrees.send(user_id)
+        return True
+    except Exception as e:
+        db.session.rollback()
+        print(f"Erreur lors de l'enregistrement des réponses: {e}")
+        return False
+
+def content_hash(*morceaux):
+    """Empreinte sha256 d'un contenu (titre, texte...) pour savoir s'il a changé depuis le dernier résumé."""
+    return hashlib.sha256("\x1f".join(m or "" for m in morceaux).encode("utf-8")).hexdigest()
+
+def get_resumes_actualites(urls):
+    """Résumés déjà connus pour ces URL, en une requête : dict url -> ResumeActualite."""
+    if not urls:
+        return {}
+    return {r.url: r for r in ResumeActualite.query.filter(ResumeActualite.url.in_(set(urls))).all()}
+
+def save_resumes_actualites(resumes):
+    """
+    Enregistre les résumés d'un cycle de rafraîchissement (liste de dict url, content_hash, title, category, summary).
+    Un seul INSERT ... ON CONFLICT(url) : un contenu modifié remplace l'ancien résumé, les autres mettent à jour last_seen_at.
+    """
+    if not resumes:
+        return True
+    now = datetime.utcnow()
+    try:
+        lignes = {r["url"]: dict(r, created_at=now, last_seen_at=now) for r in resumes}
+        stmt = sqlite_insert(ResumeActualite).values(list(lignes.values()))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ResumeActualite.url],
+            set_={
+                "content_hash": stmt.excluded.content_hash,
+                "title": stmt.excluded.title,
+                "category": stmt.excluded.category,
+                "summary": stmt.excluded.summary,
+                "last_seen_at": stmt.excluded.last_seen_at,
+            },
+        )
+        db.session.execute(stmt)
+        db.session.commit()
+        return True
+    except Exception as e:
+        db.session.rollback()
+        print(f"Erreur lors de l'enregistrement des résumés d'actualités: {e}")
+        return False
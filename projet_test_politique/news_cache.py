@@ -0,0 +1,145 @@
+"""
+Cache "stale-while-revalidate" pour les actualités (NewsAPI + résumés Ollama).
+
+- Le dernier contenu valide est toujours servi immédiatement, même périmé.
+- Quand il a dépassé max_age, UNE seule reconstruction est lancée en arrière-plan
+  (verrou dans le process + bail "lease" dans le cache partagé entre workers).
+- Le contenu n'est remplacé qu'après une reconstruction réussie : une panne de NewsAPI
+  ou d'Ollama laisse en place l'ancienne version au lieu de mettre des erreurs en cache.
+- Après un échec, get() ne relance pas de reconstruction pendant `cooldown` secondes (date de l'échec
+  dans le cache partagé) : sinon chaque requête sur un contenu périmé relancerait NewsAPI et Ollama.
+  refresh() appelé directement (admin, planificateur) passe outre.
+- Le bail n'est libéré que par son titulaire : une reconstruction plus longue que `lease` ne supprime
+  pas le bail pris ensuite par un autre worker.
+- stats() donne l'âge du cache et l'état des reconstructions (route /debug_cache).
+"""
+import logging
+import threading
+import time
+
+from sqlite_cache import jeton_bail, liberer_bail
+
+logger = logging.getLogger(__name__)
+
+
+class StaleWhileRevalidateCache:
+    """Une entrée de cache {payload, built_at} reconstruite en arrière-plan par `builder()`."""
+
+    def __init__(self, cache, key, builder, max_age=86400, lease=900, cooldown=300, app=None, is_valid=bool,
+                 on_refresh=None):
+        self.cache = cache
+        self.key = key
+        self.builder = builder
+        self.max_age = max_age
+        self.lease = lease          # durée max d'une reconstruction avant qu'un autre worker puisse la relancer
+        self.cooldown = cooldown    # pause après un échec avant que get() ne relance une reconstruction
+        self.app = app
+        self.is_valid = is_valid
+        self.on_refresh = on_refresh  # appelé après chaque remplacement réussi du contenu
+        self._lock = threading.Lock()
+        self._thread = None
+        self.refresh_count = 0
+        self.failure_count = 0
+        self.last_error = None
+        self.last_duration = None
+        self.last_attempt = None
+
+    @property
+    def lease_key(self):
+        return f'{self.key}:refresh_lease'
+
+    @property
+    def failure_key(self):
+        return f'{self.key}:last_failure'
+
+    def en_pause(self):
+        """Vrai si la dernière reconstruction a échoué il y a moins de `cooldown` secondes (tous workers confondus)."""
+        return self.cache.get(self.failure_key) is not None
+
+    def _entry(self):
+        entry = self.cache.get(self.key)
+        return entry if isinstance(entry, dict) and 'payload' in entry else None
+
+    def age(self):
+        """Âge du contenu servi en secondes (None si rien n'est encore en cache)."""
+        built_at = self.built_at()
+        return None if built_at is None else time.time() - built_at
+
+    def built_at(self):
+        """Date (timestamp) de construction du contenu servi, None si rien n'est encore en cache."""
+        entry = self._entry()
+        return None if entry is None else entry['built_at']
+
+    def get(self, default=None):
+        """Renvoie tout de suite le dernier contenu valide et lance une reconstruction s'il est périmé."""
+        entry = self._entry()
+        if (entry is None or time.time() - entry['built_at'] > self.max_age) and not self.en_pause():
+            self.refresh()
+        if entry is None:
+            return {} if default is None else default
+        return entry['payload']
+
+    def refresh(self):
+        """Lance une reconstruction en arrière-plan, sauf si une autre est déjà en cours. Renvoie le thread ou None."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return None
+            # Bail partagé : add() échoue si un autre worker a déjà pris la main
+            jeton = jeton_bail()
+            if not self.cache.add(self.lease_key, jeton, timeout=self.lease):
+                return None
+            self.last_attempt = time.time()
+            self._thread = threading.Thread(target=self._rebuild, args=(jeton,), name=f'refresh-{self.key}',
+                                            daemon=True)
+            self._thread.start()
+            return self._thread
+
+    def _rebuild(self, jeton):
+        debut = time.perf_counter()
+        try:
+            if self.app is not None:
+                with self.app.app_context():
+                    payload = self.builder()
+            else:
+                payload = self.builder()
+            if not self.is_valid(payload):
+                raise ValueError("contenu reconstruit invalide, l'ancien est conservé")
+            # Échange atomique : on n'écrit qu'une fois le nouveau contenu complet et valide
+            self.cache.set(self.key, {'payload': payload, 'built_at': time.time()}, timeout=0)
+            self.refresh_count += 1
+            self.last_error = None
+            self.cache.delete(self.failure_key)
+            if self.on_refresh is not None:
+                self.on_refresh()
+            logger.info(f"Cache {self.key} reconstruit en {time.perf_counter() - debut:.1f}s")
+        except Exception as e:
+            self.failure_count += 1
+            self.last_error = str(e)
+            if self.cooldown:
+                self.cache.set(self.failure_key, time.time(), timeout=self.cooldown)
+            logger.warning(f"Échec de la reconstruction du cache {self.key} : {e}")
+        finally:
+            self.last_duration = time.perf_counter() - debut
+            liberer_bail(self.cache, self.lease_key, jeton)
+
+    def wait(self, timeout=None):
+        """Attend la fin de la reconstruction en cours (tests, commandes CLI)."""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def stats(self):
+        age = self.age()
+        return {
+            'key': self.key,
+            'age_seconds': None if age is None else round(age, 1),
+            'max_age_seconds': self.max_age,
+            'stale': age is None or age > self.max_age,
+            'refreshing': self._thread is not None and self._thread.is_alive(),
+            'cooldown': self.en_pause(),
+            'last_attempt': self.last_attempt,
+            'refresh_count': self.refresh_count,
+            'failure_count': self.failure_count,
+            'last_refresh_seconds': None if self.last_duration is None else round(self.last_duration, 2),
+            'last_error': self.last_error,
+        }
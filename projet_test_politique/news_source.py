@@ -0,0 +1,243 @@
+"""
+Accès à NewsAPI incrémental, avec les réponses brutes gardées sur disque.
+
+    source = NewsApiSource(api_key, dossier='instance/newsapi', consommateur='actualites')
+    source.get_everything(q='climat', sources='le-monde', from_param='2024-05-01', page=1, page_size=10)
+    source.valider()   # fin du run : les watermarks avancent
+    ingestion = source.pour('ingestion')   # même client, watermarks à part
+
+- Watermark par requête : la date `publishedAt` la plus récente déjà vue pour une requête
+  (mêmes paramètres hors dates et pagination). L'appel suivant ne demande que les articles plus récents
+  (`from` = watermark) et écarte ceux déjà vus. Les watermarks ne sont enregistrés qu'avec valider(),
+  pour qu'un run interrompu au milieu de la pagination redemande la même fenêtre.
+- Les watermarks sont propres à chaque consommateur (fichier watermarks-<consommateur>.json) : le
+  rafraîchissement des actualités et l'import envoient la même requête, mais l'un ne doit pas faire
+  avancer le watermark de l'autre (l'import perdrait les articles déjà vus par les actualités).
+- Chaque réponse est écrite telle quelle dans <dossier>/<AAAA-MM-JJ>/<heure>-<requête>-p<page>.json :
+  articles_stockes() relit la fenêtre complète depuis le disque, et ReponsesStockees rejoue
+  ces réponses comme un client NewsAPI (flask ingest --replay) sans aucun appel réseau.
+  Seuls les dossiers des jours de la fenêtre (`depuis`) sont lus : un article n'a pas pu être reçu
+  avant sa date de publication.
+- Rétention : valider() supprime les dossiers de plus de `retention_jours` jours (purger_reponses).
+- Une seule requests.Session (connexions keep-alive réutilisées, quelques réessais sur erreur 5xx/429).
+"""
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+from datetime import datetime, timedelta
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from newsapi import NewsApiClient
+
+# Paramètres qui ne changent pas "la requête" : la fenêtre de dates et la pagination
+PARAMS_HORS_REQUETE = ('from_param', 'to', 'page', 'page_size')
+DOSSIER_JOUR = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+
+def session_http(pool=10, essais=2):
+    """Session requests partagée : pool de connexions keep-alive et réessais sur les erreurs passagères."""
+    session = requests.Session()
+    retry = Retry(total=essais, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=('GET',))
+    adapter = HTTPAdapter(pool_connections=pool, pool_maxsize=pool, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def cle_requete(params):
+    """Identifiant stable d'une requête : hash court des paramètres hors dates et pagination."""
+    utiles = {k: v for k, v in params.items() if k not in PARAMS_HORS_REQUETE and v is not None}
+    return hashlib.sha1(json.dumps(utiles, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+
+def date_newsapi(published_at):
+    """'2024-05-01T10:00:00Z' -> '2024-05-01T10:00:00' (format accepté par le paramètre `from`)."""
+    return (published_at or '')[:19]
+
+
+class NewsApiSource:
+    """
+    Client NewsAPI avec la même méthode get_everything() que NewsApiClient (utilisable par ingest.pages_newsapi).
+
+    :param api_key: clé NewsAPI ; sans clé (ni client), la source est désactivée et get_everything()
+                    renvoie une erreur "apiKeyMissing" sans appel réseau.
+    :param dossier: répertoire des réponses brutes et du fichier des watermarks.
+    :param client: client NewsAPI à utiliser (par défaut un NewsApiClient sur la session partagée).
+    :param retention_jours: âge max des réponses brutes gardées sur disque (None ou 0 = tout garder).
+    :param consommateur: nom de l'utilisateur des watermarks ('actualites', 'ingestion'...).
+    """
+
+    def __init__(self, api_key=None, dossier='newsapi', client=None, session=None, retention_jours=None,
+                 consommateur=None):
+        self.dossier = dossier
+        self.retention_jours = retention_jours
+        self.consommateur = consommateur
+        self.session = session or session_http()
+        if client is None and api_key:
+            client = NewsApiClient(api_key=api_key, session=self.session)
+        self.client = client
+        nom_fichier = f'watermarks-{consommateur}.json' if consommateur else 'watermarks.json'
+        self.chemin_watermarks = os.path.join(dossier, nom_fichier)
+        self._lock = threading.Lock()
+        self._watermarks = self._lire_watermarks()
+        self._en_attente = {}   # cle -> publishedAt le plus récent vu depuis le dernier valider()
+        self.appels = 0
+        self.articles_recus = 0
+        self.articles_ignores = 0
+
+    def pour(self, consommateur):
+        """Même client, même session et mêmes réponses stockées, avec les watermarks de `consommateur`."""
+        return NewsApiSource(dossier=self.dossier, client=self.client, session=self.session,
+                             retention_jours=self.retention_jours, consommateur=consommateur)
+
+    def _lire_watermarks(self):
+        try:
+            with open(self.chemin_watermarks, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def watermark(self, params):
+        return self._watermarks.get(cle_requete(params))
+
+    @property
+    def active(self):
+        return self.client is not None
+
+    def get_everything(self, **params):
+        """Appel NewsAPI limité aux articles plus récents que le watermark de la requête."""
+        if not self.active:
+            return {'status': 'error', 'code': 'apiKeyMissing',
+                    'message': "NEWS_API_KEY n'est pas défini : NewsAPI est désactivé"}
+        cle = cle_requete(params)
+        watermark = self._watermarks.get(cle)
+        if watermark and date_newsapi(watermark) > (params.get('from_param') or ''):
+            params['from_param'] = date_newsapi(watermark)
+        response = self.client.get_everything(**params)
+        self.appels += 1
+        self._stocker(cle, params, response)
+        if response.get('status') != 'ok':
+            return response
+
+        articles = response.get('articles', [])
+        nouveaux = [a for a in articles if not watermark or (a.get('publishedAt') or '') > watermark]
+        self.articles_recus += len(articles)
+        self.articles_ignores += len(articles) - len(nouveaux)
+        if nouveaux:
+            plus_recent = max(a.get('publishedAt') or '' for a in nouveaux)
+            with self._lock:
+                if plus_recent > self._en_attente.get(cle, ''):
+                    self._en_attente[cle] = plus_recent
+        return {**response, 'articles': nouveaux}
+
+    def valider(self):
+        """Enregistre les watermarks du run (écriture atomique, comme le checkpoint de flask ingest)."""
+        with self._lock:
+            for cle, published_at in self._en_attente.items():
+                if published_at > self._watermarks.get(cle, ''):
+                    self._watermarks[cle] = published_at
+            self._en_attente = {}
+            os.makedirs(self.dossier, exist_ok=True)
+            temporaire = self.chemin_watermarks + '.tmp'
+            with open(temporaire, 'w', encoding='utf-8') as f:
+                json.dump(self._watermarks, f, indent=1)
+            os.replace(temporaire, self.chemin_watermarks)
+        if self.retention_jours:
+            purger_reponses(self.dossier, self.retention_jours)
+
+    def _stocker(self, cle, params, response):
+        maintenant = datetime.now()
+        dossier_jour = os.path.join(self.dossier, maintenant.strftime('%Y-%m-%d'))
+        os.makedirs(dossier_jour, exist_ok=True)
+        nom = f"{maintenant.strftime('%H%M%S%f')}-{cle}-p{params.get('page') or 1}.json"
+        with open(os.path.join(dossier_jour, nom), 'w', encoding='utf-8') as f:
+            json.dump({'requete': cle, 'params': params, 'fetched_at': maintenant.isoformat(timespec='seconds'),
+                       'response': response}, f, ensure_ascii=False)
+
+    def articles_stockes(self, params=None, depuis=None):
+        return articles_stockes(self.dossier, params, depuis)
+
+    def stats(self):
+        return {'consommateur': self.consommateur, 'active': self.active, 'appels': self.appels, 'articles_recus': self.articles_recus,
+                'deja_vus': self.articles_ignores, 'requetes_suivies': len(self._watermarks)}
+
+
+def dossiers_jours(dossier, depuis=None):
+    """
+    Dossiers <AAAA-MM-JJ> des réponses, du plus ancien au plus récent, à partir de la veille de `depuis`
+    (marge pour l'écart entre l'heure locale du dossier et l'heure UTC de publishedAt).
+    """
+    try:
+        noms = sorted(nom for nom in os.listdir(dossier) if DOSSIER_JOUR.match(nom))
+    except OSError:
+        return []
+    if depuis:
+        premier = (datetime.strptime(depuis[:10], '%Y-%m-%d') - timedelta(days=1)).strftime('%Y-%m-%d')
+        noms = [nom for nom in noms if nom >= premier]
+    return [os.path.join(dossier, nom) for nom in noms]
+
+
+def reponses_stockees(dossier, params=None, depuis=None):
+    """
+    Réponses brutes enregistrées (les plus anciennes d'abord), filtrées sur la requête si `params` est donné
+    et sur les jours à partir de `depuis` ('AAAA-MM-JJ' ou ISO) s'il est donné.
+    """
+    cle = cle_requete(params) if params is not None else '*'
+    chemins = (chemin for jour in dossiers_jours(dossier, depuis)
+               for chemin in sorted(glob.glob(os.path.join(jour, f'*-{cle}-p*.json'))))
+    for chemin in chemins:
+        try:
+            with open(chemin, encoding='utf-8') as f:
+                yield json.load(f)
+        except (OSError, ValueError):
+            continue
+
+
+def articles_stockes(dossier, params=None, depuis=None):
+    """
+    Articles des réponses stockées, sans doublon d'URL (version la plus récente), du plus récent au plus ancien.
+    :param depuis: date 'AAAA-MM-JJ' ou ISO ; les articles publiés avant sont écartés.
+    """
+    par_url = {}
+    for enregistrement in reponses_stockees(dossier, params, depuis):
+        for article in enregistrement['response'].get('articles', []):
+            if depuis and (article.get('publishedAt') or '') < depuis:
+                continue
+            par_url[article.get('url') or article.get('title')] = article
+    return sorted(par_url.values(), key=lambda a: a.get('publishedAt') or '', reverse=True)
+
+
+def purger_reponses(dossier, jours):
+    """Supprime les dossiers de réponses de plus de `jours` jours. Renvoie le nombre de dossiers supprimés."""
+    limite = (datetime.now() - timedelta(days=jours)).strftime('%Y-%m-%d')
+    anciens = [jour for jour in dossiers_jours(dossier) if os.path.basename(jour) < limite]
+    for jour in anciens:
+        shutil.rmtree(jour, ignore_errors=True)
+    return len(anciens)
+
+
+class ReponsesStockees:
+    """
+    Rejoue les réponses stockées comme un client NewsAPI : mêmes paramètres de requête, aucun appel réseau.
+    La fenêtre d'une requête n'est lue sur disque qu'une fois, pas à chaque page.
+    """
+
+    def __init__(self, dossier):
+        self.dossier = dossier
+        self._fenetres = {}
+
+    def get_everything(self, page=1, page_size=100, **params):
+        fenetre = (cle_requete(params), params.get('from_param'))
+        if fenetre not in self._fenetres:
+            self._fenetres[fenetre] = articles_stockes(self.dossier, params, depuis=params.get('from_param'))
+        articles = self._fenetres[fenetre]
+        debut = (page - 1) * page_size
+        return {'status': 'ok', 'totalResults': len(articles), 'articles': articles[debut:debut + page_size]}
@@ -0,0 +1,158 @@
+"""
+Instrumentation des requêtes SQL : nombre de requêtes, temps total passé en base
+et requête la plus lente, par requête Flask et agrégé par endpoint.
+
+Utilisation dans les tests pour fixer un "budget" de requêtes par route :
+
+    with compter_requetes() as stats:
+        client.get('/dashboard')
+    assert stats.count <= 5, stats.statements
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_local = threading.local()
+_rapport_lock = threading.Lock()
+_rapport = {}
+_listeners_installes = False
+
+
+class QueryStats:
+    """Compteurs SQL pour une requête Flask (ou un bloc `compter_requetes`)."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement = None
+        self.statements = []
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.total_time += duration
+        self.statements.append(statement)
+        if duration >= self.slowest_time:
+            self.slowest_time = duration
+            self.slowest_statement = statement
+
+    def as_dict(self):
+        return {
+            'queries': self.count,
+            'total_ms': round(self.total_time * 1000, 2),
+            'slowest_ms': round(self.slowest_time * 1000, 2),
+            'slowest_statement': self.slowest_statement,
+        }
+
+
+def _collecteurs():
+    if not hasattr(_local, 'collecteurs'):
+        _local.collecteurs = []
+    return _local.collecteurs
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('query_start_time')
+    if not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+    for stats in _collecteurs():
+        stats.record(statement, duration)
+
+
+def installer_listeners():
+    """Branche les listeners sur tous les moteurs SQLAlchemy (une seule fois)."""
+    global _listeners_installes
+    if _listeners_installes:
+        return
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    _listeners_installes = True
+
+
+@contextmanager
+def compter_requetes():
+    """Compte les requêtes SQL exécutées dans le bloc (thread courant)."""
+    installer_listeners()
+    stats = QueryStats()
+    _collecteurs().append(stats)
+    try:
+        yield stats
+    finally:
+        _collecteurs().remove(stats)
+
+
+def _enregistrer_endpoint(endpoint, stats):
+    with _rapport_lock:
+        entree = _rapport.setdefault(endpoint, {
+            'requests': 0,
+            'total_queries': 0,
+            'max_queries': 0,
+            'total_ms': 0.0,
+            'slowest_ms': 0.0,
+            'slowest_statement': None,
+        })
+        entree['requests'] += 1
+        entree['total_queries'] += stats.count
+        entree['max_queries'] = max(entree['max_queries'], stats.count)
+        entree['total_ms'] += stats.total_time * 1000
+        if stats.slowest_time * 1000 >= entree['slowest_ms']:
+            entree['slowest_ms'] = stats.slowest_time * 1000
+            entree['slowest_statement'] = stats.slowest_statement
+
+
+def query_report():
+    """Rapport agrégé par endpoint : moyenne et max de requêtes, temps cumulé, pire requête."""
+    with _rapport_lock:
+        rapport = {}
+        for endpoint, entree in _rapport.items():
+            rapport[endpoint] = {
+                'requests': entree['requests'],
+                'avg_queries': round(entree['total_queries'] / entree['requests'], 2),
+                'max_queries': entree['max_queries'],
+                'total_ms': round(entree['total_ms'], 2),
+                'slowest_ms': round(entree['slowest_ms'], 2),
+                'slowest_statement': entree['slowest_statement'],
+            }
+        return rapport
+
+
+def reset_query_report():
+    with _rapport_lock:
+        _rapport.clear()
+
+
+def init_query_stats(app):
+    """Active le comptage par requête Flask, l'en-tête de debug et le rapport par endpoint."""
+    installer_listeners()
+
+    @app.before_request
+    def _debut_comptage():
+        g.query_stats = QueryStats()
+        _collecteurs().append(g.query_stats)
+
+    @app.after_request
+    def _fin_comptage(response):
+        stats = g.get('query_stats')
+        if stats is None:
+            return response
+        _enregistrer_endpoint(request.endpoint or request.path, stats)
+        if app.debug:
+            response.headers['X-DB-Queries'] = str(stats.count)
+            response.headers['X-DB-Time-Ms'] = f"{stats.total_time * 1000:.2f}"
+            response.headers['X-DB-Slowest-Ms'] = f"{stats.slowest_time * 1000:.2f}"
+        return response
+
+    @app.teardown_request
+    def _retirer_collecteur(exc):
+        stats = g.pop('query_stats', None)
+        if stats is not None and stats in _collecteurs():
+            _collecteurs().remove(stats)
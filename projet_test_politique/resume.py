@@ -0,0 +1,127 @@
+"""
+Résumés par niveaux : Ollama seulement quand le texte le justifie.
+
+NewsAPI tronque "content" à ~200 caractères : demander "3 phrases" à Ollama pour un texte qui en fait
+déjà une ou deux coûte une génération complète pour rien.
+
+- court      (<= `court` caractères, ou <= nb_phrases phrases sans dépasser `long` caractères) :
+             le texte nettoyé est rendu tel quel
+- extractif  (jusqu'à `long` caractères) : TextRank (NumPy) sur les phrases, biaisé vers le début
+             de l'article (le "chapeau" d'une dépêche résume souvent l'essentiel)
+- ollama     (au-delà) : la fonction de résumé LLM passée par l'appelant
+
+Resumeur.stats() compte l'usage de chaque niveau (affiché sur /debug_cache).
+"""
+import re
+import threading
+
+import numpy as np
+
+from classifieur import normaliser
+
+# Marqueur de troncature NewsAPI ("… [+2345 chars]")
+TRONCATURE = re.compile(r'\s*\[\+\d+ chars\]')
+RESUME_INDISPONIBLE = "Résumé non disponible. Veuillez lire l'article complet."
+FIN_DE_PHRASE = re.compile(r'(?<=[.!?…])\s+(?=[«"A-ZÀ-Ý0-9])')
+MOTS_VIDES = set(
+    "les des une un le la de du et en a au aux ce ces cet cette dans par pour sur avec sans est sont ont "
+    "qui que quoi dont ou il elle ils elles on nous vous se sa son ses leur leurs lui pas plus ne mais "
+    "comme ete etre avoir fait tout tous aussi entre apres avant depuis".split()
+)
+
+
+def nettoyer(texte):
+    """Enlève le marqueur de troncature de NewsAPI et les retours à la ligne."""
+    texte = TRONCATURE.sub('', texte or '')
+    return re.sub(r'\s+', ' ', texte).strip()
+
+
+def decouper_phrases(texte):
+    return [phrase.strip() for phrase in FIN_DE_PHRASE.split(texte) if phrase.strip()]
+
+
+def _mots(phrase):
+    return {mot for mot in re.findall(r'\w+', normaliser(phrase)) if len(mot) > 2 and mot not in MOTS_VIDES}
+
+
+def textrank(phrases, amortissement=0.85, biais_debut=1.0, iterations=50, tolerance=1e-6):
+    """
+    Score de chaque phrase : PageRank sur le graphe des phrases, arêtes pondérées par les mots communs
+    (recouvrement / (log|Si| + log|Sj|), comme dans l'article TextRank). Le saut aléatoire favorise les
+    premières phrases (poids 1 / (position + 1) ** biais_debut).
+    """
+    ensembles = [_mots(phrase) for phrase in phrases]
+    vocabulaire = {mot: i for i, mot in enumerate(sorted(set().union(*ensembles)))}
+    presence = np.zeros((len(phrases), max(len(vocabulaire), 1)))
+    for i, mots in enumerate(ensembles):
+        presence[i, [vocabulaire[mot] for mot in mots]] = 1
+    communs = presence @ presence.T
+    longueurs = np.log(np.maximum(presence.sum(axis=1), 2))
+    poids = communs / (longueurs[:, None] + longueurs[None, :])
+    np.fill_diagonal(poids, 0)
+
+    debut = 1 / (np.arange(len(phrases)) + 1) ** biais_debut
+    debut /= debut.sum()
+    sorties = poids.sum(axis=1)
+    # Une phrase sans mot commun avec les autres redistribue son score selon le biais de début
+    transition = np.where(sorties[:, None] > 0, poids / np.maximum(sorties, 1e-12)[:, None], debut[None, :])
+    scores = debut.copy()
+    for _ in range(iterations):
+        nouveaux = (1 - amortissement) * debut + amortissement * transition.T @ scores
+        if np.abs(nouveaux - scores).sum() < tolerance:
+            return nouveaux
+        scores = nouveaux
+    return scores
+
+
+def resume_extractif(texte, nb_phrases=3):
+    """Les `nb_phrases` phrases les mieux classées par TextRank, dans l'ordre du texte."""
+    phrases = decouper_phrases(texte)
+    if len(phrases) <= nb_phrases:
+        return ' '.join(phrases)
+    retenues = np.sort(np.argsort(-textrank(phrases), kind='stable')[:nb_phrases])
+    return ' '.join(phrases[i] for i in retenues)
+
+
+class Resumeur:
+    """Choisit le niveau de résumé selon la longueur du texte et compte l'usage de chaque niveau."""
+
+    NIVEAUX = ('court', 'extractif', 'ollama')
+
+    def __init__(self, court=600, long=4000, nb_phrases=3):
+        self.court = court
+        self.long = long
+        self.nb_phrases = nb_phrases
+        self._compteurs = dict.fromkeys(self.NIVEAUX, 0)
+        self._verrou = threading.Lock()
+
+    def niveau(self, texte):
+        if len(texte) <= self.court:
+            return 'court'
+        if len(texte) > self.long:
+            # Un long corps sans ponctuation exploitable (1 à 3 "phrases") doit quand même être résumé
+            return 'ollama'
+        return 'court' if len(decouper_phrases(texte)) <= self.nb_phrases else 'extractif'
+
+    def resumer(self, texte, resumer_llm):
+        """
+        Résumé de `texte` ; `resumer_llm(texte)` n'est appelé que pour les textes longs
+        (ses exceptions remontent à l'appelant, qui garde sa propre gestion d'erreur).
+        """
+        texte = nettoyer(texte)
+        niveau = self.niveau(texte)
+        if niveau == 'court':
+            resume = texte or RESUME_INDISPONIBLE
+        elif niveau == 'extractif':
+            resume = resume_extractif(texte, self.nb_phrases)
+        else:
+            resume = resumer_llm(texte)
+        with self._verrou:
+            self._compteurs[niveau] += 1
+        return resume
+
+    def stats(self):
+        with self._verrou:
+            compteurs = dict(self._compteurs)
+        total = sum(compteurs.values())
+        return {**compteurs, 'part_sans_ollama': round(1 - compteurs['ollama'] / total, 3) if total else None}
@@ -0,0 +1,199 @@
+"""
+Planificateur des tâches de fond (import des articles, rafraîchissement des actualités), hors des requêtes HTTP.
+
+    scheduler = Scheduler(stockage_persistant, app)
+    scheduler.add_job('ingestion', fetch_and_process_articles, intervalle=86400)
+    scheduler.start()            # dans le process web (SCHEDULER_ENABLED=1)
+    flask scheduler              # ou dans un worker séparé
+
+- L'état est dans un stockage partagé sans éviction (SQLiteCache(threshold=0, max_bytes=0)) : date et résultat
+  du dernier run de chaque tâche, demandes en attente et un battement de cœur ("heartbeat") du planificateur
+  actif. Dans le cache des vues, l'éviction du dernier run relancerait l'import quotidien.
+- Un bail (add atomique) garantit qu'un seul worker exécute une tâche à la fois,
+  même si plusieurs process gunicorn et un worker dédié tournent en même temps. Il n'est libéré que par
+  son titulaire : un run plus long que son bail ne supprime pas celui qu'un autre worker a pris entre-temps.
+- enqueue(nom) demande un run immédiat et rend la main tout de suite : le planificateur actif le prend
+  au prochain tour ; si aucun ne tourne, la tâche est lancée dans un thread du process courant.
+"""
+import logging
+import os
+import threading
+import time
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from sqlite_cache import jeton_bail, liberer_bail
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    def __init__(self, nom, fonction, intervalle, lease):
+        self.nom = nom
+        self.fonction = fonction
+        self.intervalle = intervalle  # secondes entre deux runs (None = seulement sur demande)
+        self.lease = lease            # durée max d'un run avant qu'un autre worker puisse le relancer
+
+
+class Scheduler:
+    """
+    :param store: stockage partagé entre les workers (get / set / add / delete) qui n'évince pas les entrées
+                  avant leur expiration, `stockage_persistant` dans l'app.
+    :param tick: secondes entre deux vérifications des tâches à lancer.
+    """
+
+    def __init__(self, store, app=None, tick=30, prefix='scheduler:'):
+        self.store = store
+        self.app = app
+        self.tick = tick
+        self.prefix = prefix
+        self.jobs = {}
+        self._threads = {}
+        self._reveil = threading.Event()
+        self._arret = threading.Event()
+        self._boucle = None
+        if app is not None:
+            app.extensions['scheduler'] = self
+
+    def add_job(self, nom, fonction, intervalle=None, lease=3600):
+        self.jobs[nom] = Job(nom, fonction, intervalle, lease)
+
+    def _cle(self, nom, quoi):
+        return f'{self.prefix}{nom}:{quoi}'
+
+    def dernier_run(self, nom):
+        return self.store.get(self._cle(nom, 'dernier'))
+
+    def est_du(self, job, maintenant=None):
+        """Vrai si un run est demandé ou si le dernier date de plus de `intervalle` secondes."""
+        if self.store.get(self._cle(job.nom, 'demande')):
+            return True
+        if job.intervalle is None:
+            return False
+        dernier = self.dernier_run(job.nom)
+        return dernier is None or (maintenant or time.time()) - dernier['debut'] >= job.intervalle
+
+    def actif_ailleurs(self):
+        """Un planificateur (ce process ou un worker) a donné signe de vie récemment."""
+        return self.store.get(f'{self.prefix}heartbeat') is not None
+
+    # === Exécution ===
+
+    def run_pending(self):
+        """Lance (chacune dans un thread) les tâches dues qui ne tournent pas déjà. Renvoie leurs noms."""
+        self.store.set(f'{self.prefix}heartbeat', os.getpid(), timeout=3 * self.tick)
+        lancees = []
+        for job in self.jobs.values():
+            thread = self._threads.get(job.nom)
+            if (thread is None or not thread.is_alive()) and self.est_du(job):
+                if self._lancer(job):
+                    lancees.append(job.nom)
+        return lancees
+
+    def _lancer(self, job):
+        # Bail partagé : add() échoue si un autre worker exécute déjà cette tâche
+        jeton = jeton_bail()
+        if not self.store.add(self._cle(job.nom, 'lease'), jeton, timeout=job.lease):
+            return False
+        self.store.delete(self._cle(job.nom, 'demande'))
+        thread = threading.Thread(target=self._executer, args=(job, jeton), name=f'job-{job.nom}', daemon=True)
+        self._threads[job.nom] = thread
+        thread.start()
+        return True
+
+    def _executer(self, job, jeton):
+        debut = time.time()
+        etat = {'debut': debut, 'pid': os.getpid(), 'statut': 'ok', 'erreur': None}
+        try:
+            if self.app is not None:
+                with self.app.app_context():
+                    job.fonction()
+            else:
+                job.fonction()
+        except Exception as e:
+            etat.update(statut='erreur', erreur=str(e))
+            logger.exception(f"Échec de la tâche {job.nom}")
+        finally:
+            etat['duree'] = round(time.time() - debut, 2)
+            self.store.set(self._cle(job.nom, 'dernier'), etat, timeout=0)
+            liberer_bail(self.store, self._cle(job.nom, 'lease'), jeton)
+            logger.info(f"Tâche {job.nom} terminée ({etat['statut']}) en {etat['duree']}s")
+
+    def enqueue(self, nom):
+        """
+        Demande un run de la tâche sans attendre. Renvoie False si elle tourne déjà quelque part,
+        True si la demande est prise en compte.
+        """
+        if self.store.has(self._cle(nom, 'lease')):
+            return False
+        self.store.set(self._cle(nom, 'demande'), time.time(), timeout=0)
+        if self._boucle is not None and self._boucle.is_alive():
+            self._reveil.set()
+        elif not self.actif_ailleurs():
+            # Aucun planificateur ne tourne : la tâche part tout de suite dans un thread de ce process
+            self._lancer(self.jobs[nom])
+        return True
+
+    def wait(self, nom, timeout=None):
+        """Attend la fin du run lancé par ce process (tests, commandes CLI)."""
+        thread = self._threads.get(nom)
+        if thread is not None:
+            thread.join(timeout)
+
+    # === Boucle ===
+
+    def run_forever(self):
+        while not self._arret.is_set():
+            try:
+                self.run_pending()
+            except Exception:
+                logger.exception("Erreur du planificateur")
+            self._reveil.wait(self.tick)
+            self._reveil.clear()
+
+    def start(self):
+        """Lance la boucle dans un thread du process (mode "in-process")."""
+        if self._boucle is None or not self._boucle.is_alive():
+            self._arret.clear()
+            self._boucle = threading.Thread(target=self.run_forever, name='scheduler', daemon=True)
+            self._boucle.start()
+        return self._boucle
+
+    def stop(self):
+        self._arret.set()
+        self._reveil.set()
+
+    def stats(self):
+        return {
+            'actif_ici': self._boucle is not None and self._boucle.is_alive(),
+            'actif_ailleurs': self.actif_ailleurs(),
+            'jobs': {
+                nom: {
+                    'intervalle': job.intervalle,
+                    'en_cours': self.store.has(self._cle(nom, 'lease')),
+                    'demande': self.store.has(self._cle(nom, 'demande')),
+                    'dernier_run': self.dernier_run(nom),
+                }
+                for nom, job in self.jobs.items()
+            },
+        }
+
+
+@click.command('scheduler')
+@click.option('--once', is_flag=True, help="Lance les tâches dues, attend leur fin et s'arrête.")
+@with_appcontext
+def scheduler_command(once):
+    """Worker dédié aux tâches de fond (import des articles, rafraîchissement des actualités)."""
+    scheduler = current_app.extensions['scheduler']
+    if once:
+        for nom in scheduler.run_pending():
+            scheduler.wait(nom)
+            click.echo(f"{nom} : {scheduler.dernier_run(nom)}")
+        return
+    click.echo(f"Planificateur démarré (tâches : {', '.join(scheduler.jobs)}, vérification toutes les {scheduler.tick}s)")
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        scheduler.stop()
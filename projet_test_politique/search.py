@@ -0,0 +1,302 @@
+"""
+Index plein texte SQLite FTS5 sur les articles (titre, contenu complet) et les questions (texte).
+
+- Les tables virtuelles article_fts / question_fts utilisent le même rowid que article / question.
+- article_fts garde le texte en clair des articles (nécessaire à snippet()) : avec TEXT_COMPRESSION activé,
+  le corps des articles est donc stocké une fois compressé dans article et une fois en clair dans l'index.
+- Elles sont tenues à jour par des événements ORM (et pas par des triggers SQL, car Article.content
+  peut être stocké compressé : seul le code Python voit le texte en clair).
+- Les suppressions en masse (query.delete, SQL brut des commandes) ne déclenchent pas ces événements :
+  elles appellent desindexer() dans la même transaction. Pour le reste, les recherches refont une
+  jointure sur la vraie table, et "flask search rebuild" reconstruit l'index complet.
+- Si FTS5 n'est pas disponible, on retombe sur des LIKE.
+"""
+import logging
+import re
+import unicodedata
+from difflib import SequenceMatcher
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import event, inspect, text
+
+from models import db, Article, Question
+
+FTS_TABLES = ('article_fts', 'question_fts')
+FTS_AVAILABLE = False
+
+# Mots trop fréquents pour aider à trouver des doublons
+MOTS_VIDES = {
+    'les', 'des', 'une', 'est', 'que', 'qui', 'pour', 'dans', 'sur', 'par', 'pas', 'plus', 'vous', 'votre',
+    'vos', 'avec', 'aux', 'son', 'ses', 'leur', 'leurs', 'cette', 'ces', 'quel', 'quelle', 'quels', 'quelles',
+    'pensez', 'opinion', 'selon', 'comment', 'elle', 'ils', 'faut', 'doit', 'etre', 'avoir', 'favorable',
+}
+
+search_cli = AppGroup('search', help="Index plein texte (FTS5) des articles et des questions.")
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """Filtre pour Alembic : les tables FTS (et leurs tables internes) ne sont pas gérées par les migrations."""
+    if type_ == 'table' and name.startswith(FTS_TABLES):
+        return False
+    return True
+
+
+def _normaliser(texte):
+    texte = unicodedata.normalize('NFKD', texte or '').encode('ascii', 'ignore').decode('ascii')
+    return texte.lower()
+
+
+def _tokens(texte):
+    return re.findall(r'\w+', _normaliser(texte))
+
+
+def build_match_query(texte, operateur='AND', prefix_last=False, mots_vides=False):
+    """Transforme un texte libre en requête MATCH FTS5 sûre (chaque mot est mis entre guillemets)."""
+    mots = [m for m in _tokens(texte) if len(m) > 2 and (mots_vides or m not in MOTS_VIDES)]
+    if not mots:
+        return None
+    termes = [f'"{m}"' for m in dict.fromkeys(mots)]
+    if prefix_last:
+        termes[-1] += '*'
+    return f' {operateur} '.join(termes)
+
+
+def build_candidate_query(texte, nb_mots=8):
+    """
+    Requête MATCH des candidats doublons : au moins deux mots significatifs en commun parmi les
+    `nb_mots` plus longs (les plus discriminants). Un simple OU ferait noter une grosse partie de la table.
+    """
+    mots = sorted(
+        dict.fromkeys(m for m in _tokens(texte) if len(m) > 2 and m not in MOTS_VIDES),
+        key=len, reverse=True
+    )[:nb_mots]
+    if len(mots) < 2:
+        return f'"{mots[0]}"' if mots else None
+    paires = [f'("{a}" AND "{b}")' for i, a in enumerate(mots) for b in mots[i + 1:]]
+    return ' OR '.join(paires)
+
+
+# ====================================
+# === Création et maintien à jour ===
+# ====================================
+
+def create_search_tables(connection):
+    connection.execute(text(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS article_fts USING fts5("
+        "title, content, tokenize = 'unicode61 remove_diacritics 2')"
+    ))
+    connection.execute(text(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS question_fts USING fts5("
+        "texte, tokenize = 'unicode61 remove_diacritics 2')"
+    ))
+
+
+def _index_article(connection, article):
+    connection.execute(text("DELETE FROM article_fts WHERE rowid = :id"), {"id": article.id})
+    connection.execute(
+        text("INSERT INTO article_fts (rowid, title, content) VALUES (:id, :title, :content)"),
+        {"id": article.id, "title": article.title or '', "content": article.content or ''},
+    )
+
+
+def _index_question(connection, question):
+    connection.execute(text("DELETE FROM question_fts WHERE rowid = :id"), {"id": question.id})
+    connection.execute(
+        text("INSERT INTO question_fts (rowid, texte) VALUES (:id, :texte)"),
+        {"id": question.id, "texte": question.texte or ''},
+    )
+
+
+def _article_after_insert(mapper, connection, target):
+    _index_article(connection, target)
+
+
+def _article_after_update(mapper, connection, target):
+    etat = inspect(target)
+    if etat.attrs.title.history.has_changes() or etat.attrs.content.history.has_changes():
+        _index_article(connection, target)
+
+
+def _question_after_insert(mapper, connection, target):
+    _index_question(connection, target)
+
+
+def _question_after_update(mapper, connection, target):
+    if inspect(target).attrs.texte.history.has_changes():
+        _index_question(connection, target)
+
+
+def _after_delete(table):
+    def listener(mapper, connection, target):
+        connection.execute(text(f"DELETE FROM {table} WHERE rowid = :id"), {"id": target.id})
+    return listener
+
+
+def desindexer(table, ids=None, sous_requete=None, params=None):
+    """
+    Retire de l'index les lignes de `table` ('article' ou 'question') supprimées en masse, à appeler
+    dans la transaction de la suppression : soit une liste d'`ids`, soit une `sous_requete` SQL qui
+    renvoie les ids (évaluée avant le DELETE).
+    """
+    if not FTS_AVAILABLE:
+        return
+    if sous_requete is None:
+        ids = [int(i) for i in ids or []]
+        if not ids:
+            return
+        sous_requete = ', '.join(str(i) for i in ids)
+    db.session.execute(text(f"DELETE FROM {table}_fts WHERE rowid IN ({sous_requete})"), params or {})
+
+
+def rebuild_search_index(batch_size=1000):
+    """Reconstruit les deux index à partir des tables article et question."""
+    with db.engine.begin() as connection:
+        connection.execute(text("DELETE FROM article_fts"))
+        connection.execute(text("DELETE FROM question_fts"))
+    total_articles = total_questions = 0
+    dernier_id = 0
+    while True:
+        articles = db.session.query(Article.id, Article.title, Article.content).filter(
+            Article.id > dernier_id
+        ).order_by(Article.id).limit(batch_size).all()
+        if not articles:
+            break
+        db.session.execute(
+            text("INSERT INTO article_fts (rowid, title, content) VALUES (:id, :title, :content)"),
+            [{"id": a.id, "title": a.title or '', "content": a.content or ''} for a in articles],
+        )
+        dernier_id = articles[-1].id
+        total_articles += len(articles)
+    db.session.execute(text("INSERT INTO question_fts (rowid, texte) SELECT id, texte FROM question"))
+    total_questions = db.session.execute(text("SELECT COUNT(*) FROM question_fts")).scalar()
+    db.session.execute(text("INSERT INTO article_fts (article_fts) VALUES ('optimize')"))
+    db.session.execute(text("INSERT INTO question_fts (question_fts) VALUES ('optimize')"))
+    db.session.commit()
+    return total_articles, total_questions
+
+
+def init_search(app):
+    """Crée les tables FTS5 si besoin et branche les événements ORM. Sans FTS5, la recherche utilise LIKE."""
+    global FTS_AVAILABLE
+    with app.app_context():
+        if db.engine.dialect.name != 'sqlite':
+            return
+        try:
+            with db.engine.begin() as connection:
+                deja_creees = connection.execute(
+                    text("SELECT COUNT(*) FROM sqlite_master WHERE name = 'question_fts'")
+                ).scalar()
+                # Index créé avec les seuls extraits des articles : recréé sur le contenu complet
+                colonnes = [ligne[1] for ligne in connection.execute(text("PRAGMA table_info(article_fts)"))]
+                if 'extrait' in colonnes:
+                    connection.execute(text("DROP TABLE article_fts"))
+                    deja_creees = False
+                create_search_tables(connection)
+        except Exception as e:
+            logging.warning(f"FTS5 indisponible, recherche en LIKE : {e}")
+            return
+        FTS_AVAILABLE = True
+        if not deja_creees:
+            rebuild_search_index()
+
+    if not event.contains(Article, 'after_insert', _article_after_insert):
+        event.listen(Article, 'after_insert', _article_after_insert)
+        event.listen(Article, 'after_update', _article_after_update)
+        event.listen(Article, 'after_delete', _after_delete('article_fts'))
+        event.listen(Question, 'after_insert', _question_after_insert)
+        event.listen(Question, 'after_update', _question_after_update)
+        event.listen(Question, 'after_delete', _after_delete('question_fts'))
+    app.cli.add_command(search_cli)
+
+
+# ===================
+# === Recherches ===
+# ===================
+
+def search_questions(texte, limit=20, operateur='AND', prefix_last=True):
+    """Questions classées par pertinence (bm25) : liste de dict {id, texte, categorie, valide, score, extrait}."""
+    if not FTS_AVAILABLE:
+        return _search_questions_like(texte, limit)
+    match = build_match_query(texte, operateur=operateur, prefix_last=prefix_last, mots_vides=True)
+    if not match:
+        return []
+    lignes = db.session.execute(text("""
+        SELECT q.id, q.texte, q.categorie, q.valide, bm25(question_fts) AS score,
+               snippet(question_fts, 0, '[', ']', '…', 12) AS extrait
+        FROM question_fts JOIN question q ON q.id = question_fts.rowid
+        WHERE question_fts MATCH :match
+        ORDER BY score LIMIT :limit
+    """), {"match": match, "limit": limit}).mappings().all()
+    return [dict(ligne) for ligne in lignes]
+
+
+def search_articles(texte, limit=20, prefix_last=True):
+    """Articles classés par pertinence (bm25, le titre compte double)."""
+    if not FTS_AVAILABLE:
+        return _search_articles_like(texte, limit)
+    match = build_match_query(texte, prefix_last=prefix_last, mots_vides=True)
+    if not match:
+        return []
+    lignes = db.session.execute(text("""
+        SELECT a.id, a.title, a.url, a.category, bm25(article_fts, 2.0, 1.0) AS score,
+               snippet(article_fts, 1, '[', ']', '…', 16) AS extrait
+        FROM article_fts JOIN article a ON a.id = article_fts.rowid
+        WHERE article_fts MATCH :match
+        ORDER BY score LIMIT :limit
+    """), {"match": match, "limit": limit}).mappings().all()
+    return [dict(ligne) for ligne in lignes]
+
+
+def similarite(texte_a, texte_b):
+    """Ratio de ressemblance (0 à 1) entre deux textes normalisés (accents, casse, ponctuation ignorés)."""
+    return SequenceMatcher(None, " ".join(_tokens(texte_a)), " ".join(_tokens(texte_b))).ratio()
+
+
+def find_similar_question(texte, seuil=0.75, candidats=10):
+    """
+    Recherche d'un doublon pour l'ingestion : l'index FTS fournit quelques candidats
+    (questions partageant au moins deux mots significatifs), puis on compare les textes normalisés.
+    Renvoie la question la plus proche au-dessus du seuil, ou None.
+    """
+    if FTS_AVAILABLE:
+        match = build_candidate_query(texte)
+        if not match:
+            return None
+        ids = [ligne[0] for ligne in db.session.execute(text("""
+            SELECT rowid FROM question_fts WHERE question_fts MATCH :match ORDER BY rank LIMIT :n
+        """), {"match": match, "n": candidats})]
+        questions = Question.query.filter(Question.id.in_(ids)).all() if ids else []
+    else:
+        questions = Question.query.filter(
+            db.func.lower(Question.texte).like(f"%{texte.lower().strip()[5:35]}%")
+        ).limit(candidats).all()
+
+    meilleure, meilleur_score = None, 0.0
+    for question in questions:
+        score = similarite(texte, question.texte)
+        if score > meilleur_score:
+            meilleure, meilleur_score = question, score
+    return meilleure if meilleur_score >= seuil else None
+
+
+def _search_questions_like(texte, limit):
+    questions = Question.query.filter(Question.texte.ilike(f"%{texte}%")).limit(limit).all()
+    return [{"id": q.id, "texte": q.texte, "categorie": q.categorie, "valide": q.valide,
+             "score": None, "extrait": q.texte[:120]} for q in questions]
+
+
+def _search_articles_like(texte, limit):
+    articles = Article.query.filter(Article.title.ilike(f"%{texte}%")).limit(limit).all()
+    return [{"id": a.id, "title": a.title, "url": a.url, "category": a.category,
+             "score": None, "extrait": a.title} for a in articles]
+
+
+@search_cli.command('rebuild')
+def rebuild_command():
+    """Reconstruit l'index plein texte (après des imports ou suppressions en masse)."""
+    if not FTS_AVAILABLE:
+        click.echo("FTS5 n'est pas disponible dans ce SQLite.")
+        return
+    total_articles, total_questions = rebuild_search_index()
+    click.echo(f"✅ Index reconstruit : {total_articles} articles, {total_questions} questions.")
@@ -0,0 +1,204 @@
+"""
+Sessions côté serveur : le cookie ne contient plus qu'un identifiant opaque (signé),
+les données sont rangées dans un SQLiteCache sans éviction (threshold=0, max_bytes=0) avec une durée de vie (TTL) :
+dans le cache des vues, l'éviction LRU déconnecterait les utilisateurs dès que le cache se remplit.
+
+- L'enregistrement principal (user_id, drapeaux du quiz, messages flash...) n'est lu qu'au premier accès
+  à la session pendant la requête.
+- Les clés volumineuses (LAZY_KEYS : texte de l'analyse, listes de catégories, historique du chat)
+  sont stockées à part et chargées seulement par les routes qui les lisent.
+- Le TTL repart à chaque modification et à chaque lecture de la session (au plus une fois par
+  `renouvellement` secondes, pour ne pas écrire à chaque requête) : une session utilisée n'expire pas.
+- Une session vidée (logout) est supprimée du cache et son cookie effacé.
+"""
+import secrets
+import time
+
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer
+
+LAZY_KEYS = ('analyse', 'categories_vides', 'categories_vides_sauvegardees', 'dashboard_chat_history')
+# Clés techniques de l'enregistrement principal, invisibles pour les routes
+CLES_INTERNES = ('_lazy_keys', '_renouvele')
+
+
+class ServerSession(SessionMixin):
+    """Session dont le contenu est lu dans le cache seulement quand on y accède."""
+
+    def __init__(self, interface, sid, new=False):
+        self.interface = interface
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.accessed = False
+        self._data = {} if new else None
+        self._lazy = {}              # valeurs des LAZY_KEYS déjà chargées pendant la requête
+        self._lazy_supprimees = set()
+
+    def _principal(self):
+        self.accessed = True
+        if self._data is None:
+            self._data = self.interface.load(self.sid) or {}
+        return self._data
+
+    def _cles_lazy(self):
+        return self._principal().setdefault('_lazy_keys', [])
+
+    def __getitem__(self, key):
+        if key not in self.interface.lazy_keys:
+            return self._principal()[key]
+        if key not in self._cles_lazy():
+            raise KeyError(key)
+        if key not in self._lazy:
+            valeur = self.interface.load(self.sid, key)
+            if valeur is None:  # expirée séparément de l'enregistrement principal
+                self._cles_lazy().remove(key)
+                raise KeyError(key)
+            self._lazy[key] = valeur
+        return self._lazy[key]
+
+    def __setitem__(self, key, value):
+        self.modified = True
+        if key in self.interface.lazy_keys:
+            if key not in self._cles_lazy():
+                self._cles_lazy().append(key)
+            self._lazy[key] = value
+            self._lazy_supprimees.discard(key)
+        else:
+            self._principal()[key] = value
+
+    def __delitem__(self, key):
+        if key in self.interface.lazy_keys:
+            if key not in self._cles_lazy():
+                raise KeyError(key)
+            self._cles_lazy().remove(key)
+            self._lazy.pop(key, None)
+            self._lazy_supprimees.add(key)
+        else:
+            del self._principal()[key]
+        self.modified = True
+
+    def __contains__(self, key):
+        if key in self.interface.lazy_keys:
+            return key in self._cles_lazy()
+        return key in self._principal()
+
+    def __iter__(self):
+        return iter([k for k in self._principal() if k not in CLES_INTERNES] + list(self._cles_lazy()))
+
+    def __len__(self):
+        return len(list(iter(self)))
+
+    def clear(self):
+        self._lazy_supprimees.update(self._cles_lazy())
+        self._data = {}
+        self._lazy = {}
+        self.modified = True
+        self.accessed = True
+
+    def regenerate(self):
+        """Nouvel identifiant en gardant le contenu (à appeler à la connexion, contre la fixation de session)."""
+        for key in list(self._cles_lazy()):
+            self.get(key)  # charge les valeurs avant de changer d'identifiant
+        self.interface.delete(self.sid, self._cles_lazy())
+        self.sid = self.interface.generate_sid()
+        self._lazy_supprimees.clear()
+        self.modified = True
+
+
+class ServerSessionInterface(SessionInterface):
+    """
+    :param store: objet avec get / set(key, value, timeout) / delete, qui n'évince pas les entrées
+                  avant leur expiration (SQLiteCache(threshold=0, max_bytes=0)) ; touch() est utilisé s'il existe.
+    :param ttl: durée de vie en secondes d'une session inactive (remise à zéro à chaque modification ou lecture).
+    :param renouvellement: délai minimal en secondes entre deux remises à zéro du TTL par une simple lecture.
+    """
+
+    def __init__(self, store, ttl=7 * 86400, prefix='session:', lazy_keys=LAZY_KEYS, renouvellement=3600):
+        self.store = store
+        self.ttl = ttl
+        self.renouvellement = renouvellement
+        self.prefix = prefix
+        self.lazy_keys = set(lazy_keys)
+
+    def generate_sid(self):
+        return secrets.token_urlsafe(32)
+
+    def _cle(self, sid, key=None):
+        return f'{self.prefix}{sid}' if key is None else f'{self.prefix}{sid}:{key}'
+
+    def load(self, sid, key=None):
+        return self.store.get(self._cle(sid, key))
+
+    def delete(self, sid, lazy_keys=()):
+        self.store.delete(self._cle(sid))
+        for key in lazy_keys:
+            self.store.delete(self._cle(sid, key))
+
+    def renouveler(self, session):
+        """Repousse l'expiration d'une session lue mais pas modifiée (enregistrement principal et clés à part)."""
+        maintenant = time.time()
+        if maintenant - session._data.get('_renouvele', 0) < self.renouvellement:
+            return
+        session._data['_renouvele'] = maintenant
+        self.store.set(self._cle(session.sid), session._data, timeout=self.ttl)
+        cles = [self._cle(session.sid, key) for key in session._cles_lazy() if key not in session._lazy]
+        if hasattr(self.store, 'touch'):
+            self.store.touch(*cles, timeout=self.ttl)
+            return
+        for cle in cles:
+            valeur = self.store.get(cle)
+            if valeur is not None:
+                self.store.set(cle, valeur, timeout=self.ttl)
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt='server-session')
+
+    def open_session(self, app, request):
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie:
+            try:
+                sid = self._signer(app).unsign(cookie).decode()
+                return ServerSession(self, sid)
+            except BadSignature:
+                pass
+        return ServerSession(self, self.generate_sid(), new=True)
+
+    def save_session(self, app, session, response):
+        nom = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.accessed:
+            response.vary.add('Cookie')
+        if not session.modified:
+            # Les listes chargées ont pu être modifiées sur place (session['categories_vides'].append(...))
+            for key, valeur in session._lazy.items():
+                self.store.set(self._cle(session.sid, key), valeur, timeout=self.ttl)
+            if session._data and not session.new:
+                self.renouveler(session)
+            return
+
+        if not session:
+            self.delete(session.sid, session._lazy_supprimees)
+            if not session.new:
+                response.delete_cookie(nom, domain=domain, path=path)
+            return
+
+        for key in session._lazy_supprimees:
+            self.store.delete(self._cle(session.sid, key))
+        for key, valeur in session._lazy.items():
+            self.store.set(self._cle(session.sid, key), valeur, timeout=self.ttl)
+        session._principal()['_renouvele'] = time.time()
+        self.store.set(self._cle(session.sid), session._principal(), timeout=self.ttl)
+
+        response.set_cookie(
+            nom,
+            self._signer(app).sign(session.sid).decode(),
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
@@ -0,0 +1,107 @@
+"""
+Détection des quasi-doublons d'articles (SimHash + index LSH par bandes).
+
+NewsAPI renvoie beaucoup d'articles presque identiques sous des URL différentes (mises à jour
+successives des directs "En direct, ..."), que l'unicité de l'URL ne voit pas.
+
+- signature(titre, contenu) : SimHash 64 bits des paires de mots consécutifs du texte normalisé.
+  Deux textes proches ont des signatures qui ne diffèrent que de quelques bits (distance de Hamming).
+- IndexSimHash : la signature est coupée en `distance_max + 1` bandes ; deux signatures à distance
+  <= distance_max ont forcément au moins une bande identique (principe des tiroirs). Une recherche ne
+  compare donc que les articles qui partagent une bande, au lieu de tout l'historique.
+- Les signatures sont stockées dans Article.simhash (entier signé 64 bits pour SQLite) :
+  "flask articles simhash" calcule celles des articles existants.
+"""
+import hashlib
+import re
+from collections import defaultdict
+
+from classifieur import normaliser
+
+BITS = 64
+MASQUE = (1 << BITS) - 1
+
+
+# NewsAPI tronque "content" et ajoute la longueur restante ("… [+2345 chars]"), qui change à chaque mise à jour
+TRONCATURE = re.compile(r'\s*\[\+\d+ chars\]\s*$')
+
+
+def _mots(texte):
+    return re.findall(r'\w+', normaliser(texte))
+
+
+def _hash64(morceau):
+    return int.from_bytes(hashlib.blake2b(morceau.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def signature(titre, contenu=''):
+    """SimHash 64 bits (entier positif) du titre et du contenu, None si le texte est vide."""
+    mots = _mots(f"{titre or ''} {TRONCATURE.sub('', contenu or '')}")
+    if not mots:
+        return None
+    morceaux = [' '.join(mots[i:i + 2]) for i in range(max(len(mots) - 1, 1))]
+    # Chaque bit vaut 1 si la majorité des hachages des morceaux l'ont à 1 (comptage colonne par colonne
+    # sur les écritures binaires, bien plus rapide qu'une boucle sur les 64 bits de chaque hachage)
+    colonnes = zip(*(format(_hash64(morceau), '064b') for morceau in morceaux))
+    return int(''.join('1' if 2 * colonne.count('1') > len(morceaux) else '0' for colonne in colonnes), 2)
+
+
+def distance(a, b):
+    """Distance de Hamming entre deux signatures."""
+    return bin((a ^ b) & MASQUE).count('1')
+
+
+def vers_sqlite(sig):
+    """Signature 64 bits non signée -> entier signé (les INTEGER SQLite sont signés)."""
+    return None if sig is None else (sig - (1 << BITS) if sig >= 1 << (BITS - 1) else sig)
+
+
+def depuis_sqlite(valeur):
+    return None if valeur is None else valeur & MASQUE
+
+
+class IndexSimHash:
+    """Index en mémoire des signatures : bande -> valeur de la bande -> identifiants."""
+
+    def __init__(self, distance_max=5):
+        self.distance_max = distance_max
+        self.nb_bandes = distance_max + 1
+        self.largeur = BITS // self.nb_bandes
+        self._bandes = [defaultdict(list) for _ in range(self.nb_bandes)]
+        self._signatures = {}
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _valeurs_bandes(self, sig):
+        masque = (1 << self.largeur) - 1
+        for i in range(self.nb_bandes):
+            # La dernière bande prend les bits restants quand 64 ne se divise pas exactement
+            if i == self.nb_bandes - 1:
+                yield i, sig >> (i * self.largeur)
+            else:
+                yield i, (sig >> (i * self.largeur)) & masque
+
+    def ajouter(self, identifiant, sig):
+        if sig is None:
+            return
+        self._signatures[identifiant] = sig
+        for i, valeur in self._valeurs_bandes(sig):
+            self._bandes[i][valeur].append(identifiant)
+
+    def candidats(self, sig):
+        vus = set()
+        for i, valeur in self._valeurs_bandes(sig):
+            vus.update(self._bandes[i].get(valeur, ()))
+        return vus
+
+    def plus_proche(self, sig):
+        """(identifiant, distance) de l'entrée la plus proche à distance <= distance_max, ou None."""
+        if sig is None:
+            return None
+        meilleur = None
+        for identifiant in self.candidats(sig):
+            d = distance(sig, self._signatures[identifiant])
+            if d <= self.distance_max and (meilleur is None or d < meilleur[1]):
+                meilleur = (identifiant, d)
+        return meilleur
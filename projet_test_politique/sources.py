@@ -0,0 +1,263 @@
+"""
+Sources d'articles interchangeables pour l'ingestion : NewsAPI et flux RSS / Atom.
+
+    etat = EtatConditionnel('instance/newsapi/flux.json')
+    sources = [SourceNewsApi(news_source, params_newsapi()),
+               SourceFlux('https://www.lemonde.fr/politique/rss_full.xml', etat=etat)]
+    for source, pages in recuperer_sources(sources): ...
+    valider_sources(sources)   # fin du run : watermarks NewsAPI et validateurs HTTP des flux enregistrés
+
+- Chaque adaptateur a un `nom`, une méthode pages() qui rend (page, [articles normalisés]), valider() et stats().
+- Un article normalisé (article_normalise) a les champs de la table Article (title, content, url, category,
+  published_at) plus le nom de sa source : le reste du pipeline (ingest.py) ne sait pas d'où il vient.
+- recuperer_sources() interroge toutes les sources en même temps (ThreadPoolExecutor) : ajouter un flux
+  n'allonge pas le rafraîchissement d'autant.
+- Les flux sont demandés en GET conditionnel (If-None-Match / If-Modified-Since avec l'ETag et le Last-Modified
+  de la dernière réponse) : un flux inchangé ne coûte qu'une réponse 304 vide. Comme les watermarks de NewsAPI,
+  les validateurs ne sont enregistrés qu'avec valider(), pour qu'un run interrompu redemande le flux complet.
+"""
+import html
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from xml.etree import ElementTree
+
+from news_source import session_http
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+CONTENU_RSS = '{http://purl.org/rss/1.0/modules/content/}encoded'
+
+
+def article_normalise(titre, contenu, url, publie_le='', categorie=None, source=''):
+    """Article commun à toutes les sources, avec les champs de la table Article."""
+    return {
+        'title': titre or '',
+        'content': contenu or '',
+        'url': url or '',
+        'category': categorie or 'Non précisé',
+        'published_at': publie_le or '',
+        'source': source,
+    }
+
+
+def depuis_newsapi(article, source='newsapi'):
+    return article_normalise(article.get('title'), article.get('content') or article.get('description'),
+                             article.get('url'), article.get('publishedAt'), article.get('category'), source)
+
+
+def texte_brut(texte):
+    """Description HTML d'un flux -> texte (balises enlevées, entités décodées, espaces regroupés)."""
+    texte = html.unescape(re.sub(r'<[^>]+>', ' ', texte or ''))
+    return re.sub(r'\s+', ' ', texte).strip()
+
+
+def date_iso(valeur):
+    """Date RSS (RFC 822) ou Atom (ISO 8601) -> '2024-05-01T10:00:00Z' comme NewsAPI, '' si illisible."""
+    valeur = (valeur or '').strip()
+    if not valeur:
+        return ''
+    try:
+        date = datetime.fromisoformat(valeur.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            date = parsedate_to_datetime(valeur)
+        except (TypeError, ValueError):
+            return ''
+    if date.tzinfo is not None:
+        date = date.astimezone(timezone.utc)
+    return date.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _texte(element, chemin):
+    trouve = element.find(chemin)
+    return trouve.text or '' if trouve is not None else ''
+
+
+def lire_flux(contenu, source='', categorie=None):
+    """Articles normalisés d'un flux RSS 2.0 ou Atom (octets ou texte XML)."""
+    racine = ElementTree.fromstring(contenu)
+    articles = []
+    if racine.tag == ATOM + 'feed':
+        for entree in racine.iter(ATOM + 'entry'):
+            liens = entree.findall(ATOM + 'link')
+            lien = next((l for l in liens if l.get('rel', 'alternate') == 'alternate'), liens[0] if liens else None)
+            terme = entree.find(ATOM + 'category')
+            articles.append(article_normalise(
+                texte_brut(_texte(entree, ATOM + 'title')),
+                texte_brut(_texte(entree, ATOM + 'content') or _texte(entree, ATOM + 'summary')),
+                lien.get('href') if lien is not None else '',
+                date_iso(_texte(entree, ATOM + 'published') or _texte(entree, ATOM + 'updated')),
+                terme.get('term') if terme is not None else categorie, source,
+            ))
+    else:
+        for item in racine.iter('item'):
+            articles.append(article_normalise(
+                texte_brut(_texte(item, 'title')),
+                texte_brut(_texte(item, CONTENU_RSS) or _texte(item, 'description')),
+                _texte(item, 'link').strip() or _texte(item, 'guid').strip(),
+                date_iso(_texte(item, 'pubDate')),
+                _texte(item, 'category').strip() or categorie, source,
+            ))
+    return articles
+
+
+class EtatConditionnel:
+    """ETag / Last-Modified de la dernière réponse de chaque flux, dans un fichier JSON partagé par les flux."""
+
+    def __init__(self, chemin):
+        self.chemin = chemin
+        self._lock = threading.Lock()
+        try:
+            with open(chemin, encoding='utf-8') as f:
+                self._validateurs = json.load(f)
+        except (OSError, ValueError):
+            self._validateurs = {}
+        self._en_attente = {}
+
+    def get(self, url):
+        return self._validateurs.get(url, {})
+
+    def noter(self, url, etag=None, last_modified=None):
+        with self._lock:
+            self._en_attente[url] = {'etag': etag, 'last_modified': last_modified}
+
+    def valider(self):
+        """Enregistre les validateurs du run (écriture atomique, comme les watermarks de NewsApiSource)."""
+        with self._lock:
+            if not self._en_attente:
+                return
+            self._validateurs.update(self._en_attente)
+            self._en_attente = {}
+            os.makedirs(os.path.dirname(self.chemin) or '.', exist_ok=True)
+            temporaire = self.chemin + '.tmp'
+            with open(temporaire, 'w', encoding='utf-8') as f:
+                json.dump(self._validateurs, f, indent=1)
+            os.replace(temporaire, self.chemin)
+
+
+class _Compteurs:
+    """Compteurs communs aux adaptateurs (affichés par stats())."""
+
+    def _initialiser_compteurs(self):
+        self.appels = 0
+        self.non_modifies = 0
+        self.articles = 0
+        self.erreurs = 0
+        self.duree = 0.0
+
+    def stats(self):
+        return {'appels': self.appels, 'non_modifies': self.non_modifies, 'articles': self.articles,
+                'erreurs': self.erreurs, 'duree': round(self.duree, 2)}
+
+
+class SourceNewsApi(_Compteurs):
+    """
+    NewsAPI page par page (client : NewsApiSource, ReponsesStockees ou tout objet avec get_everything()).
+    NewsAPI ne gère pas les requêtes conditionnelles : c'est le watermark de NewsApiSource qui limite
+    chaque appel aux articles plus récents que le run précédent.
+    """
+
+    def __init__(self, client, params, page_depart=1, page_max=1, page_size=50, nom='newsapi'):
+        self.client = client
+        self.params = params
+        self.page_depart = page_depart
+        self.page_max = page_max
+        self.page_size = page_size
+        self.nom = nom
+        self._initialiser_compteurs()
+
+    def pages(self):
+        for page in range(self.page_depart, self.page_max + 1):
+            try:
+                self.appels += 1
+                response = self.client.get_everything(page=page, page_size=self.page_size, **self.params)
+            except Exception as e:
+                # Le plan gratuit refuse d'aller au-delà de 100 résultats : on s'arrête proprement
+                print(f"Arrêt de la pagination NewsAPI à la page {page} : {e}")
+                return
+            if response.get('status') != 'ok':
+                print(f"Erreur NewsAPI : {response.get('code')} - {response.get('message')}")
+                self.erreurs += 1
+                return
+            articles = response.get('articles', [])
+            self.articles += len(articles)
+            yield page, [depuis_newsapi(article, self.nom) for article in articles]
+            if len(articles) < self.page_size or page * self.page_size >= response.get('totalResults', 0):
+                return
+
+    def valider(self):
+        if hasattr(self.client, 'valider'):
+            self.client.valider()
+
+
+class SourceFlux(_Compteurs):
+    """Flux RSS 2.0 ou Atom demandé en GET conditionnel : une seule "page", vide si le flux n'a pas changé (304)."""
+
+    def __init__(self, url, nom=None, categorie=None, etat=None, session=None, timeout=10):
+        self.url = url
+        self.nom = nom or urlparse(url).netloc + urlparse(url).path
+        self.categorie = categorie
+        self.etat = etat
+        self.session = session or session_http()
+        self.timeout = timeout
+        self._initialiser_compteurs()
+
+    def entetes_conditionnels(self):
+        validateurs = self.etat.get(self.url) if self.etat is not None else {}
+        entetes = {}
+        if validateurs.get('etag'):
+            entetes['If-None-Match'] = validateurs['etag']
+        if validateurs.get('last_modified'):
+            entetes['If-Modified-Since'] = validateurs['last_modified']
+        return entetes
+
+    def pages(self):
+        self.appels += 1
+        response = self.session.get(self.url, headers=self.entetes_conditionnels(), timeout=self.timeout)
+        if response.status_code == 304:
+            self.non_modifies += 1
+            return
+        response.raise_for_status()
+        articles = lire_flux(response.content, self.nom, self.categorie)
+        self.articles += len(articles)
+        if self.etat is not None and (response.headers.get('ETag') or response.headers.get('Last-Modified')):
+            self.etat.noter(self.url, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        yield 1, articles
+
+    def valider(self):
+        if self.etat is not None:
+            self.etat.valider()
+
+
+def _recuperer(source):
+    debut = time.perf_counter()
+    try:
+        return list(source.pages())
+    except Exception as e:
+        # Une source en panne ne bloque pas les autres
+        print(f"Erreur de la source {source.nom} : {e}")
+        source.erreurs += 1
+        return []
+    finally:
+        source.duree += time.perf_counter() - debut
+
+
+def recuperer_sources(sources, workers=8):
+    """Interroge toutes les sources en parallèle ; yield (source, [(page, articles), ...]) dans l'ordre des sources."""
+    if not sources:
+        return
+    with ThreadPoolExecutor(max_workers=min(workers, len(sources))) as executor:
+        futures = [executor.submit(_recuperer, source) for source in sources]
+        for source, future in zip(sources, futures):
+            yield source, future.result()
+
+
+def valider_sources(sources):
+    for source in sources:
+        source.valider()
@@ -0,0 +1,284 @@
+"""
+Backend flask_caching stocké dans un fichier SQLite (WAL), partagé entre les workers gunicorn.
+
+    app.config['CACHE_TYPE'] = 'sqlite_cache.SQLiteCache'
+    app.config['CACHE_DIR'] = 'flask_cache'            # fichier flask_cache/cache.sqlite3
+    app.config['CACHE_THRESHOLD'] = 500                # nombre max d'entrées (éviction LRU)
+    app.config['CACHE_SQLITE_MAX_BYTES'] = 64 * 2**20  # taille max des valeurs (0 = pas de limite)
+
+Par rapport à FileSystemCache (un fichier pickle par clé) :
+- add() est atomique (INSERT ... ON CONFLICT), ce qui sert de verrou entre process ;
+- get_or_set() ne lance qu'une reconstruction à la fois grâce à un bail ("lease") ; un bail n'est libéré
+  que par son titulaire (delete_if / liberer_bail), jamais par un process dont le bail a expiré entre-temps ;
+- l'éviction supprime les entrées expirées puis les moins récemment lues parmi celles qui ont une
+  expiration : une entrée écrite avec timeout=0 (contenu des actualités, génération du dashboard...)
+  n'est jamais évincée, seulement remplacée ou supprimée explicitement ;
+- stats() donne hits / misses / évictions (compteurs du process) et la taille du cache.
+"""
+import os
+import pickle
+import secrets
+import sqlite3
+import threading
+import time
+
+from flask_caching.backends.base import BaseCache
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entry (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires REAL NOT NULL,      -- 0 = n'expire jamais
+    accessed REAL NOT NULL,     -- dernière lecture, pour l'éviction LRU
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_cache_entry_accessed ON cache_entry (accessed);
+"""
+
+
+def jeton_bail():
+    """Valeur unique d'un bail (pid du titulaire + aléa) : sert à vérifier qu'on le possède encore."""
+    return f'{os.getpid()}:{secrets.token_hex(8)}'
+
+
+def liberer_bail(store, key, jeton):
+    """
+    Supprime le bail `key` seulement s'il vaut encore `jeton`. Atomique avec SQLiteCache (delete_if),
+    lecture puis suppression avec les autres backends. `store` : backend ou objet Cache de flask_caching.
+    """
+    backend = getattr(store, 'cache', store)
+    if hasattr(backend, 'delete_if'):
+        return backend.delete_if(key, jeton)
+    if store.get(key) == jeton:
+        return store.delete(key)
+    return False
+
+
+class SQLiteCache(BaseCache):
+    """
+    :param path: fichier SQLite du cache.
+    :param threshold: nombre max d'entrées (0 = pas de limite).
+    :param max_bytes: taille cumulée max des valeurs sérialisées (0 = pas de limite).
+    :param touch_interval: la date de lecture n'est réécrite que si elle a plus de `touch_interval`
+                           secondes, pour ne pas transformer chaque lecture en écriture.
+    :param purge_interval: sans limite (threshold=0 et max_bytes=0), rien n'est évincé ; les entrées
+                           expirées sont alors supprimées au plus une fois toutes les `purge_interval` secondes.
+    """
+
+    def __init__(self, path, default_timeout=300, threshold=500, max_bytes=0, touch_interval=30,
+                 purge_interval=600, ignore_delete_many_errors=False):
+        super().__init__(default_timeout=default_timeout, ignore_delete_many_errors=ignore_delete_many_errors)
+        self.path = path
+        self.threshold = threshold
+        self.max_bytes = max_bytes
+        self.touch_interval = touch_interval
+        self.purge_interval = purge_interval
+        self._derniere_purge = 0.0
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+        dossier = os.path.dirname(path)
+        if dossier:
+            os.makedirs(dossier, exist_ok=True)
+        self._conn().executescript(SCHEMA)
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        path = config.get('CACHE_SQLITE_PATH') or os.path.join(config.get('CACHE_DIR') or '.', 'cache.sqlite3')
+        kwargs.update(
+            path=path,
+            default_timeout=config.get('CACHE_DEFAULT_TIMEOUT', 300),
+            threshold=config.get('CACHE_THRESHOLD', 500),
+            max_bytes=config.get('CACHE_SQLITE_MAX_BYTES', 0),
+        )
+        return cls(*args, **kwargs)
+
+    def _conn(self):
+        """Une connexion par thread (sqlite3 ne partage pas les connexions entre threads)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)  # autocommit
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _expires(self, timeout):
+        timeout = self._normalize_timeout(timeout)
+        return 0 if timeout == 0 else time.time() + timeout
+
+    def _count(self, compteur, n=1):
+        with self._stats_lock:
+            setattr(self, compteur, getattr(self, compteur) + n)
+
+    # === API cachelib / flask_caching ===
+
+    def get(self, key):
+        now = time.time()
+        row = self._conn().execute(
+            "SELECT value, accessed FROM cache_entry WHERE key = ? AND (expires = 0 OR expires > ?)", (key, now)
+        ).fetchone()
+        if row is None:
+            self._count('misses')
+            return None
+        self._count('hits')
+        if now - row[1] > self.touch_interval:
+            self._conn().execute("UPDATE cache_entry SET accessed = ? WHERE key = ?", (now, key))
+        try:
+            return pickle.loads(row[0])
+        except (pickle.PickleError, EOFError, AttributeError, ImportError):
+            return None
+
+    def get_many(self, *keys):
+        """Plusieurs clés en une seule requête (même ordre que `keys`, None si absente)."""
+        if not keys:
+            return []
+        now = time.time()
+        marques = ', '.join('?' * len(keys))
+        rows = self._conn().execute(
+            f"SELECT key, value FROM cache_entry WHERE key IN ({marques}) AND (expires = 0 OR expires > ?)",
+            (*keys, now),
+        ).fetchall()
+        trouvees = {}
+        for key, value in rows:
+            try:
+                trouvees[key] = pickle.loads(value)
+            except (pickle.PickleError, EOFError, AttributeError, ImportError):
+                pass
+        self._count('hits', len(trouvees))
+        self._count('misses', len(keys) - len(trouvees))
+        return [trouvees.get(key) for key in keys]
+
+    def set(self, key, value, timeout=None):
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO cache_entry (key, value, expires, accessed, size) VALUES (?, ?, ?, ?, ?)",
+            (key, data, self._expires(timeout), now, len(data)),
+        )
+        self._evict()
+        return True
+
+    def add(self, key, value, timeout=None):
+        """Écrit la valeur seulement si la clé est absente (ou expirée). Atomique entre process."""
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        cursor = self._conn().execute(
+            """
+            INSERT INTO cache_entry (key, value, expires, accessed, size) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                value = excluded.value, expires = excluded.expires,
+                accessed = excluded.accessed, size = excluded.size
+            WHERE cache_entry.expires != 0 AND cache_entry.expires <= ?
+            """,
+            (key, data, self._expires(timeout), now, len(data), now),
+        )
+        if cursor.rowcount != 1:
+            return False
+        self._evict()
+        return True
+
+    def delete(self, key):
+        return self._conn().execute("DELETE FROM cache_entry WHERE key = ?", (key,)).rowcount == 1
+
+    def delete_if(self, key, value):
+        """Supprime la clé seulement si elle contient encore `value` (comparaison des valeurs sérialisées)."""
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        return self._conn().execute(
+            "DELETE FROM cache_entry WHERE key = ? AND value = ?", (key, data)
+        ).rowcount == 1
+
+    def touch(self, *keys, timeout=None):
+        """Repousse l'expiration des clés encore valides, sans relire ni réécrire leurs valeurs."""
+        if not keys:
+            return 0
+        now = time.time()
+        marques = ', '.join('?' * len(keys))
+        return self._conn().execute(
+            f"UPDATE cache_entry SET expires = ? WHERE key IN ({marques}) AND expires != 0 AND expires > ?",
+            (self._expires(timeout), *keys, now),
+        ).rowcount
+
+    def has(self, key):
+        return self._conn().execute(
+            "SELECT 1 FROM cache_entry WHERE key = ? AND (expires = 0 OR expires > ?)", (key, time.time())
+        ).fetchone() is not None
+
+    def clear(self):
+        self._conn().execute("DELETE FROM cache_entry")
+        return True
+
+    # === Reconstruction avec bail ===
+
+    def get_or_set(self, key, builder, timeout=None, lease=60, wait=10, poll=0.1):
+        """
+        Renvoie la valeur en cache, sinon la construit avec builder().
+        Un seul process la construit (bail `key:lease`) ; les autres attendent jusqu'à `wait` secondes
+        qu'elle apparaisse, puis la construisent eux-mêmes si le premier a échoué ou traîne.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        lease_key = f'{key}:lease'
+        jeton = jeton_bail()
+        titulaire = self.add(lease_key, jeton, timeout=lease)
+        if not titulaire:
+            limite = time.time() + wait
+            while time.time() < limite:
+                time.sleep(poll)
+                value = self.get(key)
+                if value is not None:
+                    return value
+        try:
+            value = builder()
+            self.set(key, value, timeout=timeout)
+            return value
+        finally:
+            if titulaire:
+                self.delete_if(lease_key, jeton)
+
+    # === Éviction et statistiques ===
+
+    def _evict(self):
+        conn = self._conn()
+        if not self.threshold and not self.max_bytes:
+            if time.time() - self._derniere_purge > self.purge_interval:
+                self._derniere_purge = time.time()
+                conn.execute("DELETE FROM cache_entry WHERE expires != 0 AND expires <= ?", (self._derniere_purge,))
+            return
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entry").fetchone()
+        if (not self.threshold or count <= self.threshold) and (not self.max_bytes or total <= self.max_bytes):
+            return
+        # D'abord les entrées expirées, puis les moins récemment lues (sauf celles sans expiration)
+        supprimees = conn.execute(
+            "DELETE FROM cache_entry WHERE expires != 0 AND expires <= ?", (time.time(),)
+        ).rowcount
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entry").fetchone()
+        while (self.threshold and count > self.threshold) or (self.max_bytes and total > self.max_bytes):
+            rows = conn.execute(
+                "DELETE FROM cache_entry WHERE key = "
+                "(SELECT key FROM cache_entry WHERE expires != 0 ORDER BY accessed LIMIT 1) "
+                "RETURNING size"
+            ).fetchall()
+            if not rows:
+                break
+            supprimees += 1
+            count -= 1
+            total -= rows[0][0]
+        self._count('evictions', supprimees)
+
+    def stats(self):
+        count, total = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entry"
+        ).fetchone()
+        lectures = self.hits + self.misses
+        return {
+            'backend': 'sqlite',
+            'path': self.path,
+            'entries': count,
+            'bytes': total,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lectures, 3) if lectures else None,
+            'evictions': self.evictions,
+        }
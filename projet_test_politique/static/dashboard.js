@@ -0,0 +1,260 @@
+/* Chat du tableau de bord */
+document.addEventListener('DOMContentLoaded', function() {
+    const chatForm = document.getElementById('chat-form');
+    const userInput = document.getElementById('user-input');
+    const chatMessages = document.getElementById('chat-messages');
+    const topicButtons = document.querySelectorAll('.topic-button');
+    const sendButton = chatForm.querySelector('.send-button');
+
+    console.log('🚀 Chat dashboard initialisé');
+
+    // Fonction pour ajouter un message au chat - CORRIGÉE
+    function addMessage(content, type) {
+        const messageDiv = document.createElement('div');
+
+        // Nettoyer le type pour éviter les espaces dans les classes CSS
+        const cleanType = type.replace(/\s+/g, '-');
+        messageDiv.classList.add('message', `${cleanType}-message`);
+
+        const messageContent = document.createElement('p');
+        messageContent.innerHTML = content.replace(/\n/g, '<br>');
+        messageDiv.appendChild(messageContent);
+
+        chatMessages.appendChild(messageDiv);
+        chatMessages.scrollTop = chatMessages.scrollHeight;
+
+        return messageDiv;
+    }
+
+    // Fonction pour afficher les erreurs
+    function showError(error) {
+        console.error('❌ Erreur chat:', error);
+        addMessage(`Erreur: ${error}`, 'error');
+    }
+
+    // Fonction pour désactiver/activer l'interface
+    function setLoading(isLoading) {
+        sendButton.disabled = isLoading;
+        userInput.disabled = isLoading;
+
+        if (isLoading) {
+            sendButton.innerHTML = '<span>Envoi...</span>';
+        } else {
+            sendButton.innerHTML = '<span>Envoyer</span>';
+        }
+    }
+
+    // Test de connectivité au chargement - VERSION SIMPLIFIÉE
+    function testConnection() {
+        console.log('🔍 Test de connectivité...');
+
+        fetch('/api/dashboard/chat/test')
+        .then(response => response.json())
+        .then(data => {
+            console.log('✅ Test réussi:', data);
+            addMessage('🟢 Connexion au serveur établie', 'system');
+        })
+        .catch(error => {
+            console.error('❌ Test échoué:', error);
+            addMessage('🔴 Problème de connexion au serveur', 'error');
+        });
+    }
+
+    // Gérer l'envoi de message - VERSION SIMPLIFIÉE
+    chatForm.addEventListener('submit', function(e) {
+        e.preventDefault();
+        const userMessage = userInput.value.trim();
+
+        if (!userMessage) {
+            console.log('⚠️ Message vide ignoré');
+            return;
+        }
+
+        console.log('📤 Envoi message:', userMessage);
+
+        // Afficher le message de l'utilisateur
+        addMessage(userMessage, 'user');
+
+        // Effacer l'input et désactiver l'interface
+        userInput.value = '';
+        setLoading(true);
+
+        // Ajouter un indicateur de chargement - CORRIGÉ
+        const loadingMsg = addMessage('🤔 Politicool réfléchit...', 'assistant-typing');
+
+        // Préparer les données - SIMPLIFIÉ
+        const requestData = {
+            message: userMessage
+        };
+
+        console.log('📡 Données envoyées:', requestData);
+
+        // Envoyer la requête - VERSION SIMPLIFIÉE
+        fetch('/api/dashboard/chat', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(requestData)
+        })
+        .then(response => {
+            console.log('📨 Réponse reçue - Status:', response.status);
+            console.log('📨 Headers:', Array.from(response.headers.entries()));
+
+            // NOUVELLE APPROCHE: Toujours parser en JSON, même si erreur
+            return response.json().then(data => {
+                console.log('📦 JSON reçu:', data);
+                return { data, status: response.status, ok: response.ok };
+            }).catch(jsonError => {
+                console.error('❌ Erreur parsing JSON:', jsonError);
+                // Si le JSON ne peut pas être parsé, récupérer le texte brut
+                return response.text().then(text => {
+                    console.error('📄 Réponse brute:', text.substring(0, 500));
+                    throw new Error(`Réponse non-JSON reçue: ${text.substring(0, 100)}...`);
+                });
+            });
+        })
+        .then(result => {
+            const { data, status, ok } = result;
+
+            console.log('✅ Traitement réponse:', { data, status, ok });
+
+            // Supprimer l'indicateur de chargement
+            if (loadingMsg && loadingMsg.parentNode) {
+                loadingMsg.remove();
+            }
+
+            // Vérifier s'il y a une erreur dans la réponse
+            if (data.error) {
+                showError(data.error);
+                return;
+            }
+
+            // Vérifier s'il y a une réponse
+            if (data.response) {
+                addMessage(data.response, 'assistant');
+            } else if (data.success) {
+                addMessage("✅ Succès mais pas de réponse. Données complètes: " + JSON.stringify(data), 'assistant');
+            } else {
+                addMessage("❓ Réponse inattendue: " + JSON.stringify(data), 'assistant');
+            }
+        })
+        .catch(error => {
+            console.error('💥 Erreur complète:', error);
+
+            // Supprimer l'indicateur de chargement
+            if (loadingMsg && loadingMsg.parentNode) {
+                loadingMsg.remove();
+            }
+
+            showError(error.message);
+        })
+        .finally(() => {
+            console.log('🔚 Requête terminée - réactivation interface');
+            setLoading(false);
+        });
+    });
+
+    // Gérer les clics sur les boutons de sujets
+    topicButtons.forEach(button => {
+        button.addEventListener('click', function() {
+            const topic = this.getAttribute('data-topic');
+
+            let question = '';
+            switch(topic) {
+                case 'économie':
+                    question = "Quelle est votre position sur l'augmentation du salaire minimum ?";
+                    break;
+                case 'environnement':
+                    question = "Pensez-vous que les taxes carbone sont efficaces pour lutter contre le changement climatique ?";
+                    break;
+                case 'santé':
+                    question = "Quel modèle de système de santé vous semble le plus équitable ?";
+                    break;
+                case 'international':
+                    question = "Comment la France devrait-elle positionner sa politique étrangère face aux enjeux géopolitiques actuels ?";
+                    break;
+                default:
+                    question = "Parlons de politique " + topic;
+            }
+
+            userInput.value = question;
+            userInput.focus();
+        });
+    });
+
+    // Bouton pour reset le chat
+    const resetButton = document.createElement('button');
+    resetButton.textContent = '🔄 Reset Chat';
+    resetButton.className = 'topic-button';
+    resetButton.style.backgroundColor = '#e74c3c';
+    resetButton.style.color = 'white';
+    resetButton.addEventListener('click', function() {
+        console.log('🔄 Reset du chat...');
+
+        fetch('/api/dashboard/chat/reset', { 
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            }
+        })
+        .then(response => response.json())
+        .then(data => {
+            console.log('✅ Chat resetté:', data);
+            chatMessages.innerHTML = `
+                <div class="message system-message">
+                    <p>✨ Chat réinitialisé! Posez-moi une nouvelle question politique.</p>
+                </div>
+            `;
+        })
+        .catch(error => {
+            console.error('❌ Erreur reset:', error);
+            showError('Erreur lors du reset: ' + error.message);
+        });
+    });
+
+    // Ajouter le bouton reset
+    const topicButtonsContainer = document.querySelector('.topic-buttons');
+    if (topicButtonsContainer) {
+        topicButtonsContainer.appendChild(resetButton);
+    }
+
+
+
+    // Lancer le test de connectivité
+    setTimeout(testConnection, 1000);
+
+    console.log('🎯 Chat dashboard entièrement chargé');
+});
+
+/* Messages flash et animation des cartes */
+// Animation des messages flash
+document.addEventListener('DOMContentLoaded', function() {
+    const flashes = document.querySelectorAll('.flash');
+    flashes.forEach(flash => {
+        setTimeout(() => {
+            flash.style.transition = 'all 0.5s ease-out';
+            flash.style.transform = 'translateX(100%)';
+            flash.style.opacity = '0';
+            setTimeout(() => flash.remove(), 500);
+        }, 4000);
+    });
+
+    // Animation des cartes au scroll
+    const observerOptions = {
+        threshold: 0.1,
+        rootMargin: '0px 0px -30px 0px'
+    };
+
+    const observer = new IntersectionObserver((entries) => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                entry.target.style.animation = 'cardFadeIn 0.6s ease-out forwards';
+            }
+        });
+    }, observerOptions);
+
+    document.querySelectorAll('.dashboard-card').forEach(card => {
+        observer.observe(card);
+    });
+});
@@ -0,0 +1,73 @@
+from datetime import date
+
+import app as app_module
+from news_source import NewsApiSource
+from models import ResumeActualite
+from resume import Resumeur
+
+
+def faux_newsapi(articles):
+    class FauxClient:
+        def __init__(self):
+            self.appels = 0
+
+        def get_everything(self, **kwargs):
+            self.appels += 1
+            return {'status': 'ok', 'articles': articles}
+    return FauxClient()
+
+
+def tout_par_ollama(monkeypatch):
+    # Les extraits des tests sont courts : sans ça ils seraient gardés tels quels, sans passer par resumer_actualite
+    monkeypatch.setattr(app_module, 'resumeur', Resumeur(court=-1, long=-1, nb_phrases=0))
+
+
+def test_seules_les_nouvelles_actualites_sont_resumees(app, monkeypatch, tmp_path):
+    aujourd_hui = date.today().isoformat()
+    articles = [
+        {'title': 'La croissance ralentit', 'content': 'Économie en berne', 'url': 'https://lemonde.fr/a',
+         'publishedAt': f'{aujourd_hui}T08:00:00Z'},
+        {'title': "Le marché de l'emploi", 'content': 'Emploi stable', 'url': 'https://lemonde.fr/b',
+         'publishedAt': f'{aujourd_hui}T07:00:00Z'},
+    ]
+    appels = []
+    monkeypatch.setattr(app_module, 'news_source', NewsApiSource(dossier=str(tmp_path), client=faux_newsapi(articles)))
+    tout_par_ollama(monkeypatch)
+    monkeypatch.setattr(app_module, 'resumer_actualite', lambda titre, contenu: appels.append(titre) or f'Résumé de {titre}')
+
+    premier = app_module.construire_actualites()
+    assert len(appels) == 2
+    assert [a['summary'] for a in premier['Économie']] == ['Résumé de La croissance ralentit', "Résumé de Le marché de l'emploi"]
+    assert ResumeActualite.query.count() == 2
+
+    # Cycle suivant : un article inchangé, un modifié, un nouveau
+    articles[1]['content'] = 'Emploi en hausse'
+    articles.append({'title': 'Entreprise record', 'content': 'Finance', 'url': 'https://lemonde.fr/c',
+                     'publishedAt': f'{aujourd_hui}T09:00:00Z'})
+    appels.clear()
+    second = app_module.construire_actualites()
+    assert sorted(appels) == ['Entreprise record', "Le marché de l'emploi"]
+    assert app_module.RESUMES_STATS == {'articles': 3, 'reutilises': 1, 'generes': 2}
+    assert len(second['Économie']) == 3
+    assert ResumeActualite.query.count() == 3
+    assert second['Environnement'][0]['title'] == 'Aucune actualité pertinente'
+
+
+def test_une_requete_et_classement_multi_categories(app, monkeypatch, tmp_path):
+    aujourd_hui = date.today().isoformat()
+    client = faux_newsapi([
+        {'title': "Le budget de l'hôpital public", 'content': 'Les urgences et la dette', 'url': 'https://lemonde.fr/h',
+         'publishedAt': f'{aujourd_hui}T08:00:00Z'},
+        {'title': 'Real Madrid-Arsenal', 'content': 'Mbappé attendu en Ligue des champions', 'url': 'https://lemonde.fr/s',
+         'publishedAt': f'{aujourd_hui}T07:00:00Z'},
+    ])
+    appels = []
+    monkeypatch.setattr(app_module, 'news_source', NewsApiSource(dossier=str(tmp_path), client=client))
+    tout_par_ollama(monkeypatch)
+    monkeypatch.setattr(app_module, 'resumer_actualite', lambda titre, contenu: appels.append(titre) or 'Résumé')
+
+    actualites = app_module.construire_actualites()
+    assert client.appels == 1  # une seule requête NewsAPI pour les 8 catégories
+    assert appels == ["Le budget de l'hôpital public"]  # résumé une fois, affiché dans 2 catégories
+    assert actualites['Santé'][0]['url'] == actualites['Économie'][0]['url'] == 'https://lemonde.fr/h'
+    assert all(a['url'] != 'https://lemonde.fr/s' for articles in actualites.values() for a in articles)
@@ -0,0 +1,62 @@
+from models import db, Article, Question
+from query_stats import compter_requetes
+
+
+def creer_questions(nb):
+    article = Article(title='Article', content='Contenu', url='https://example.com/a', category='économie',
+                      published_at='2025-05-01')
+    db.session.add(article)
+    db.session.flush()
+    questions = [Question(texte=f'Question {i}', categorie='économie', article_id=article.id) for i in range(nb)]
+    db.session.add_all(questions)
+    db.session.commit()
+    return [q.id for q in questions]
+
+
+def test_admin_questions_pagination_par_cle(app, client):
+    ids = creer_questions(7)
+
+    page1 = client.get('/admin/questions?limit=5')
+    assert page1.status_code == 200
+    assert f'#{ids[4]}' in page1.get_data(as_text=True)
+    assert f'after={ids[4]}' in page1.get_data(as_text=True)
+
+    page2 = client.get(f'/admin/questions?after={ids[4]}&limit=5').get_data(as_text=True)
+    assert f'#{ids[5]}' in page2 and f'#{ids[6]}' in page2
+    assert f'#{ids[4]}<' not in page2
+    assert 'Page suivante' not in page2
+
+
+def test_admin_questions_nombre_de_requetes_constant(app, client):
+    creer_questions(60)
+    with compter_requetes() as stats:
+        client.get('/admin/questions')
+    assert stats.count <= 1, stats.statements
+
+
+def test_bulk_moderation_en_une_requete(app, client):
+    ids = creer_questions(6)
+
+    with compter_requetes() as stats:
+        response = client.post('/admin/questions/bulk', json={'action': 'validate', 'ids': ids[:3]})
+    assert response.get_json() == {'success': True, 'action': 'validate', 'count': 3}
+    assert stats.count == 1, stats.statements
+
+    client.post('/admin/questions/bulk', data={'action': 'refuse', 'ids': [str(ids[3])]})
+    client.post('/admin/questions/bulk', data={'action': 'delete', 'ids': [str(i) for i in ids[4:]]})
+
+    assert Question.query.filter_by(valide=True).count() == 3
+    assert Question.query.filter_by(is_refused=True).count() == 1
+    assert Question.query.count() == 4
+    assert client.post('/admin/questions/bulk', json={'action': 'publier', 'ids': ids}).status_code == 400
+
+
+def test_admin_questions_limit_invalide_ramene_a_un(app, client):
+    ids = creer_questions(3)
+
+    for limit in (-1, 0):
+        page = client.get(f'/admin/questions?limit={limit}')
+        assert page.status_code == 200
+        html = page.get_data(as_text=True)
+        assert f'#{ids[0]}' in html and f'#{ids[1]}<' not in html
+        assert f'after={ids[0]}' in html
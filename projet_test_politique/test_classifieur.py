@@ -0,0 +1,16 @@
+from classifieur import Classifieur, classifieur
+
+
+def test_mots_entiers_prefixes_et_titre():
+    # "loi" n'est pas trouvé dans "emploi", "art" pas dans "partie"
+    assert classifieur.scores("Une partie de l'emploi", "") == {'Économie': 4.0}
+    assert classifieur.classer("Inflation et impôts", "les économistes s'inquiètent") == ['Économie']
+    # Le titre compte double
+    assert classifieur.classer("Vaccins : la campagne repart", "un débat sur le budget") == ['Santé']
+
+
+def test_plusieurs_categories_et_seuil():
+    c = Classifieur({'A': {'alpha': 3, 'gamma*': 1}, 'B': {'beta': 2}, 'C': {'delta': 1}})
+    assert c.classer("alpha beta", "gammas delta") == ['A', 'B']
+    assert c.classer("", "delta") == []  # sous le seuil
+    assert c.classer("alpha beta delta", "", max_categories=1) == ['A']
@@ -0,0 +1,88 @@
+import re
+
+import pytest
+from sqlalchemy import event, text
+
+import search
+from models import db, User, Question, Reponse, QuizAttempt, Article, AnalysePolitique
+
+
+@pytest.fixture
+def commits(app):
+    liste = []
+    compter = lambda session: liste.append(1)
+    event.listen(db.session, 'after_commit', compter)
+    yield liste
+    event.remove(db.session, 'after_commit', compter)
+
+
+def creer_articles_en_double():
+    # Les doublons viennent d'une base antérieure à la contrainte unique sur l'URL : on recrée la table sans elle
+    ddl = db.session.execute(text("SELECT sql FROM sqlite_master WHERE name = 'article'")).scalar()
+    db.session.execute(text("DROP TABLE article"))
+    db.session.execute(text(re.sub(r',\s*UNIQUE \(url\)', '', ddl)))
+    db.session.commit()
+    search.rebuild_search_index()
+    articles = [Article(title=f'Article {i}', content='Contenu', url=url, category='x', published_at='2026-10-19')
+                for i, url in enumerate(['https://a', 'https://a', 'https://b', 'https://a', 'https://b'])]
+    db.session.add_all(articles)
+    db.session.commit()
+    questions = [Question(texte=f'Question {a.id}', categorie='économie', article_id=a.id) for a in articles]
+    db.session.add_all(questions)
+    db.session.commit()
+    return [a.id for a in articles]
+
+
+def test_dedupe_dry_run_ne_supprime_rien(app):
+    creer_articles_en_double()
+    resultat = app.test_cli_runner().invoke(args=['articles', 'dedupe', '--dry-run'])
+    assert '3 articles en double' in resultat.output and 'Dry run' in resultat.output
+    assert Article.query.count() == 5
+
+
+def test_dedupe_garde_le_plus_ancien_et_rattache_les_questions(app, commits):
+    ids = creer_articles_en_double()
+    commits.clear()
+    resultat = app.test_cli_runner().invoke(args=['articles', 'dedupe', '--batch-size', '2'])
+    assert resultat.exit_code == 0, resultat.output
+    assert len(commits) == 2  # 3 doublons par lots de 2
+    assert '2/3 articles supprimés' in resultat.output
+    db.session.expire_all()
+    assert sorted(a.id for a in Article.query) == [ids[0], ids[2]]  # le plus petit id de chaque URL
+    assert {r[0] for r in db.session.execute(text("SELECT rowid FROM article_fts"))} == {ids[0], ids[2]}
+    assert sorted(q.article_id for q in Question.query) == [ids[0]] * 3 + [ids[2]] * 2
+
+
+def creer_quiz():
+    user = User(username='bob', email='bob@example.com')
+    db.session.add(user)
+    db.session.commit()
+    tentatives = [QuizAttempt(user_id=user.id) for _ in range(2)]
+    questions = [Question(texte=f'Question {i}', categorie='économie', valide=True) for i in range(3)]
+    db.session.add_all(tentatives + questions)
+    db.session.commit()
+    db.session.add_all([Reponse(user_id=user.id, question_id=q.id, attempt_id=t.id, texte='Oui')
+                        for t in tentatives for q in questions])
+    db.session.add(AnalysePolitique(user_id=user.id, attempt_id=tentatives[0].id, analyse_text='Analyse'))
+    db.session.commit()
+
+
+def test_purge_dry_run_ne_supprime_rien(app):
+    creer_quiz()
+    resultat = app.test_cli_runner().invoke(args=['data', 'purge', '--dry-run'])
+    assert '6 réponses et 3 questions' in resultat.output
+    assert (Reponse.query.count(), Question.query.count()) == (6, 3)
+
+
+def test_purge_par_lots_garde_tentatives_et_analyses(app, commits):
+    search.rebuild_search_index()
+    creer_quiz()
+    commits.clear()
+    resultat = app.test_cli_runner().invoke(args=['data', 'purge', '--batch-size', '4', '--yes'])
+    assert resultat.exit_code == 0, resultat.output
+    assert len(commits) == 5  # réponses : lots de 4, 2 et 0 ; questions : lots de 3 et 0
+    assert (Reponse.query.count(), Question.query.count()) == (0, 0)
+    assert db.session.execute(text("SELECT COUNT(*) FROM question_fts")).scalar() == 0
+    # Les tentatives restent : l'analyse politique y fait toujours référence
+    assert QuizAttempt.query.count() == 2 and AnalysePolitique.query.one().attempt_id is not None
+    assert User.query.count() == 1
@@ -0,0 +1,56 @@
+import app as app_module
+from evenements import actualites_rafraichies
+from query_stats import compter_requetes
+from test_query_budget import CATEGORIES, creer_donnees, connecter
+
+
+def preparer(app, client, monkeypatch):
+    appels = []
+
+    def actualites():
+        appels.append(1)
+        return {c: [] for c in CATEGORIES}
+
+    monkeypatch.setattr(app_module, 'fetch_actualites_cached', actualites)
+    user = creer_donnees()
+    user_id = user.id
+    connecter(client, user)
+    assert client.get('/dashboard').status_code == 200
+    return user_id, appels
+
+
+def test_deuxieme_affichage_sans_requete_sql(app, client, monkeypatch):
+    user_id, appels = preparer(app, client, monkeypatch)
+    with compter_requetes() as stats:
+        response = client.get('/dashboard')
+    assert response.status_code == 200
+    assert stats.count == 0, stats.statements
+    assert len(appels) == 1
+    assert b'alice' in response.data
+
+
+def test_preferences_invalident_la_vue(app, client, monkeypatch):
+    user_id, appels = preparer(app, client, monkeypatch)
+    client.post('/save_preferences', data={'categories': ['Santé']})
+    assert app_module.cache.get(app_module.dashboard_cache_key(user_id)) is None
+    client.get('/dashboard')
+    assert app_module.get_vue_dashboard(user_id)['user']['interets'] == 'Santé'
+
+
+def test_reponses_et_analyse_invalident_la_vue(app, client, monkeypatch):
+    user_id, appels = preparer(app, client, monkeypatch)
+    cle = app_module.dashboard_cache_key(user_id)
+
+    app_module.save_answers(user_id, [(1, 'Oui', 'répondu')])
+    assert app_module.cache.get(cle) is None
+
+    client.get('/dashboard')
+    client.get('/reinitialiser_quiz')
+    assert app_module.cache.get(cle) is None
+
+
+def test_rafraichissement_des_actualites_invalide_toutes_les_vues(app, client, monkeypatch):
+    user_id, appels = preparer(app, client, monkeypatch)
+    actualites_rafraichies.send(None)
+    client.get('/dashboard')
+    assert len(appels) == 2
@@ -0,0 +1,31 @@
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+
+from db_config import configure_sqlite_engine, apply_sqlite_pragmas, sqlite_pragma_status
+
+
+def moteur(tmp_path, profil):
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / f'{profil}.db'}", SQLITE_PROFILE=profil)
+    db = SQLAlchemy()
+    configure_sqlite_engine(app)
+    db.init_app(app)
+    apply_sqlite_pragmas(app, db)
+    return app, db
+
+
+def test_profil_production(tmp_path):
+    app, db = moteur(tmp_path, 'production')
+    pragmas = sqlite_pragma_status(app, db)
+    assert pragmas['journal_mode'] == 'wal'
+    assert pragmas['synchronous'] == 1  # NORMAL
+    assert pragmas['busy_timeout'] == 5000
+    assert app.config['SQLALCHEMY_ENGINE_OPTIONS']['pool_size'] == 10
+
+
+def test_profil_default_inchange(tmp_path):
+    app, db = moteur(tmp_path, 'default')
+    pragmas = sqlite_pragma_status(app, db)
+    assert pragmas['journal_mode'] == 'delete'
+    assert pragmas['synchronous'] == 2  # FULL, valeur par défaut de SQLite
+    assert app.config['SQLALCHEMY_ENGINE_OPTIONS'] == {}
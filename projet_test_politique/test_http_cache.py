@@ -0,0 +1,43 @@
+import gzip
+import time
+
+import app as app_module
+from test_query_budget import CATEGORIES, creer_donnees, connecter
+
+
+def test_statiques_versionnes_et_caches_un_an(app, client):
+    with app.test_request_context():
+        url = app_module.url_for('static', filename='dashboard.css')
+    assert '?v=' in url
+    response = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert 'immutable' in response.headers['Cache-Control']
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.data).startswith(b':root')
+
+
+def test_dashboard_compresse_et_304_si_inchange(app, client, monkeypatch):
+    monkeypatch.setattr(app_module, 'fetch_actualites_cached', lambda: {c: [] for c in CATEGORIES})
+    connecter(client, creer_donnees())
+
+    premiere = client.get('/dashboard', headers={'Accept-Encoding': 'gzip'})
+    assert premiere.headers['Content-Encoding'] == 'gzip'
+    assert b'Bonjour alice' in gzip.decompress(premiere.data)
+    assert 'private' in premiere.headers['Cache-Control']
+
+    seconde = client.get('/dashboard', headers={'If-None-Match': premiere.headers['ETag']})
+    assert seconde.status_code == 304
+    assert seconde.data == b''
+
+
+def test_accueil_304_sans_rendu(app, client, monkeypatch):
+    app_module.cache.set('actualites', {'payload': {'Économie': []}, 'built_at': time.time()}, timeout=0)
+    premiere = client.get('/')
+    assert premiere.status_code == 200
+    assert premiere.headers['ETag'].startswith('W/"accueil-')
+
+    rendus = []
+    monkeypatch.setattr(app_module, 'render_template', lambda *a, **k: rendus.append(a) or '')
+    seconde = client.get('/', headers={'If-None-Match': premiere.headers['ETag']})
+    assert seconde.status_code == 304
+    assert rendus == []
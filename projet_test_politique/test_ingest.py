@@ -0,0 +1,230 @@
+import pytest
+
+import ingest
+from models import db, Article, Question, IngestionRun, FailedArticle
+
+
+class FauxNewsApi:
+    """Deux pages de 3 articles ; la première contient un article trop court."""
+
+    def __init__(self, api_key=None, session=None):
+        self.pages_demandees = []
+
+    def get_everything(self, page, page_size, **params):
+        self.pages_demandees.append(page)
+        articles = [
+            {'title': f'Article {page}-{i}', 'url': f'https://lemonde.fr/{page}/{i}',
+             'content': ('court' if (page, i) == (1, 0) else f'Le gouvernement présente la réforme {page}-{i}. ' * 5)}
+            for i in range(3)
+        ]
+        return {'status': 'ok', 'totalResults': 6, 'articles': articles}
+
+
+QUESTIONS = [
+    "Faut-il repousser l'âge légal de départ à la retraite ?",
+    "Quelle place donner au nucléaire dans la production d'électricité ?",
+    "Comment désengorger les urgences des hôpitaux publics ?",
+    "Les frais d'inscription universitaires doivent-ils augmenter ?",
+    "Que faire contre la surpopulation carcérale ?",
+    "L'État doit-il subventionner davantage le cinéma d'auteur ?",
+]
+
+
+def fausse_question(article):
+    page, i = article['url'].rsplit('/', 2)[1:]
+    return {'categorie': 'économie', 'question': QUESTIONS[(int(page) - 1) * 3 + int(i)]}
+
+
+def test_pipeline_pagine_et_dedoublonne(app):
+    client = FauxNewsApi()
+    pages = []
+    resultats, stats = ingest.lancer_ingestion(client, {}, page_max=3, page_size=3, workers=2, taille_lot=2,
+                                               on_page_terminee=pages.append, generateur=fausse_question)
+    assert client.pages_demandees == [1, 2]  # totalResults atteint
+    assert pages == [1, 2]
+    assert len(resultats) == 5 and stats.ignores == 1
+    assert Question.query.count() == 5
+
+    # Deuxième run : toutes les URL ont déjà une question, Ollama n'est pas appelé
+    appels = []
+    _, stats = ingest.lancer_ingestion(FauxNewsApi(), {}, page_max=3, page_size=3,
+                                       generateur=lambda a: appels.append(a) or fausse_question(a))
+    assert appels == [] and stats.questions == 0
+
+
+def test_commande_reprend_apres_interruption(app, monkeypatch, tmp_path):
+    monkeypatch.setattr(app, 'instance_path', str(tmp_path))
+    monkeypatch.setattr('news_source.NewsApiClient', FauxNewsApi)
+    monkeypatch.setitem(app.config, 'NEWS_API_KEY', 'cle-de-test')
+
+    def plante_page_2(article):
+        if '/2/' in article['url']:
+            raise KeyboardInterrupt
+        return fausse_question(article)
+
+    monkeypatch.setattr(ingest, 'generer_question', plante_page_2)
+    runner = app.test_cli_runner()
+    resultat = runner.invoke(args=['ingest', '--page-size', '3', '--workers', '1'])
+    assert resultat.exit_code != 0  # KeyboardInterrupt -> Abort
+    assert ingest.lire_checkpoint(str(tmp_path / 'ingest_checkpoint.json'))['page'] == 1
+    assert Question.query.count() == 2
+    assert IngestionRun.query.one().status == 'interrompu'
+
+    monkeypatch.setattr(ingest, 'generer_question', fausse_question)
+    resultat = runner.invoke(args=['ingest', '--page-size', '3', '--workers', '1'])
+    assert 'Reprise' in resultat.output and resultat.exit_code == 0, resultat.output
+    assert Question.query.count() == 5
+    assert Article.query.count() == 5
+    assert not (tmp_path / 'ingest_checkpoint.json').exists()
+
+
+def test_echecs_mis_en_file_et_repris_seuls(app):
+    def parse_rate(article):
+        if article['url'].endswith('/2/1'):
+            raise ingest.EchecGeneration('parse', 'pas de JSON valide', '{"categorie": "économie", "quest')
+        return fausse_question(article)
+
+    _, stats = ingest.lancer_ingestion(FauxNewsApi(), {}, page_max=3, page_size=3, workers=2, generateur=parse_rate,
+                                       source='cli')
+    assert stats.questions == 4 and stats.erreurs == 1
+    run = db.session.get(IngestionRun, stats.run_id)
+    assert (run.status, run.source, run.questions, run.erreurs) == ('ok', 'cli', 4, 1)
+    assert run.temps_llm is not None and run.temps_enregistrement is not None
+    echec = FailedArticle.query.one()
+    assert (echec.url, echec.error_type, echec.run_id) == ('https://lemonde.fr/2/1', 'parse', run.id)
+    assert echec.raw_response.startswith('{"categorie"')
+
+    # Un nouvel import ne retente pas l'article en échec : c'est le rôle de la reprise
+    appels = []
+    ingest.lancer_ingestion(FauxNewsApi(), {}, page_max=3, page_size=3,
+                            generateur=lambda a: appels.append(a['url']) or fausse_question(a))
+    assert appels == []
+
+    _, stats = ingest.retenter_echecs(generateur=lambda a: appels.append(a['url']) or fausse_question(a))
+    assert appels == ['https://lemonde.fr/2/1'] and stats.questions == 1
+    assert FailedArticle.query.count() == 0
+    assert Question.query.count() == 5
+    assert db.session.get(IngestionRun, stats.run_id).source == 'retry'
+
+
+class FausseReponseOllama:
+    status_code = 200
+
+    def __init__(self, texte):
+        self.texte = texte
+
+    def json(self):
+        return {'response': self.texte}
+
+
+class FauxOllama:
+    def __init__(self, texte):
+        self.texte = texte
+        self.prompts = []
+
+    def post(self, url, json, timeout):
+        self.prompts.append(json['prompt'])
+        return FausseReponseOllama(self.texte)
+
+
+def test_plusieurs_questions_par_appel(app):
+    reponse = '''```json
+    [
+      {"categorie": "Santé", "question": "Comment désengorger les urgences des hôpitaux publics ?"},
+      {"categorie": "santé", "question": "Comment désengorger les urgences des hôpitaux ?"},
+      {"categorie": "économie", "question": "Faut-il augmenter le budget de la Sécurité sociale ?"},
+      {"categorie": "justice", "quest'''
+    ollama = FauxOllama(reponse)
+    article = {'title': 'Hôpital', 'content': 'Les urgences saturent', 'url': 'https://lemonde.fr/h'}
+    candidats = ingest.generer_questions_multiples(article, nb=4, session_http=ollama)
+    assert len(ollama.prompts) == 1 and '4 questions' in ollama.prompts[0]
+    # Réponse tronquée gardée jusqu'au dernier objet complet, reformulation écartée
+    assert [c['categorie'] for c in candidats] == ['santé', 'économie']
+
+    # Dans le pipeline : une candidate déjà en base est écartée, les autres vont en modération
+    db.session.add(Question(texte="Faut-il augmenter le budget de la Sécurité sociale ?", categorie='économie',
+                            valide=True))
+    db.session.commit()
+
+    class UnArticle:
+        def get_everything(self, page, page_size, **params):
+            return {'status': 'ok', 'totalResults': 1, 'articles': [{**article, 'content': 'Les urgences saturent. ' * 10}]}
+
+    _, stats = ingest.lancer_ingestion(UnArticle(), {}, page_max=1, generateur=lambda a: candidats)
+    assert (stats.candidats, stats.questions, stats.similaires) == (2, 1, 1)
+    nouvelle = Question.query.filter_by(valide=False).one()
+    assert nouvelle.article.url == 'https://lemonde.fr/h' and nouvelle.categorie == 'santé'
+
+
+def test_filtre_de_pertinence_avant_ollama(app):
+    class Melange:
+        def get_everything(self, page, page_size, **params):
+            return {'status': 'ok', 'totalResults': 3, 'articles': [
+                {'title': 'Real Madrid-Arsenal : Kylian Mbappé attendu comme le sauveur', 'url': 'https://lemonde.fr/s',
+                 'content': 'Le match de Ligue des champions se joue ce soir au Bernabeu. ' * 3},
+                {'title': 'En direct : les dernières informations', 'url': 'https://lemonde.fr/d',
+                 'content': 'Suivez en direct les dernières informations de la journée. ' * 3},
+                {'title': 'Le Sénat adopte la réforme des retraites', 'url': 'https://lemonde.fr/p',
+                 'content': 'Le projet de loi du gouvernement a été voté par les sénateurs. ' * 3},
+            ]}
+
+    appels = []
+    _, stats = ingest.lancer_ingestion(Melange(), {}, page_max=1, seuil_pertinence=0.5,
+                                       generateur=lambda a: appels.append(a['url']) or fausse_question(
+                                           {'url': 'https://lemonde.fr/1/1'}))
+    assert appels == ['https://lemonde.fr/p']
+    assert stats.hors_sujet == 2 and round(stats.taux_hors_sujet(), 2) == 0.67
+    assert db.session.get(IngestionRun, stats.run_id).hors_sujet == 2
+
+
+def test_quasi_doublons_ecartes_avant_ollama(app):
+    # Mises à jour d'un direct : même extrait tronqué par NewsAPI, seule la longueur restante change
+    titre = 'Budget 2026 : le gouvernement présente son projet, suivez les débats en direct'
+    extrait = ("Le Premier ministre a présenté mardi devant l'Assemblée nationale le projet de budget pour l'an "
+               "prochain. Les députés de l'opposition dénoncent des économies trop brutales sur les collectivités "
+               "loc… [+{} chars]")
+
+    class Directs:
+        def __init__(self, *articles):
+            self.articles = [{'title': t, 'url': f'https://lemonde.fr/direct/{n}', 'content': extrait.format(n)}
+                             for t, n in articles]
+
+        def get_everything(self, page, page_size, **params):
+            return {'status': 'ok', 'totalResults': len(self.articles), 'articles': self.articles}
+
+    appels = []
+    generateur = lambda a: appels.append(a['url']) or fausse_question({'url': 'https://lemonde.fr/1/1'})
+    _, stats = ingest.lancer_ingestion(Directs((titre, 3120), (titre, 4480)), {}, page_max=1,
+                                       distance_doublons=5, generateur=generateur)
+    assert appels == ['https://lemonde.fr/direct/3120'] and stats.quasi_doublons == 1
+    assert Article.query.one().simhash is not None
+
+    # Run suivant : la signature enregistrée écarte une nouvelle mise à jour du même direct
+    _, stats = ingest.lancer_ingestion(Directs((titre + ' - Le Monde', 5210)), {}, page_max=1,
+                                       distance_doublons=5, generateur=generateur)
+    assert appels == ['https://lemonde.fr/direct/3120'] and stats.quasi_doublons == 1
+    assert db.session.get(IngestionRun, stats.run_id).quasi_doublons == 1
+
+
+def test_quasi_doublon_d_un_article_hors_sujet_garde(app, monkeypatch):
+    # Première copie écartée par le filtre de pertinence : elle ne doit pas écarter la suivante
+    class ScoreurParAppel:
+        def __init__(self):
+            self.scores = iter([0.1, 0.9])
+
+        def score(self, titre, contenu):
+            return next(self.scores)
+
+    class Copies:
+        def get_everything(self, page, page_size, **params):
+            contenu = ("Le Premier ministre a présenté mardi devant l'Assemblée nationale le projet de budget pour "
+                       "l'an prochain. Les députés de l'opposition dénoncent des économies trop brutales.")
+            articles = [{'title': 'Budget 2026 : le projet du gouvernement', 'url': f'https://lemonde.fr/budget/{n}',
+                         'content': contenu} for n in (1, 2)]
+            return {'status': 'ok', 'totalResults': 2, 'articles': articles}
+
+    monkeypatch.setattr(ingest, 'scoreur_pertinence', ScoreurParAppel())
+    _, stats = ingest.lancer_ingestion(Copies(), {}, page_max=1, seuil_pertinence=0.5, distance_doublons=5,
+                                       generateur=lambda a: fausse_question({'url': 'https://lemonde.fr/1/1'}))
+    assert (stats.hors_sujet, stats.quasi_doublons) == (1, 0)
+    assert [a.url for a in Article.query] == ['https://lemonde.fr/budget/2']
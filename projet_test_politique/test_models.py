@@ -0,0 +1,91 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import undefer
+
+from models import db, Article, AnalysePolitique, parse_analyse_sections, configure_text_compression
+from query_stats import compter_requetes
+
+ANALYSE = """1. Parti politique le plus proche:
+Parti Socialiste (PS) - Social-démocratie
+
+2. Orientation politique:
+Gauche - libertaire
+
+3. Valeurs principales:
+Justice sociale, Égalité, Solidarité
+
+4. Graphique ASCII:
+```
+| Socialisme    ▓▓▓▓▓▓   | 60%
+| Ecologisme    ▓▓▓      | 30%
+```
+
+5. Évolution d'opinion:
+Plus à gauche qu'au précédent quiz."""
+
+
+def test_parse_analyse_sections():
+    sections = parse_analyse_sections(ANALYSE)
+    assert sections['parti'] == 'Parti Socialiste (PS)'
+    assert sections['orientation'] == 'Gauche-Libertaire'
+    assert sections['valeurs'] == 'Justice sociale, Égalité, Solidarité'
+    assert 'Socialisme' in sections['graphique']
+    assert sections['evolution'] == "Plus à gauche qu'au précédent quiz."
+
+
+def test_extract_structured_fields_remplit_les_colonnes():
+    analyse = AnalysePolitique(user_id=1, analyse_text=ANALYSE)
+    analyse.extract_structured_fields()
+    assert analyse.champs_extraits
+    assert analyse.parti_politique == 'Parti Socialiste (PS)'
+    assert analyse.valeurs == 'Justice sociale, Égalité, Solidarité'
+    assert analyse.ideologies == {'socialisme': 60, 'ecologisme': 30}
+
+
+@pytest.fixture
+def compression_zlib():
+    configure_text_compression('zlib', min_size=512)
+    yield
+    configure_text_compression('none')
+
+
+def valeur_brute(article_id):
+    return db.session.execute(text("SELECT content FROM article WHERE id = :id"), {'id': article_id}).scalar()
+
+
+def test_compression_desactivee_par_defaut(app):
+    article = Article(title='A', content='x' * 2000, url='https://a', category='x', published_at='')
+    db.session.add(article)
+    db.session.commit()
+    assert valeur_brute(article.id) == 'x' * 2000
+
+
+def test_texte_compresse_relu_a_l_identique(app, compression_zlib):
+    long_texte = "Le gouvernement présente la réforme des retraites. " * 50
+    court = Article(title='Court', content='Texte court', url='https://court', category='x', published_at='')
+    long_ = Article(title='Long', content=long_texte, url='https://long', category='x', published_at='')
+    db.session.add_all([court, long_])
+    db.session.commit()
+    brut = valeur_brute(long_.id)
+    assert isinstance(brut, bytes) and brut.startswith(b'\x00z') and len(brut) < len(long_texte.encode())
+    assert valeur_brute(court.id) == 'Texte court'  # sous min_size : gardé en clair
+
+    # Ligne écrite avant la compression (TEXT en clair) : relue telle quelle
+    db.session.execute(text("INSERT INTO article (title, content, url) VALUES ('Ancien', 'Contenu historique', 'https://ancien')"))
+    db.session.commit()
+    db.session.expire_all()
+    contenus = {a.title: a.content for a in Article.query.options(undefer(Article.content))}
+    assert contenus == {'Court': 'Texte court', 'Long': long_texte, 'Ancien': 'Contenu historique'}
+
+
+def test_colonnes_differees_absentes_des_listes(app):
+    db.session.add(Article(title='A', content='Contenu', url='https://a', category='x', published_at=''))
+    db.session.commit()
+    db.session.expire_all()
+    with compter_requetes() as stats:
+        articles = Article.query.all()
+        AnalysePolitique.query.all()
+    colonnes = [requete.split(' FROM ')[0] for requete in stats.statements]
+    assert 'article.content' not in colonnes[0] and 'article.title' in colonnes[0]
+    assert 'analyse_text' not in colonnes[1] and 'analyse_politique.parti_politique' in colonnes[1]
+    assert articles[0].content == 'Contenu'  # chargée au premier accès
@@ -0,0 +1,61 @@
+from sqlalchemy import text
+
+from models import db, User, Question, Reponse, QuizAttempt
+from my_database import save_answers, get_current_attempt, start_new_attempt
+from query_stats import compter_requetes
+
+
+def creer_user_et_questions(nb_questions):
+    user = User(username='bob', email='bob@example.com')
+    db.session.add(user)
+    questions = [Question(texte=f'Question {i}', categorie='économie', valide=True) for i in range(nb_questions)]
+    db.session.add_all(questions)
+    db.session.commit()
+    return user.id, [q.id for q in questions]
+
+
+def test_save_answers_une_requete_et_un_commit(app):
+    user_id, question_ids = creer_user_et_questions(5)
+    attempt_id = get_current_attempt(user_id).id
+
+    with compter_requetes() as stats:
+        assert save_answers(user_id, [(qid, f'Avis {qid}', 'répondu') for qid in question_ids], attempt_id=attempt_id)
+    assert stats.count == 1, stats.statements
+    assert Reponse.query.filter_by(attempt_id=attempt_id).count() == 5
+
+
+def test_save_answers_met_a_jour_la_reponse_courante_et_garde_l_historique(app):
+    user_id, (q1, q2) = creer_user_et_questions(2)
+    save_answers(user_id, [(q1, 'Ancien avis', 'répondu')])
+    ancienne_id = get_current_attempt(user_id).id
+    start_new_attempt(user_id)
+    db.session.commit()
+
+    save_answers(user_id, [(q1, 'Premier avis', 'répondu'), (q2, '', 'passé')])
+    save_answers(user_id, [(q1, 'Avis modifié', 'répondu')])
+
+    courante = get_current_attempt(user_id)
+    assert courante.id != ancienne_id
+    actives = {r.question_id: r for r in Reponse.query.filter_by(attempt_id=courante.id)}
+    assert actives[q1].texte == 'Avis modifié'
+    assert actives[q2].etat == 'passé'
+    ancienne = Reponse.query.filter_by(attempt_id=ancienne_id).one()
+    assert ancienne.texte == 'Ancien avis'
+
+
+def test_plusieurs_tentatives_sans_suppression(app):
+    user_id, (q1,) = creer_user_et_questions(1)
+    for i in range(3):
+        save_answers(user_id, [(q1, f'Avis {i}', 'répondu')])
+        start_new_attempt(user_id)
+        db.session.commit()
+
+    assert QuizAttempt.query.filter_by(user_id=user_id).count() == 4
+    assert Reponse.query.filter_by(user_id=user_id, question_id=q1).count() == 3
+
+
+def test_reponses_d_un_utilisateur_par_index(app):
+    plan = db.session.execute(text(
+        "EXPLAIN QUERY PLAN SELECT question_id FROM reponse WHERE user_id = 1 AND attempt_id != 2"
+    )).fetchall()
+    assert any('ix_reponse_user_id_attempt_id' in ligne[-1] for ligne in plan), plan
@@ -0,0 +1,100 @@
+import threading
+import time
+
+from cachelib import SimpleCache
+
+from news_cache import StaleWhileRevalidateCache
+
+
+def test_premier_appel_lance_la_construction_sans_bloquer():
+    swr = StaleWhileRevalidateCache(SimpleCache(), 'actualites', lambda: {'Économie': ['a']})
+    assert swr.get() == {}
+    swr.wait(5)
+    assert swr.get() == {'Économie': ['a']}
+    assert swr.stats()['refresh_count'] == 1
+
+
+def test_contenu_perime_servi_pendant_une_seule_reconstruction():
+    debloquer = threading.Event()
+    appels = []
+
+    def builder():
+        appels.append(1)
+        debloquer.wait(5)
+        return {'v': 2}
+
+    cache = SimpleCache()
+    cache.set('actualites', {'payload': {'v': 1}, 'built_at': time.time() - 100}, timeout=0)
+    swr = StaleWhileRevalidateCache(cache, 'actualites', builder, max_age=10)
+
+    assert swr.get() == {'v': 1}
+    assert swr.get() == {'v': 1}
+    assert swr.stats()['refreshing'] is True
+    debloquer.set()
+    swr.wait(5)
+    assert len(appels) == 1
+    assert swr.get() == {'v': 2}
+    assert swr.stats()['stale'] is False
+
+
+def test_echec_garde_l_ancienne_version():
+    def builder():
+        raise RuntimeError('NewsAPI indisponible')
+
+    cache = SimpleCache()
+    cache.set('actualites', {'payload': {'v': 1}, 'built_at': time.time() - 100}, timeout=0)
+    swr = StaleWhileRevalidateCache(cache, 'actualites', builder, max_age=10)
+
+    swr.get()
+    swr.wait(5)
+    assert swr.get() == {'v': 1}
+    assert swr.stats()['failure_count'] >= 1
+    assert 'NewsAPI' in swr.stats()['last_error']
+
+
+def test_contenu_invalide_non_publie():
+    swr = StaleWhileRevalidateCache(SimpleCache(), 'actualites', lambda: {'Économie': []},
+                                    is_valid=lambda p: any(p.values()))
+    swr.refresh()
+    swr.wait(5)
+    assert swr.age() is None
+    assert swr.stats()['failure_count'] == 1
+
+
+def test_pas_de_nouvelle_tentative_pendant_le_cooldown():
+    appels = []
+
+    def builder():
+        appels.append(1)
+        raise RuntimeError('Ollama indisponible')
+
+    cache = SimpleCache()
+    cache.set('actualites', {'payload': {'v': 1}, 'built_at': time.time() - 100}, timeout=0)
+    swr = StaleWhileRevalidateCache(cache, 'actualites', builder, max_age=10, cooldown=60)
+
+    swr.get()
+    swr.wait(5)
+    for _ in range(3):
+        assert swr.get() == {'v': 1}
+        swr.wait(5)
+    assert len(appels) == 1
+    assert swr.stats()['cooldown'] is True
+
+    # Un rafraîchissement demandé explicitement (admin, planificateur) passe outre
+    swr.refresh()
+    swr.wait(5)
+    assert len(appels) == 2
+
+
+def test_bail_repris_par_un_autre_worker_non_supprime():
+    debloquer = threading.Event()
+    cache = SimpleCache()
+    swr = StaleWhileRevalidateCache(cache, 'actualites', lambda: debloquer.wait(5) and {'v': 1}, lease=1)
+
+    swr.refresh()
+    # Le bail expire pendant la reconstruction et un autre worker le prend
+    cache.set(swr.lease_key, 'autre-worker', timeout=60)
+    debloquer.set()
+    swr.wait(5)
+    assert cache.get(swr.lease_key) == 'autre-worker'
+    assert swr.get() == {'v': 1}
@@ -0,0 +1,120 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+from news_source import NewsApiSource, ReponsesStockees, articles_stockes
+
+
+class FauxClient:
+    """Renvoie tous les articles publiés après `from_param`, comme NewsAPI."""
+
+    def __init__(self, articles):
+        self.articles = articles
+        self.appels = []
+
+    def get_everything(self, **params):
+        self.appels.append(params)
+        articles = [a for a in self.articles if a['publishedAt'][:19] >= params['from_param']]
+        return {'status': 'ok', 'totalResults': len(articles), 'articles': articles}
+
+
+def article(heure):
+    return {'title': f'Article de {heure}h', 'url': f'https://lemonde.fr/{heure}',
+            'publishedAt': f'2024-05-02T{heure:02d}:00:00Z'}
+
+
+def test_sans_cle_la_source_est_desactivee(tmp_path):
+    source = NewsApiSource(None, dossier=str(tmp_path))
+    response = source.get_everything(q='climat', page=1)
+    assert response['status'] == 'error' and response['code'] == 'apiKeyMissing'
+    assert source.stats()['active'] is False and source.stats()['appels'] == 0
+    assert list(tmp_path.iterdir()) == []  # rien n'est stocké
+
+
+def test_seuls_les_articles_plus_recents_sont_demandes(tmp_path):
+    client = FauxClient([article(9), article(8)])
+    source = NewsApiSource(dossier=str(tmp_path), client=client)
+    params = {'sources': 'le-monde', 'q': 'climat', 'from_param': '2024-05-01'}
+
+    assert len(source.get_everything(page=1, **params)['articles']) == 2
+    source.valider()
+    assert source.watermark(params) == '2024-05-02T09:00:00Z'
+
+    client.articles.insert(0, article(10))
+    nouveaux = source.get_everything(page=1, **params)['articles']
+    assert client.appels[-1]['from_param'] == '2024-05-02T09:00:00'
+    assert [a['url'] for a in nouveaux] == ['https://lemonde.fr/10']  # l'article de 9h est déjà connu
+
+    # Une autre requête a son propre watermark, et il survit au redémarrage
+    assert NewsApiSource(dossier=str(tmp_path), client=client).watermark({**params, 'q': 'santé'}) is None
+    assert NewsApiSource(dossier=str(tmp_path), client=client).watermark(params) == '2024-05-02T09:00:00Z'
+
+
+def test_les_reponses_stockees_sont_rejouees_sans_reseau(tmp_path):
+    client = FauxClient([article(9), article(8)])
+    source = NewsApiSource(dossier=str(tmp_path), client=client)
+    params = {'sources': 'le-monde', 'from_param': '2024-05-01'}
+    source.get_everything(page=1, **params)
+    source.valider()
+    client.articles.insert(0, article(10))
+    source.get_everything(page=1, **params)
+
+    # La fenêtre complète est relue sur disque, sans doublon
+    assert [a['url'] for a in articles_stockes(str(tmp_path), params)] == [
+        'https://lemonde.fr/10', 'https://lemonde.fr/9', 'https://lemonde.fr/8']
+
+    rejeu = ReponsesStockees(str(tmp_path))
+    page_2 = rejeu.get_everything(page=2, page_size=2, **params)
+    assert page_2['totalResults'] == 3 and [a['url'] for a in page_2['articles']] == ['https://lemonde.fr/8']
+    assert rejeu.get_everything(page=1, **{**params, 'q': 'autre'})['articles'] == []
+
+
+def stocker_jour(dossier, jours, urls):
+    jour = (datetime.now() - timedelta(days=jours)).strftime('%Y-%m-%d')
+    os.makedirs(dossier / jour, exist_ok=True)
+    articles = [{'url': url, 'publishedAt': f'{jour}T08:00:00Z'} for url in urls]
+    (dossier / jour / '080000000000-requete-p1.json').write_text(
+        json.dumps({'requete': 'requete', 'params': {}, 'response': {'articles': articles}}), encoding='utf-8')
+    return jour
+
+
+def test_seuls_les_jours_de_la_fenetre_sont_relus(tmp_path, monkeypatch):
+    stocker_jour(tmp_path, 40, ['https://ancien'])
+    stocker_jour(tmp_path, 2, ['https://recent'])
+    lus = []
+    open_original = open
+    monkeypatch.setattr('builtins.open', lambda chemin, *a, **k: lus.append(str(chemin)) or open_original(chemin, *a, **k))
+
+    depuis = (datetime.now() - timedelta(days=10)).strftime('%Y-%m-%d')
+    assert [a['url'] for a in articles_stockes(str(tmp_path), depuis=depuis)] == ['https://recent']
+    assert len(lus) == 1
+
+
+def test_retention_des_reponses_brutes(tmp_path):
+    ancien = stocker_jour(tmp_path, 60, ['https://ancien'])
+    recent = stocker_jour(tmp_path, 3, ['https://recent'])
+    source = NewsApiSource(dossier=str(tmp_path), client=FauxClient([]), retention_jours=45)
+    source.valider()
+    assert not (tmp_path / ancien).exists() and (tmp_path / recent).exists()
+
+
+def test_actualites_puis_import_avec_des_watermarks_separes(tmp_path):
+    from ingest import params_newsapi
+
+    hier = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+    client = FauxClient([{'title': f'Article {h}h', 'url': f'https://lemonde.fr/{h}', 'publishedAt': f'{hier}T{h:02d}:00:00Z'}
+                         for h in (10, 9)])
+    actualites = NewsApiSource(dossier=str(tmp_path), client=client, consommateur='actualites')
+    ingestion = actualites.pour('ingestion')
+
+    # Rafraîchissement des actualités (fenêtre de 10 jours), puis import (fenêtre de 30 jours)
+    depuis = (datetime.now() - timedelta(days=10)).strftime('%Y-%m-%d')
+    requete = {'sources': 'le-monde', 'language': 'fr', 'sort_by': 'publishedAt'}
+    assert len(actualites.get_everything(from_param=depuis, page=1, page_size=100, **requete)['articles']) == 2
+    actualites.valider()
+    assert len(ingestion.get_everything(page=1, page_size=50, **params_newsapi(30))['articles']) == 2
+    ingestion.valider()
+
+    assert (tmp_path / 'watermarks-actualites.json').exists() and (tmp_path / 'watermarks-ingestion.json').exists()
+    assert NewsApiSource(dossier=str(tmp_path), client=client, consommateur='ingestion').watermark(requete) == \
+        f'{hier}T10:00:00Z'
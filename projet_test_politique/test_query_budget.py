@@ -0,0 +1,93 @@
+import app as app_module
+from models import db, User, Question, Reponse, Article, AnalysePolitique, QuizAttempt
+from query_stats import compter_requetes, query_report, reset_query_report
+
+CATEGORIES = ['Affaires internationales', 'Économie', 'Environnement', 'Éducation', 'Santé', 'Justice', 'Culture', 'Technologie']
+
+
+def creer_donnees(nb_questions=5):
+    user = User(username='alice', email='alice@example.com', interets='Économie')
+    user.set_password('secret')
+    db.session.add(user)
+    db.session.flush()
+    attempt = QuizAttempt(user_id=user.id)
+    db.session.add(attempt)
+    db.session.flush()
+    for i in range(nb_questions):
+        article = Article(title=f'Article {i}', content='Contenu ' * 20, url=f'https://example.com/{i}',
+                          category='économie', published_at='2025-05-01')
+        db.session.add(article)
+        db.session.flush()
+        question = Question(texte=f'Que pensez-vous de la réforme {i} ?', categorie='économie',
+                            valide=True, article_id=article.id)
+        db.session.add(question)
+        db.session.flush()
+        if i < nb_questions - 1:
+            db.session.add(Reponse(user_id=user.id, question_id=question.id, attempt_id=attempt.id,
+                                   texte=f'Réponse {i}', etat='répondu'))
+    analyse = AnalysePolitique(user_id=user.id, analyse_text='1. Parti politique le plus proche:\nPS - Socialiste',
+                               is_current=True)
+    analyse.extract_structured_fields()
+    db.session.add(analyse)
+    db.session.commit()
+    return user
+
+
+def connecter(client, user):
+    with client.session_transaction() as sess:
+        sess['user_id'] = user.id
+
+
+def test_dashboard_query_budget(app, client, monkeypatch):
+    monkeypatch.setattr(app_module, 'fetch_actualites_cached', lambda: {c: [] for c in CATEGORIES})
+    user = creer_donnees()
+    connecter(client, user)
+
+    with compter_requetes() as stats:
+        response = client.get('/dashboard')
+    assert response.status_code == 200
+    assert stats.count <= 4, stats.statements
+
+
+def test_quiz_par_categorie_query_budget_independant_du_nombre_de_questions(app, client, monkeypatch):
+    monkeypatch.setattr(app_module, 'generate_summary_with_ollama', lambda contenu: 'Résumé')
+    user = creer_donnees(nb_questions=12)
+    connecter(client, user)
+
+    with compter_requetes() as stats:
+        response = client.get('/quiz/Économie')
+    assert response.status_code == 200
+    # tentative courante + ses réponses + questions (avec articles) + complément aléatoire + au plus 7 catégories suivantes
+    assert stats.count <= 11, stats.statements
+
+
+def test_get_reponses_utilisateur_sans_n_plus_un(app):
+    user_id = creer_donnees(nb_questions=10).id
+
+    with compter_requetes() as stats:
+        reponses = app_module.get_reponses_utilisateur(user_id, include_history=True)
+    assert len(reponses) == 9
+    assert stats.count <= 3, stats.statements
+
+
+def test_rapport_par_endpoint_et_entete_debug(app, client, monkeypatch):
+    monkeypatch.setattr(app_module, 'fetch_actualites_cached', lambda: {c: [] for c in CATEGORIES})
+    user = creer_donnees()
+    connecter(client, user)
+    reset_query_report()
+    monkeypatch.setattr(app, 'debug', True)
+
+    response = client.get('/dashboard')
+    assert int(response.headers['X-DB-Queries']) >= 1
+    assert 'X-DB-Time-Ms' in response.headers
+
+    rapport = query_report()
+    assert rapport['dashboard']['requests'] == 1
+    assert rapport['dashboard']['max_queries'] == int(response.headers['X-DB-Queries'])
+
+
+def test_rapport_des_requetes_reserve_au_mode_debug(app, client, monkeypatch):
+    monkeypatch.setattr(app, 'debug', False)
+    assert client.get('/debug_queries').status_code == 404
+    monkeypatch.setattr(app, 'debug', True)
+    assert client.get('/debug_queries').status_code == 200
@@ -0,0 +1,53 @@
+import pytest
+
+from resume import Resumeur, resume_extractif, textrank, decouper_phrases
+
+DEPECHE = (
+    "Le gouvernement a présenté mercredi son projet de budget pour 2026 en conseil des ministres. "
+    "Le texte prévoit quarante milliards d'euros d'économies, dont une large part sur les dépenses de l'État. "
+    "Il fait beau à Paris cette semaine. "
+    "Les collectivités locales devront aussi contribuer à l'effort budgétaire, au grand dam des maires. "
+    "L'opposition dénonce un budget d'austérité et promet de déposer une motion de censure. "
+    "Le débat sur le budget commencera à l'Assemblée nationale le 20 octobre."
+)
+
+
+def ollama_interdit(texte):
+    pytest.fail("Ollama ne doit pas être appelé")
+
+
+def test_extrait_newsapi_rendu_nettoye_sans_ollama():
+    resumeur = Resumeur()
+    extrait = "Le Sénat a adopté mardi le projet de loi sur l'immigration.\nLe texte part en commission… [+3120 chars]"
+    assert resumeur.resumer(extrait, ollama_interdit) == \
+        "Le Sénat a adopté mardi le projet de loi sur l'immigration. Le texte part en commission…"
+    assert resumeur.resumer('', ollama_interdit).startswith('Résumé non disponible')
+
+
+def test_textrank_garde_les_phrases_centrales_dans_l_ordre():
+    phrases = decouper_phrases(DEPECHE)
+    assert len(phrases) == 6
+    scores = textrank(phrases)
+    assert scores.sum() == pytest.approx(1)
+    # Les phrases reliées par "budget" l'emportent ; sans mot commun, seul le début de l'article compte
+    assert list(scores.argsort()[::-1][:3]) == [0, 5, 4]
+    assert scores[2] > scores[3]
+    assert resume_extractif(DEPECHE, nb_phrases=3) == ' '.join(phrases[i] for i in (0, 4, 5))
+
+
+def test_niveaux_comptes():
+    resumeur = Resumeur(court=200, long=len(DEPECHE))
+    assert resumeur.resumer(DEPECHE, ollama_interdit) == resume_extractif(DEPECHE)
+    appels = []
+    long_texte = DEPECHE + " " + DEPECHE
+    assert resumeur.resumer(long_texte, lambda texte: appels.append(texte) or 'Résumé Ollama') == 'Résumé Ollama'
+    assert appels == [long_texte]
+    resumeur.resumer("Court.", ollama_interdit)
+    assert resumeur.stats() == {'court': 1, 'extractif': 1, 'ollama': 1, 'part_sans_ollama': 0.667}
+
+
+def test_peu_de_phrases_mais_texte_long_passe_par_ollama():
+    resumeur = Resumeur(court=200, long=1000)
+    sans_ponctuation = "le conseil municipal a débattu du budget " * 40
+    assert resumeur.niveau(sans_ponctuation.strip()) == 'ollama'
+    assert resumeur.niveau("Première phrase assez longue. " * 2 + "x" * 300) == 'court'
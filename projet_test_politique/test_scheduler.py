@@ -0,0 +1,72 @@
+import threading
+
+import app as app_module
+from app import cache, stockage_persistant
+from scheduler import Scheduler
+
+
+def test_une_seule_execution_par_tache_entre_workers(app):
+    appels = []
+    debloque = threading.Event()
+    worker_1, worker_2 = Scheduler(stockage_persistant), Scheduler(stockage_persistant)
+    for worker in (worker_1, worker_2):
+        worker.add_job('ingestion', lambda: appels.append(1) or debloque.wait(5), intervalle=3600)
+
+    assert worker_1.run_pending() == ['ingestion']
+    assert worker_2.run_pending() == []  # bail pris par le premier worker
+    debloque.set()
+    worker_1.wait('ingestion')
+    assert appels == [1]
+    assert worker_1.dernier_run('ingestion')['statut'] == 'ok'
+
+    # Le dernier run est partagé : rien n'est dû avant la fin de l'intervalle
+    assert worker_2.run_pending() == []
+
+
+def test_erreur_enregistree_et_bail_libere(app):
+    worker = Scheduler(stockage_persistant)
+    worker.add_job('actualites', lambda: 1 / 0, intervalle=3600)
+    worker.run_pending()
+    worker.wait('actualites')
+    assert worker.dernier_run('actualites')['statut'] == 'erreur'
+    assert worker.enqueue('actualites')  # le bail a été rendu : un nouveau run peut être demandé
+    worker.wait('actualites')
+
+
+def test_bail_repris_par_un_autre_worker_non_supprime(app):
+    debloque = threading.Event()
+    worker = Scheduler(stockage_persistant)
+    worker.add_job('ingestion', lambda: debloque.wait(5), intervalle=3600, lease=1)
+    worker.run_pending()
+    # Le run dépasse son bail : un autre worker le reprend
+    stockage_persistant.set('scheduler:ingestion:lease', 'autre-worker', timeout=60)
+    debloque.set()
+    worker.wait('ingestion')
+    assert stockage_persistant.get('scheduler:ingestion:lease') == 'autre-worker'
+
+
+def test_dernier_run_survit_a_l_eviction_du_cache(app):
+    worker = Scheduler(stockage_persistant)
+    worker.add_job('ingestion', lambda: None, intervalle=3600)
+    worker.run_pending()
+    worker.wait('ingestion')
+    for i in range(app.config['CACHE_THRESHOLD'] + 50):
+        cache.set(f'vue:{i}', i)
+    assert worker.run_pending() == []  # l'import quotidien n'est pas relancé
+
+
+def test_import_articles_rend_la_main_tout_de_suite(client, monkeypatch):
+    debloque = threading.Event()
+    appels = []
+    scheduler = app_module.scheduler
+    monkeypatch.setattr(scheduler.jobs['ingestion'], 'fonction', lambda: appels.append(1) or debloque.wait(5))
+
+    response = client.get('/import_articles')
+    assert response.status_code == 302
+    assert client.get('/debug_scheduler').get_json()['jobs']['ingestion']['en_cours']
+    # Deuxième demande pendant le run : refusée, pas de second import
+    client.get('/import_articles')
+    debloque.set()
+    scheduler.wait('ingestion')
+    assert appels == [1]
+    assert scheduler.dernier_run('ingestion')['statut'] == 'ok'
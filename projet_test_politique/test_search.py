@@ -0,0 +1,72 @@
+from sqlalchemy import text
+
+import search
+from models import db, Article, Question
+
+
+def creer_article_et_question(titre, contenu, question, url):
+    article = Article(title=titre, content=contenu, url=url, category='économie', published_at='2025-05-01')
+    db.session.add(article)
+    db.session.flush()
+    q = Question(texte=question, categorie='économie', article_id=article.id)
+    db.session.add(q)
+    db.session.commit()
+    return article, q
+
+
+def test_index_suit_les_insertions_modifications_et_suppressions(app):
+    _, q = creer_article_et_question("Réforme des retraites", "Le gouvernement présente la réforme.",
+                                     "Que pensez-vous de la réforme des retraites ?", "https://example.com/1")
+    assert [r['id'] for r in search.search_questions('retraites')] == [q.id]
+
+    q.texte = "Faut-il taxer davantage les superprofits ?"
+    db.session.commit()
+    assert search.search_questions('retraites') == []
+    assert search.search_questions('superprofit')[0]['id'] == q.id  # préfixe sur le dernier mot
+
+    db.session.delete(q)
+    db.session.commit()
+    assert search.search_questions('superprofits') == []
+
+
+def test_recherche_articles_classee_et_sans_accents(app, client):
+    creer_article_et_question("Écologie : la taxe carbone revient", "Débat sur la fiscalité écologique.",
+                              "Êtes-vous pour une taxe carbone ?", "https://example.com/2")
+    creer_article_et_question("Budget de l'éducation", "La taxe d'apprentissage est évoquée.",
+                              "Quel budget pour l'école ?", "https://example.com/3")
+
+    response = client.get('/admin/search?q=taxe ecologie&type=articles')
+    resultats = response.get_json()['results']
+    assert resultats[0]['title'].startswith('Écologie')
+    assert len(resultats) == 1
+
+
+def test_find_similar_question(app):
+    creer_article_et_question("Retraites", "Contenu", "Êtes-vous favorable au report de l'âge de départ à la retraite ?",
+                              "https://example.com/4")
+    assert search.find_similar_question("Êtes-vous favorable au report de l'âge légal de départ à la retraite ?")
+    assert search.find_similar_question("Faut-il augmenter le budget de la défense européenne ?") is None
+
+
+def rowids_fts(table):
+    return {ligne[0] for ligne in db.session.execute(text(f"SELECT rowid FROM {table}_fts"))}
+
+
+def test_index_articles_sur_tout_le_contenu(app):
+    contenu = "Le Sénat examine la réforme. " + "Suite du compte rendu. " * 40 + "Amendement parlementaire."
+    assert contenu.index('Amendement') > 500
+    article, _ = creer_article_et_question("Séance au Sénat", contenu, "Faut-il réformer le Sénat ?",
+                                           "https://example.com/5")
+    resultats = search.search_articles('amendement')
+    assert [r['id'] for r in resultats] == [article.id]
+    assert '[Amendement]' in resultats[0]['extrait']
+
+
+def test_suppression_en_masse_retire_les_questions_de_l_index(app, client):
+    search.rebuild_search_index()
+    _, q1 = creer_article_et_question("Retraites", "Contenu", "Question sur les retraites ?", "https://example.com/6")
+    _, q2 = creer_article_et_question("Impôts", "Contenu", "Question sur les impôts ?", "https://example.com/7")
+
+    client.post('/admin/questions/bulk', json={'action': 'delete', 'ids': [q1.id]})
+    assert rowids_fts('question') == {q2.id}
+    assert search.search_questions('retraites') == []
@@ -0,0 +1,87 @@
+import time
+
+from models import db, User
+
+
+def creer_utilisateur():
+    user = User(username='bob', email='bob@example.com', interets='Économie')
+    user.set_password('secret')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def test_cookie_ne_contient_qu_un_identifiant(app, client):
+    creer_utilisateur()
+    response = client.post('/login', data={'email': 'bob@example.com', 'password': 'secret'})
+    assert response.status_code == 302
+    cookie = client.get_cookie(app.config['SESSION_COOKIE_NAME'])
+    assert cookie is not None and len(cookie.value) < 100
+
+    with client.session_transaction() as sess:
+        sess['analyse'] = 'Analyse très longue. ' * 1000
+    assert len(client.get_cookie(app.config['SESSION_COOKIE_NAME']).value) < 100
+    with client.session_transaction() as sess:
+        assert sess['analyse'].startswith('Analyse très longue.')
+        assert 'user_id' in sess
+
+
+def test_cles_volumineuses_chargees_a_la_demande(app, client, monkeypatch):
+    with client.session_transaction() as sess:
+        sess['user_id'] = 1
+        sess['categories_vides'] = ['économie']
+
+    lectures = []
+    store = app.session_interface.store
+    get_original = store.get
+    monkeypatch.setattr(store, 'get', lambda cle: lectures.append(cle) or get_original(cle))
+
+    with client.session_transaction() as sess:
+        assert sess['user_id'] == 1
+        assert not any(cle.endswith(':categories_vides') for cle in lectures)
+        sess['categories_vides'].append('santé')  # modification sur place, sans réaffectation
+    with client.session_transaction() as sess:
+        assert sess['categories_vides'] == ['économie', 'santé']
+    assert any(cle.endswith(':categories_vides') for cle in lectures)
+
+
+def test_logout_vide_la_session(app, client):
+    with client.session_transaction() as sess:
+        sess['user_id'] = 1
+        sess['analyse'] = 'texte'
+        sid = sess.sid
+    client.get('/logout')
+    # Il ne reste que le message flash "Déconnecté avec succès"
+    assert 'user_id' not in (app.session_interface.load(sid) or {})
+    assert app.session_interface.load(sid, 'analyse') is None
+
+
+def test_session_survit_a_l_eviction_du_cache(app, client):
+    from app import cache
+    with client.session_transaction() as sess:
+        sess['user_id'] = 1
+    for i in range(app.config['CACHE_THRESHOLD'] + 50):
+        cache.set(f'vue:{i}', i)
+    with client.session_transaction() as sess:
+        assert sess['user_id'] == 1
+
+
+def test_lecture_repousse_l_expiration(app, client, monkeypatch):
+    interface = app.session_interface
+    monkeypatch.setattr(interface, 'renouvellement', 0)
+    with client.session_transaction() as sess:
+        sess['user_id'] = 1
+        sess['analyse'] = 'texte'
+        sid = sess.sid
+
+    def expirations():
+        return dict(interface.store._conn().execute(
+            "SELECT key, expires FROM cache_entry WHERE key LIKE ?", (f'%{sid}%',)).fetchall())
+
+    avant = expirations()
+    time.sleep(0.05)
+    with client.session_transaction() as sess:
+        assert sess['user_id'] == 1  # lecture seule, 'analyse' n'est pas chargée
+    apres = expirations()
+    assert set(apres) == set(avant) and len(apres) == 2
+    assert all(apres[cle] > avant[cle] for cle in avant)
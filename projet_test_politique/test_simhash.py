@@ -0,0 +1,35 @@
+import random
+
+from simhash import IndexSimHash, signature, distance, vers_sqlite, depuis_sqlite
+
+TITRE = 'Budget 2026 : le gouvernement présente son projet, suivez les débats en direct'
+EXTRAIT = ("Le Premier ministre a présenté mardi devant l'Assemblée nationale le projet de budget pour l'an prochain. "
+           "Les députés de l'opposition dénoncent des économies trop brutales sur les collectivités loc… [+{} chars]")
+
+
+def test_mise_a_jour_d_un_direct_est_un_quasi_doublon():
+    a = signature(TITRE, EXTRAIT.format(3120))
+    assert signature(TITRE, EXTRAIT.format(4480)) == a  # "[+N chars]" ignoré
+    assert distance(a, signature(TITRE + ' - Le Monde', EXTRAIT.format(4480))) <= 5
+    autre = signature('Budget 2026 : le Sénat rejette la partie recettes',
+                      "Les sénateurs ont rejeté dans la nuit la partie recettes du projet de loi de finances, "
+                      "un revers pour le gouvernement… [+2100 chars]")
+    assert distance(a, autre) > 5
+    assert signature('', '') is None
+    assert depuis_sqlite(vers_sqlite(a)) == a and -2 ** 63 <= vers_sqlite(a) < 2 ** 63
+
+
+def test_index_trouve_les_memes_voisins_qu_un_parcours_complet():
+    rng = random.Random(3)
+    signatures = {i: rng.getrandbits(64) for i in range(2000)}
+    index = IndexSimHash(distance_max=5)
+    for identifiant, sig in signatures.items():
+        index.ajouter(identifiant, sig)
+    for _ in range(50):
+        cible = rng.choice(list(signatures))
+        requete = signatures[cible]
+        for bit in rng.sample(range(64), rng.randint(0, 5)):
+            requete ^= 1 << bit
+        attendu = min((distance(requete, s), i) for i, s in signatures.items())
+        assert index.plus_proche(requete) == (attendu[1], attendu[0])
+    assert len(index) == 2000
@@ -0,0 +1,123 @@
+import os
+import threading
+
+import ingest
+from models import Article, Question
+from sources import EtatConditionnel, SourceFlux, SourceNewsApi, lire_flux, recuperer_sources
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+FLUX = {
+    'https://exemple.fr/politique/rss.xml': 'flux_politique.rss',
+    'https://debats.exemple.org/flux.atom': 'flux_debats.atom',
+}
+
+
+class FausseReponse:
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise Exception(f"HTTP {self.status_code}")
+
+
+class FausseSession:
+    """Sert les flux de fixtures/ avec un ETag ; `rendez_vous` bloque chaque appel jusqu'à ce que tous soient en cours."""
+
+    def __init__(self, rendez_vous=None):
+        self.rendez_vous = rendez_vous
+        self.requetes = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requetes.append((url, dict(headers or {})))
+        if self.rendez_vous is not None:
+            self.rendez_vous.wait()
+        etag = f'"{FLUX[url]}-v1"'
+        if (headers or {}).get('If-None-Match') == etag:
+            return FausseReponse(304)
+        with open(os.path.join(FIXTURES, FLUX[url]), 'rb') as f:
+            return FausseReponse(200, f.read(), {'ETag': etag, 'Last-Modified': 'Wed, 15 Oct 2025 10:00:00 GMT'})
+
+
+def test_flux_rss_et_atom_normalises():
+    with open(os.path.join(FIXTURES, 'flux_politique.rss'), 'rb') as f:
+        rss = lire_flux(f.read(), source='politique')
+    assert rss[0] == {
+        'title': "Le Sénat adopte la réforme de l'assurance-chômage",
+        'content': "Les sénateurs ont voté dans la nuit le projet de loi du gouvernement sur l'assurance-chômage, "
+                   "malgré l'opposition des syndicats & de la gauche.",
+        'url': 'https://exemple.fr/politique/article/senat-assurance-chomage',
+        'category': 'Politique', 'published_at': '2025-10-14T19:30:00Z', 'source': 'politique',
+    }
+    assert rss[1]['content'].startswith('Réunis en congrès')  # content:encoded préféré à la description
+    assert rss[1]['category'] == 'Non précisé'
+
+    with open(os.path.join(FIXTURES, 'flux_debats.atom'), 'rb') as f:
+        [atom] = lire_flux(f.read(), source='debats')
+    assert atom['url'] == 'https://debats.exemple.org/laicite-ecole'
+    assert atom['published_at'] == '2025-10-15T07:00:00Z' and atom['category'] == 'Éducation'
+    assert atom['content'].startswith("Une proposition de loi sur la laïcité")
+
+
+def test_flux_inchange_ne_coute_qu_un_304(tmp_path):
+    session = FausseSession()
+    etat = EtatConditionnel(str(tmp_path / 'flux.json'))
+    source = SourceFlux('https://exemple.fr/politique/rss.xml', etat=etat, session=session)
+    assert len(list(source.pages())[0][1]) == 2
+
+    # Run interrompu (pas de valider) : le flux est redemandé en entier
+    assert session.requetes[-1][1] == {}
+    list(source.pages())
+    assert session.requetes[-1][1] == {}
+
+    source.valider()
+    source = SourceFlux('https://exemple.fr/politique/rss.xml', session=session,
+                        etat=EtatConditionnel(str(tmp_path / 'flux.json')))  # validateurs relus sur disque
+    assert list(source.pages()) == []
+    assert session.requetes[-1][1] == {'If-None-Match': '"flux_politique.rss-v1"',
+                                       'If-Modified-Since': 'Wed, 15 Oct 2025 10:00:00 GMT'}
+    assert source.stats()['non_modifies'] == 1
+
+
+def test_sources_recuperees_en_parallele_jusqu_a_la_table_article(app, tmp_path):
+    # Les 3 sources doivent être en cours en même temps pour passer le rendez-vous
+    rendez_vous = threading.Barrier(3, timeout=5)
+    session = FausseSession(rendez_vous)
+
+    class NewsApi:
+        def get_everything(self, page, page_size, **params):
+            rendez_vous.wait()
+            return {'status': 'ok', 'totalResults': 1, 'articles': [{
+                'title': 'Le gouvernement présente son budget', 'url': 'https://lemonde.fr/budget',
+                'content': 'Le Premier ministre a présenté le projet de loi de finances en conseil des ministres. ' * 2,
+                'publishedAt': '2025-10-15T08:00:00Z'}]}
+
+    etat = EtatConditionnel(str(tmp_path / 'flux.json'))
+    flux = [SourceFlux(url, etat=etat, session=session) for url in FLUX]
+    appels = []
+    generateur = lambda a: appels.append(a['url']) or {'categorie': 'économie', 'question': f"Question sur {a['title']} ?"}
+    _, stats = ingest.lancer_ingestion(NewsApi(), {}, page_max=1, generateur=generateur, sources=flux)
+
+    # L'article trop court du flux RSS est écarté par le filtre habituel
+    assert sorted(appels) == ['https://debats.exemple.org/laicite-ecole', 'https://exemple.fr/politique/article/maires-dotations',
+                              'https://exemple.fr/politique/article/senat-assurance-chomage', 'https://lemonde.fr/budget']
+    assert Article.query.count() == Question.query.count() == 4
+    assert Article.query.filter_by(url='https://debats.exemple.org/laicite-ecole').one().published_at == '2025-10-15T07:00:00Z'
+    assert list(stats.sources) == ['newsapi', 'exemple.fr/politique/rss.xml', 'debats.exemple.org/flux.atom']
+    assert [(s['appels'], s['articles'], s['erreurs']) for s in stats.sources.values()] == [(1, 1, 0), (1, 2, 0), (1, 1, 0)]
+
+
+def test_source_en_panne_n_arrete_pas_les_autres():
+    class Panne:
+        def get_everything(self, **params):
+            raise ValueError("pas de réseau")
+
+    session = FausseSession()
+    sources = [SourceFlux('https://inconnu.example/flux.xml', session=session),
+               SourceFlux('https://debats.exemple.org/flux.atom', session=session),
+               SourceNewsApi(Panne(), {})]
+    resultats = [(source.nom, sum(len(articles) for _, articles in pages)) for source, pages in recuperer_sources(sources)]
+    assert resultats == [('inconnu.example/flux.xml', 0), ('debats.exemple.org/flux.atom', 1), ('newsapi', 0)]
+    assert sources[0].erreurs == 1
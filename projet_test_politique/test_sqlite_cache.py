@@ -0,0 +1,97 @@
+import threading
+import time
+
+import pytest
+
+from sqlite_cache import SQLiteCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SQLiteCache(str(tmp_path / 'cache.sqlite3'), default_timeout=60, threshold=3, touch_interval=0)
+
+
+def test_get_set_expiration_et_stats(cache):
+    assert cache.get('a') is None
+    cache.set('a', {'x': [1, 2]})
+    assert cache.get('a') == {'x': [1, 2]}
+    cache.set('b', 'court', timeout=-1)  # déjà expirée
+    assert cache.get('b') is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (1, 2)
+
+
+def test_add_atomique_et_reprise_apres_expiration(cache):
+    assert cache.add('verrou', 1) is True
+    assert cache.add('verrou', 2) is False
+    assert cache.get('verrou') == 1
+    cache.set('verrou', 1, timeout=-1)
+    assert cache.add('verrou', 3) is True
+    assert cache.get('verrou') == 3
+
+
+def test_delete_if_ne_supprime_que_la_valeur_attendue(cache):
+    cache.set('bail', 'jeton-1')
+    assert cache.delete_if('bail', 'jeton-2') is False
+    assert cache.get('bail') == 'jeton-1'
+    assert cache.delete_if('bail', 'jeton-1') is True
+    assert cache.get('bail') is None
+
+
+def test_eviction_lru(cache):
+    for cle in ('a', 'b', 'c'):
+        cache.set(cle, cle)
+        time.sleep(0.01)
+    cache.get('a')  # "a" devient la plus récemment lue
+    cache.set('d', 'd')
+    assert cache.get('b') is None
+    assert {cle for cle in 'acd' if cache.get(cle)} == {'a', 'c', 'd'}
+    assert cache.stats()['evictions'] == 1
+
+
+def test_eviction_epargne_les_entrees_sans_expiration(tmp_path):
+    cache = SQLiteCache(str(tmp_path / 'cache.sqlite3'), threshold=500, touch_interval=0)
+    cache.set('actualites', {'payload': 'contenu'}, timeout=0)
+    for i in range(600):
+        cache.set(f'vue:{i}', i)
+    assert cache.get('actualites') == {'payload': 'contenu'}
+    assert cache.stats()['entries'] == 500
+    assert cache.get('vue:0') is None and cache.get('vue:599') == 599
+
+
+def test_get_or_set_une_seule_reconstruction(cache):
+    appels = []
+
+    def builder():
+        appels.append(1)
+        time.sleep(0.2)
+        return 'valeur'
+
+    resultats = []
+    threads = [threading.Thread(target=lambda: resultats.append(cache.get_or_set('cle', builder, poll=0.02)))
+               for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert resultats == ['valeur'] * 4
+    assert len(appels) == 1
+
+
+def test_backend_flask_caching(tmp_path):
+    from flask import Flask
+    from flask_caching import Cache
+
+    app = Flask(__name__)
+    app.config.update(CACHE_TYPE='sqlite_cache.SQLiteCache', CACHE_DIR=str(tmp_path))
+    cache = Cache(app)
+
+    @cache.memoize(timeout=60)
+    def double(x):
+        return x * 2
+
+    with app.app_context():
+        assert double(2) == 4
+        assert double(2) == 4
+        assert cache.cache.stats()['hits'] >= 1
+    assert (tmp_path / 'cache.sqlite3').exists()